@@ -0,0 +1,44 @@
+"""add staff lead counters
+
+Revision ID: 20260226_0014
+Revises: 20260225_0013
+Create Date: 2026-02-26 10:20:00
+"""
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20260226_0014"
+down_revision: str | None = "20260225_0013"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "staff_lead_counters",
+        sa.Column("staff_id", sa.String(length=32), nullable=False),
+        sa.Column("active_leads", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["staff_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("staff_id"),
+    )
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO staff_lead_counters (staff_id, active_leads)
+            SELECT owner_id, count(*)
+              FROM leads
+             WHERE owner_id IS NOT NULL
+               AND status NOT IN ('signed', '已签约', 'lost', '战败流失', 'invalid', '无效线索', '无效客户')
+             GROUP BY owner_id
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("staff_lead_counters")
@@ -0,0 +1,80 @@
+"""promote pool drop metadata to lead columns
+
+Revision ID: 20260226_0015
+Revises: 20260226_0014
+Create Date: 2026-02-26 14:05:00
+"""
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20260226_0015"
+down_revision: str | None = "20260226_0014"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("leads", sa.Column("drop_reason_type", sa.String(length=64), nullable=True))
+    op.add_column("leads", sa.Column("drop_time", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("leads", sa.Column("original_owner_id", sa.String(length=32), nullable=True))
+
+    op.execute(
+        sa.text(
+            """
+            UPDATE leads AS l
+               SET drop_reason_type = NULLIF(l.dynamic_data->>'drop_reason_type', ''),
+                   drop_time = CASE
+                       WHEN l.dynamic_data->>'drop_time' ~ '^\\d{4}-\\d{2}-\\d{2}[ T]\\d{2}:\\d{2}'
+                           THEN (l.dynamic_data->>'drop_time')::timestamptz
+                       WHEN l.owner_id IS NULL
+                           THEN l.updated_at
+                       ELSE NULL
+                   END,
+                   original_owner_id = (
+                       SELECT u.id
+                         FROM users AS u
+                        WHERE u.id = l.dynamic_data->>'original_owner'
+                           OR u.name = l.dynamic_data->>'original_owner'
+                        ORDER BY (u.id = l.dynamic_data->>'original_owner') DESC, u.created_at ASC
+                        LIMIT 1
+                   )
+             WHERE l.owner_id IS NULL
+                OR l.dynamic_data ? 'drop_reason_type'
+            """
+        )
+    )
+
+    op.create_index(
+        "ix_leads_pool_drop_time",
+        "leads",
+        [sa.text("drop_time DESC")],
+        unique=False,
+        postgresql_where=sa.text("owner_id IS NULL"),
+    )
+    op.create_index(
+        "ix_leads_pool_drop_reason_type",
+        "leads",
+        ["drop_reason_type", sa.text("drop_time DESC")],
+        unique=False,
+        postgresql_where=sa.text("owner_id IS NULL"),
+    )
+    op.create_index(
+        "ix_leads_pool_original_owner_id",
+        "leads",
+        ["original_owner_id", sa.text("drop_time DESC")],
+        unique=False,
+        postgresql_where=sa.text("owner_id IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_leads_pool_original_owner_id", table_name="leads")
+    op.drop_index("ix_leads_pool_drop_reason_type", table_name="leads")
+    op.drop_index("ix_leads_pool_drop_time", table_name="leads")
+    op.drop_column("leads", "original_owner_id")
+    op.drop_column("leads", "drop_time")
+    op.drop_column("leads", "drop_reason_type")
@@ -0,0 +1,52 @@
+"""add partial indexes for pool and todo query shapes
+
+Revision ID: 20260227_0016
+Revises: 20260226_0015
+Create Date: 2026-02-27 09:40:00
+"""
+
+from typing import Sequence
+
+from alembic import op
+
+
+revision: str = "20260227_0016"
+down_revision: str | None = "20260226_0015"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+ACTIVE_PREDICATE = (
+    "owner_id IS NOT NULL"
+    " AND status NOT IN ('signed', '已签约', 'lost', '战败流失', 'invalid', '无效线索', '无效客户')"
+)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_leads_pool_listing "
+            "ON leads (drop_time DESC, id DESC) WHERE owner_id IS NULL"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_leads_active_owner_follow_up "
+            "ON leads (owner_id, last_follow_up ASC NULLS FIRST, updated_at ASC) "
+            f"WHERE {ACTIVE_PREDICATE}"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_leads_active_follow_up "
+            "ON leads (last_follow_up ASC NULLS FIRST, updated_at ASC) "
+            f"WHERE {ACTIVE_PREDICATE}"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_leads_pool_drop_time")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_leads_pool_drop_time "
+            "ON leads (drop_time DESC) WHERE owner_id IS NULL"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_leads_active_follow_up")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_leads_active_owner_follow_up")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_leads_pool_listing")
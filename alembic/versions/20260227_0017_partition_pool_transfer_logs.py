@@ -0,0 +1,121 @@
+"""range-partition pool_transfer_logs by created_at month
+
+Revision ID: 20260227_0017
+Revises: 20260227_0016
+Create Date: 2026-02-27 16:10:00
+"""
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20260227_0017"
+down_revision: str | None = "20260227_0016"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+COLUMNS = "id, lead_id, action, from_owner_id, to_owner_id, operator_staff_id, note, created_at"
+
+
+def upgrade() -> None:
+    op.drop_index("ix_pool_transfer_logs_created_at", table_name="pool_transfer_logs")
+    op.drop_index("ix_pool_transfer_logs_action", table_name="pool_transfer_logs")
+    op.drop_index("ix_pool_transfer_logs_lead_id", table_name="pool_transfer_logs")
+    op.execute("ALTER TABLE pool_transfer_logs RENAME TO pool_transfer_logs_legacy")
+    op.execute("ALTER TABLE pool_transfer_logs_legacy RENAME CONSTRAINT pool_transfer_logs_pkey TO pool_transfer_logs_legacy_pkey")
+    op.execute("ALTER SEQUENCE pool_transfer_logs_id_seq OWNED BY NONE")
+
+    op.execute(
+        """
+        CREATE TABLE pool_transfer_logs (
+            id INTEGER NOT NULL DEFAULT nextval('pool_transfer_logs_id_seq'),
+            lead_id VARCHAR(32) NOT NULL REFERENCES leads (id) ON DELETE CASCADE,
+            action VARCHAR(32) NOT NULL,
+            from_owner_id VARCHAR(32),
+            to_owner_id VARCHAR(32),
+            operator_staff_id VARCHAR(32) NOT NULL,
+            note TEXT,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            CONSTRAINT pool_transfer_logs_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute("CREATE TABLE pool_transfer_logs_default PARTITION OF pool_transfer_logs DEFAULT")
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            month_start DATE;
+            current_month DATE := date_trunc('month', now() AT TIME ZONE 'UTC')::date;
+            last_month DATE := (current_month + INTERVAL '2 months')::date;
+        BEGIN
+            SELECT COALESCE(date_trunc('month', min(created_at) AT TIME ZONE 'UTC')::date, current_month)
+              INTO month_start
+              FROM pool_transfer_logs_legacy;
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF pool_transfer_logs FOR VALUES FROM (%L) TO (%L)',
+                    'pool_transfer_logs_' || to_char(month_start, 'YYYY"m"MM'),
+                    month_start::timestamp AT TIME ZONE 'UTC',
+                    (month_start + INTERVAL '1 month')::timestamp AT TIME ZONE 'UTC'
+                );
+                month_start := (month_start + INTERVAL '1 month')::date;
+            END LOOP;
+        END $$
+        """
+    )
+    op.execute(f"INSERT INTO pool_transfer_logs ({COLUMNS}) SELECT {COLUMNS} FROM pool_transfer_logs_legacy")
+    op.execute("DROP TABLE pool_transfer_logs_legacy")
+    op.execute("ALTER SEQUENCE pool_transfer_logs_id_seq OWNED BY pool_transfer_logs.id")
+
+    op.create_index(
+        "ix_pool_transfer_logs_lead_id_created_at",
+        "pool_transfer_logs",
+        ["lead_id", "created_at"],
+        unique=False,
+    )
+    op.create_index("ix_pool_transfer_logs_action", "pool_transfer_logs", ["action"], unique=False)
+    op.create_index(
+        "ix_pool_transfer_logs_created_at_id",
+        "pool_transfer_logs",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE pool_transfer_logs RENAME TO pool_transfer_logs_partitioned")
+    op.execute(
+        "ALTER TABLE pool_transfer_logs_partitioned RENAME CONSTRAINT pool_transfer_logs_pkey "
+        "TO pool_transfer_logs_partitioned_pkey"
+    )
+    op.execute("ALTER SEQUENCE pool_transfer_logs_id_seq OWNED BY NONE")
+    op.drop_index("ix_pool_transfer_logs_created_at_id", table_name="pool_transfer_logs_partitioned")
+    op.drop_index("ix_pool_transfer_logs_action", table_name="pool_transfer_logs_partitioned")
+    op.drop_index("ix_pool_transfer_logs_lead_id_created_at", table_name="pool_transfer_logs_partitioned")
+
+    op.execute(
+        """
+        CREATE TABLE pool_transfer_logs (
+            id INTEGER NOT NULL DEFAULT nextval('pool_transfer_logs_id_seq'),
+            lead_id VARCHAR(32) NOT NULL REFERENCES leads (id) ON DELETE CASCADE,
+            action VARCHAR(32) NOT NULL,
+            from_owner_id VARCHAR(32),
+            to_owner_id VARCHAR(32),
+            operator_staff_id VARCHAR(32) NOT NULL,
+            note TEXT,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            CONSTRAINT pool_transfer_logs_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute(f"INSERT INTO pool_transfer_logs ({COLUMNS}) SELECT {COLUMNS} FROM pool_transfer_logs_partitioned")
+    op.execute("DROP TABLE pool_transfer_logs_partitioned")
+    op.execute("ALTER SEQUENCE pool_transfer_logs_id_seq OWNED BY pool_transfer_logs.id")
+
+    op.create_index("ix_pool_transfer_logs_lead_id", "pool_transfer_logs", ["lead_id"], unique=False)
+    op.create_index("ix_pool_transfer_logs_action", "pool_transfer_logs", ["action"], unique=False)
+    op.create_index("ix_pool_transfer_logs_created_at", "pool_transfer_logs", ["created_at"], unique=False)
@@ -0,0 +1,89 @@
+"""add daily lead stats rollup
+
+Revision ID: 20260228_0018
+Revises: 20260227_0017
+Create Date: 2026-02-28 09:30:00
+"""
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20260228_0018"
+down_revision: str | None = "20260227_0017"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_lead_stats",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("owner_id", sa.String(length=32), nullable=False, server_default=""),
+        sa.Column("dept_name", sa.String(length=128), nullable=False, server_default=""),
+        sa.Column("source", sa.String(length=64), nullable=False, server_default=""),
+        sa.Column("status", sa.String(length=64), nullable=False, server_default=""),
+        sa.Column("new_leads", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("follow_ups", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("signed", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("deposit_paid", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("day", "owner_id", "dept_name", "source", "status"),
+    )
+    op.create_index("ix_daily_lead_stats_owner_id_day", "daily_lead_stats", ["owner_id", "day"])
+    op.create_index("ix_daily_lead_stats_dept_name_day", "daily_lead_stats", ["dept_name", "day"])
+
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO daily_lead_stats (day, owner_id, dept_name, source, status, new_leads, follow_ups, signed, deposit_paid)
+            SELECT (l.created_at AT TIME ZONE 'UTC')::date,
+                   coalesce(l.owner_id, ''),
+                   coalesce(u.dept_name, ''),
+                   l.source,
+                   l.status,
+                   count(*),
+                   0,
+                   CASE WHEN l.status IN ('signed', '已签约') THEN count(*) ELSE 0 END,
+                   CASE WHEN l.status IN ('deposit_paid', '已定金', '已交定金') THEN count(*) ELSE 0 END
+              FROM leads AS l
+              LEFT JOIN users AS u ON u.id = l.owner_id
+             GROUP BY 1, 2, 3, 4, 5
+            """
+        )
+    )
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO daily_lead_stats (day, owner_id, dept_name, source, status, new_leads, follow_ups, signed, deposit_paid)
+            SELECT (f.timestamp AT TIME ZONE 'UTC')::date,
+                   coalesce(op.id, ''),
+                   coalesce(op.dept_name, ''),
+                   '',
+                   '',
+                   0,
+                   count(*),
+                   0,
+                   0
+              FROM follow_up_records AS f
+              LEFT JOIN LATERAL (
+                    SELECT u.id, u.dept_name
+                      FROM users AS u
+                     WHERE u.id = f.operator OR u.name = f.operator
+                     ORDER BY (u.id = f.operator) DESC, u.id
+                     LIMIT 1
+              ) AS op ON true
+             GROUP BY 1, 2, 3
+            ON CONFLICT (day, owner_id, dept_name, source, status)
+            DO UPDATE SET follow_ups = daily_lead_stats.follow_ups + EXCLUDED.follow_ups
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_daily_lead_stats_dept_name_day", table_name="daily_lead_stats")
+    op.drop_index("ix_daily_lead_stats_owner_id_day", table_name="daily_lead_stats")
+    op.drop_table("daily_lead_stats")
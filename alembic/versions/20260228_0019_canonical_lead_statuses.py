@@ -0,0 +1,101 @@
+"""rewrite legacy lead status labels to canonical keys
+
+Revision ID: 20260228_0019
+Revises: 20260228_0018
+Create Date: 2026-02-28 14:20:00
+"""
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20260228_0019"
+down_revision: str | None = "20260228_0018"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+STATUS_ALIASES = {
+    "待跟进": "pending",
+    "初步沟通": "communicating",
+    "深度跟进": "deep_following",
+    "已邀约": "invited",
+    "已到访": "visited",
+    "已交定金": "deposit_paid",
+    "已定金": "deposit_paid",
+    "已签约": "signed",
+    "无效线索": "invalid",
+    "无效客户": "invalid",
+    "战败流失": "lost",
+}
+
+LEGACY_ACTIVE_PREDICATE = (
+    "owner_id IS NOT NULL"
+    " AND status NOT IN ('signed', '已签约', 'lost', '战败流失', 'invalid', '无效线索', '无效客户')"
+)
+ACTIVE_PREDICATE = "owner_id IS NOT NULL AND status NOT IN ('signed', 'lost', 'invalid')"
+
+
+def _create_active_indexes(predicate: str) -> None:
+    op.execute(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_leads_active_owner_follow_up "
+        "ON leads (owner_id, last_follow_up ASC NULLS FIRST, updated_at ASC) "
+        f"WHERE {predicate}"
+    )
+    op.execute(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_leads_active_follow_up "
+        "ON leads (last_follow_up ASC NULLS FIRST, updated_at ASC) "
+        f"WHERE {predicate}"
+    )
+
+
+def upgrade() -> None:
+    case_sql = " ".join(f"WHEN '{legacy}' THEN '{canonical}'" for legacy, canonical in STATUS_ALIASES.items())
+    legacy_list = ", ".join(f"'{legacy}'" for legacy in STATUS_ALIASES)
+    op.execute(sa.text(f"UPDATE leads SET status = CASE status {case_sql} END WHERE status IN ({legacy_list})"))
+
+    # daily_lead_stats lead rows are keyed by status; recompute them under the canonical keys.
+    op.execute(sa.text("DELETE FROM daily_lead_stats WHERE status <> ''"))
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO daily_lead_stats (day, owner_id, dept_name, source, status, new_leads, follow_ups, signed, deposit_paid)
+            SELECT (l.created_at AT TIME ZONE 'UTC')::date,
+                   coalesce(l.owner_id, ''),
+                   coalesce(u.dept_name, ''),
+                   l.source,
+                   l.status,
+                   count(*),
+                   0,
+                   CASE WHEN l.status = 'signed' THEN count(*) ELSE 0 END,
+                   CASE WHEN l.status = 'deposit_paid' THEN count(*) ELSE 0 END
+              FROM leads AS l
+              LEFT JOIN users AS u ON u.id = l.owner_id
+             GROUP BY 1, 2, 3, 4, 5
+            ON CONFLICT (day, owner_id, dept_name, source, status)
+            DO UPDATE SET new_leads = EXCLUDED.new_leads,
+                          signed = EXCLUDED.signed,
+                          deposit_paid = EXCLUDED.deposit_paid
+            """
+        )
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_leads_active_owner_follow_up")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_leads_active_follow_up")
+        _create_active_indexes(ACTIVE_PREDICATE)
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_leads_signed_created_at "
+            "ON leads (created_at) WHERE status = 'signed'"
+        )
+
+
+def downgrade() -> None:
+    # Status values stay canonical: the legacy labels were aliases and cannot be told apart again.
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_leads_signed_created_at")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_leads_active_owner_follow_up")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_leads_active_follow_up")
+        _create_active_indexes(LEGACY_ACTIVE_PREDICATE)
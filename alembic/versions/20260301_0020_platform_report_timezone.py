@@ -0,0 +1,28 @@
+"""add report timezone to platform_settings
+
+Revision ID: 20260301_0020
+Revises: 20260228_0019
+Create Date: 2026-03-01 10:00:00
+"""
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20260301_0020"
+down_revision: str | None = "20260228_0019"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "platform_settings",
+        sa.Column("report_timezone", sa.String(length=64), nullable=False, server_default="Asia/Shanghai"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("platform_settings", "report_timezone")
@@ -0,0 +1,62 @@
+"""add operator_staff_id to follow_up_records
+
+Revision ID: 20260302_0021
+Revises: 20260301_0020
+Create Date: 2026-03-02 09:00:00
+"""
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20260302_0021"
+down_revision: str | None = "20260301_0020"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "follow_up_records",
+        sa.Column("operator_staff_id", sa.String(length=32), nullable=True),
+    )
+    op.create_foreign_key(
+        "fk_follow_up_records_operator_staff_id_users",
+        "follow_up_records",
+        "users",
+        ["operator_staff_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+    # operator holds a staff ID or a display name; prefer the ID match, then the lowest ID with that name.
+    op.execute(
+        sa.text(
+            """
+            UPDATE follow_up_records AS f
+               SET operator_staff_id = (
+                    SELECT u.id
+                      FROM users AS u
+                     WHERE u.id = f.operator OR u.name = f.operator
+                     ORDER BY (u.id = f.operator) DESC, u.id
+                     LIMIT 1
+               )
+             WHERE f.operator_staff_id IS NULL
+            """
+        )
+    )
+    with op.get_context().autocommit_block():
+        op.execute(
+            sa.text(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_follow_up_records_operator_staff_timestamp "
+                "ON follow_up_records (operator_staff_id, timestamp)"
+            )
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(sa.text("DROP INDEX CONCURRENTLY IF EXISTS ix_follow_up_records_operator_staff_timestamp"))
+    op.drop_constraint("fk_follow_up_records_operator_staff_id_users", "follow_up_records", type_="foreignkey")
+    op.drop_column("follow_up_records", "operator_staff_id")
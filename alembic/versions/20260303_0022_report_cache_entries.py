@@ -0,0 +1,39 @@
+"""add report cache entries
+
+Revision ID: 20260303_0022
+Revises: 20260302_0021
+Create Date: 2026-03-03 09:00:00
+"""
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "20260303_0022"
+down_revision: str | None = "20260302_0021"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "report_cache_entries",
+        sa.Column("cache_key", sa.String(length=64), nullable=False),
+        sa.Column("range_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("range_end", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("cache_key"),
+    )
+    op.create_index("ix_report_cache_entries_range", "report_cache_entries", ["range_start", "range_end"])
+    op.create_index("ix_report_cache_entries_expires_at", "report_cache_entries", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_report_cache_entries_expires_at", table_name="report_cache_entries")
+    op.drop_index("ix_report_cache_entries_range", table_name="report_cache_entries")
+    op.drop_table("report_cache_entries")
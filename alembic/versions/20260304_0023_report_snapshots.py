@@ -0,0 +1,46 @@
+"""add report snapshots
+
+Revision ID: 20260304_0023
+Revises: 20260303_0022
+Create Date: 2026-03-04 09:00:00
+"""
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "20260304_0023"
+down_revision: str | None = "20260303_0022"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "report_snapshots",
+        sa.Column("cache_key", sa.String(length=64), nullable=False),
+        sa.Column("scope_type", sa.String(length=16), nullable=False),
+        sa.Column("scope_id", sa.String(length=128), nullable=False, server_default=""),
+        sa.Column("period_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("period_end", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("range_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("range_end", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("generated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("cache_key"),
+    )
+    op.create_index(
+        "ix_report_snapshots_scope_period",
+        "report_snapshots",
+        ["scope_type", "scope_id", "period_start"],
+    )
+    op.create_index("ix_report_snapshots_range", "report_snapshots", ["range_start", "range_end"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_report_snapshots_range", table_name="report_snapshots")
+    op.drop_index("ix_report_snapshots_scope_period", table_name="report_snapshots")
+    op.drop_table("report_snapshots")
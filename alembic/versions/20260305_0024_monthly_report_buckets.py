@@ -0,0 +1,59 @@
+"""add monthly report buckets
+
+Revision ID: 20260305_0024
+Revises: 20260304_0023
+Create Date: 2026-03-05 09:00:00
+"""
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20260305_0024"
+down_revision: str | None = "20260304_0023"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "monthly_lead_buckets",
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("owner_id", sa.String(length=32), nullable=False),
+        sa.Column("status", sa.String(length=64), nullable=False),
+        sa.Column("level", sa.String(length=64), nullable=False),
+        sa.Column("loss_reason", sa.Text(), nullable=False),
+        sa.Column("leads", sa.Integer(), nullable=False),
+        sa.Column("first_created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("month", "owner_id", "status", "level", "loss_reason"),
+    )
+    op.create_index("ix_monthly_lead_buckets_owner_id_month", "monthly_lead_buckets", ["owner_id", "month"])
+    op.create_table(
+        "monthly_follow_up_buckets",
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("operator_staff_id", sa.String(length=32), nullable=False),
+        sa.Column("follow_ups", sa.Integer(), nullable=False),
+        sa.Column("first_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("month", "operator_staff_id"),
+    )
+    op.create_table(
+        "report_bucket_months",
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("built_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("month"),
+    )
+    # Buckets are filled by the nightly worker or scripts/rebuild-report-buckets.py; until then
+    # every month is read from the raw rows, which the created_at index keeps to range scans.
+    with op.get_context().autocommit_block():
+        op.execute(sa.text("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_leads_created_at ON leads (created_at)"))
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(sa.text("DROP INDEX CONCURRENTLY IF EXISTS ix_leads_created_at"))
+    op.drop_table("report_bucket_months")
+    op.drop_table("monthly_follow_up_buckets")
+    op.drop_index("ix_monthly_lead_buckets_owner_id_month", table_name="monthly_lead_buckets")
+    op.drop_table("monthly_lead_buckets")
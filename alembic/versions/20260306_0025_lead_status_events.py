@@ -0,0 +1,55 @@
+"""add lead status events
+
+Revision ID: 20260306_0025
+Revises: 20260305_0024
+Create Date: 2026-03-06 09:00:00
+"""
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20260306_0025"
+down_revision: str | None = "20260305_0024"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "lead_status_events",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("lead_id", sa.String(length=32), nullable=False),
+        sa.Column("from_status", sa.String(length=64), nullable=True),
+        sa.Column("to_status", sa.String(length=64), nullable=False),
+        sa.Column("owner_id", sa.String(length=32), nullable=True),
+        sa.Column("occurred_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["lead_id"], ["leads.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # No history exists before this table, so each lead is seeded with its current status as of its
+    # creation; reports over past periods then match the status-based counts they showed before.
+    op.execute(
+        sa.text(
+            """
+            INSERT INTO lead_status_events (lead_id, from_status, to_status, owner_id, occurred_at)
+            SELECT id, NULL, status, owner_id, created_at
+              FROM leads
+             ORDER BY created_at, id
+            """
+        )
+    )
+    op.create_index(
+        "ix_lead_status_events_occurred_at_to_status",
+        "lead_status_events",
+        ["occurred_at", "to_status"],
+    )
+    op.create_index("ix_lead_status_events_lead_id", "lead_status_events", ["lead_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_lead_status_events_lead_id", table_name="lead_status_events")
+    op.drop_index("ix_lead_status_events_occurred_at_to_status", table_name="lead_status_events")
+    op.drop_table("lead_status_events")
@@ -0,0 +1,36 @@
+"""add recycle run progress
+
+Revision ID: 20260307_0026
+Revises: 20260306_0025
+Create Date: 2026-03-07 09:00:00
+"""
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "20260307_0026"
+down_revision: str | None = "20260306_0025"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "recycle_runs",
+        sa.Column("run_key", sa.String(length=16), nullable=False),
+        sa.Column("last_lead_id", sa.String(length=32), nullable=True),
+        sa.Column("recycled_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("before_notified_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("after_notified_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("started_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("run_key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("recycle_runs")
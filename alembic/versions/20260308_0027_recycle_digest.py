@@ -0,0 +1,36 @@
+"""add recycle digest payloads
+
+Revision ID: 20260308_0027
+Revises: 20260307_0026
+Create Date: 2026-03-08 09:00:00
+"""
+
+from typing import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = "20260308_0027"
+down_revision: str | None = "20260307_0026"
+branch_labels: Sequence[str] | None = None
+depends_on: Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("system_notifications", sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column(
+        "recycle_runs",
+        sa.Column(
+            "digest",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+            server_default=sa.text("'{}'::jsonb"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("recycle_runs", "digest")
+    op.drop_column("system_notifications", "payload")
@@ -0,0 +1,69 @@
+from typing import Any
+import importlib
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dependencies import require_roles
+from app.core.response import success_response
+from app.db.session import get_db_session
+from app.schemas.analytics import ConversionAnalyticsData, PoolFlowAnalyticsData, RepCohortAnalyticsData
+from app.schemas.common import ApiEnvelope
+
+analytics_service = importlib.import_module("app.services.analytics_service")
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("/conversion", response_model=ApiEnvelope[ConversionAnalyticsData])
+async def get_conversion_by_source(
+    db: AsyncSession = Depends(get_db_session),
+    current_staff: dict[str, Any] = Depends(require_roles("admin", "manager")),
+    start_date: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    end_date: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    dept_name: str | None = Query(default=None),
+) -> dict[str, Any]:
+    data = await analytics_service.get_conversion_by_source(
+        db,
+        start_date=start_date,
+        end_date=end_date,
+        dept_name=dept_name,
+        current_staff=current_staff,
+    )
+    return success_response(data=data, message="操作成功")
+
+
+@router.get("/rep-cohorts", response_model=ApiEnvelope[RepCohortAnalyticsData])
+async def get_rep_cohorts(
+    db: AsyncSession = Depends(get_db_session),
+    current_staff: dict[str, Any] = Depends(require_roles("admin", "manager")),
+    start_date: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    end_date: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    dept_name: str | None = Query(default=None),
+) -> dict[str, Any]:
+    data = await analytics_service.get_rep_cohorts(
+        db,
+        start_date=start_date,
+        end_date=end_date,
+        dept_name=dept_name,
+        current_staff=current_staff,
+    )
+    return success_response(data=data, message="操作成功")
+
+
+@router.get("/pool-flow", response_model=ApiEnvelope[PoolFlowAnalyticsData])
+async def get_pool_flow(
+    db: AsyncSession = Depends(get_db_session),
+    current_staff: dict[str, Any] = Depends(require_roles("admin", "manager")),
+    start_date: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    end_date: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    dept_name: str | None = Query(default=None),
+) -> dict[str, Any]:
+    data = await analytics_service.get_pool_flow(
+        db,
+        start_date=start_date,
+        end_date=end_date,
+        dept_name=dept_name,
+        current_staff=current_staff,
+    )
+    return success_response(data=data, message="操作成功")
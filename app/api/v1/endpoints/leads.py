@@ -29,8 +29,11 @@ from app.schemas.lead import (
     LeadToPoolData,
     LeadToPoolRequest,
     LeadUpdate,
+    StaffLeadCounterListData,
+    StaffLeadCounterReconcileData,
 )
 leads_service = importlib.import_module("app.services.leads_service")
+lead_counter_service = importlib.import_module("app.services.lead_counter_service")
 
 router = APIRouter(tags=["leads"])
 
@@ -66,6 +69,25 @@ async def get_assignable_staff(
     return success_response(data=data, message="操作成功")
 
 
+@router.get("/leads/owner-counters", response_model=ApiEnvelope[StaffLeadCounterListData])
+async def get_staff_lead_counters(
+    db: AsyncSession = Depends(get_db_session),
+    current_staff: dict[str, Any] = Depends(require_roles("admin", "manager", "sales")),
+    staff_id: str | None = Query(default=None),
+) -> dict[str, Any]:
+    data = await lead_counter_service.list_staff_lead_counters(db, current_staff, staff_id=staff_id)
+    return success_response(data=data, message="操作成功")
+
+
+@router.post("/leads/owner-counters/reconcile", response_model=ApiEnvelope[StaffLeadCounterReconcileData])
+async def reconcile_staff_lead_counters(
+    db: AsyncSession = Depends(get_db_session),
+    _: dict[str, Any] = Depends(require_roles("admin")),
+) -> dict[str, Any]:
+    data = await lead_counter_service.reconcile_staff_lead_counters(db)
+    return success_response(data=data, message="操作成功")
+
+
 @router.post("/leads", response_model=ApiEnvelope[LeadOut])
 async def create_lead(
     payload: LeadCreate,
@@ -16,6 +16,8 @@ from app.schemas.pool import (
     PoolClaimData,
     PoolClaimRequest,
     PoolDeleteData,
+    PoolDistributeData,
+    PoolDistributeRequest,
     PoolListData,
     PoolTransferListData,
 )
@@ -74,6 +76,26 @@ async def assign_pool_leads(
     return success_response(data=data, message="操作成功")
 
 
+@router.post("/leads/distribute", response_model=ApiEnvelope[PoolDistributeData])
+async def distribute_pool_leads(
+    payload: PoolDistributeRequest,
+    db: AsyncSession = Depends(get_db_session),
+    current_staff: dict[str, Any] = Depends(require_roles("admin", "manager")),
+) -> dict[str, Any]:
+    data = await pool_service.distribute_pool_leads(
+        db,
+        staff_ids=payload.staff_ids,
+        strategy=payload.strategy,
+        count=payload.count,
+        current_staff=current_staff,
+        keyword=payload.keyword,
+        drop_reason=payload.drop_reason,
+        previous_owner=payload.previous_owner,
+        preview=payload.preview,
+    )
+    return success_response(data=data, message="操作成功")
+
+
 @router.get("/transfers", response_model=ApiEnvelope[PoolTransferListData])
 async def get_pool_transfers(
     db: AsyncSession = Depends(get_db_session),
@@ -81,6 +103,7 @@ async def get_pool_transfers(
     page_size: int = Query(default=20, ge=1, le=100),
     lead_id: str | None = Query(default=None),
     action: str | None = Query(default=None),
+    cursor: str | None = Query(default=None),
     _: dict[str, Any] = Depends(require_roles("admin", "manager")),
 ) -> dict[str, Any]:
     data = await pool_service.list_pool_transfers(
@@ -89,6 +112,7 @@ async def get_pool_transfers(
         page_size=page_size,
         lead_id=lead_id,
         action=action,
+        cursor=cursor,
     )
     return success_response(data=data, message="操作成功")
 
@@ -1,11 +1,15 @@
 from typing import Any
 import importlib
 
+from datetime import datetime
+
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import require_roles
 from app.core.response import success_response
+from app.core.tabular_export import iter_csv, iter_xlsx
 from app.db.session import get_db_session
 from app.schemas.common import ApiEnvelope
 from app.schemas.reports import ReportsOverviewData
@@ -19,7 +23,7 @@ router = APIRouter(prefix="/reports", tags=["reports"])
 async def get_reports_overview(
     db: AsyncSession = Depends(get_db_session),
     current_staff: dict[str, Any] = Depends(require_roles("admin", "manager", "sales")),
-    trend_window: str = Query(default="7days", pattern="^(7days|30days)$"),
+    trend_window: str = Query(default="7days", pattern="^(7days|30days|90days|365days)$"),
     start_date: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
     end_date: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
     dept_name: str | None = Query(default=None),
@@ -35,3 +39,39 @@ async def get_reports_overview(
         current_staff,
     )
     return success_response(data=data, message="操作成功")
+
+
+@router.get("/export")
+async def export_report_table(
+    db: AsyncSession = Depends(get_db_session),
+    current_staff: dict[str, Any] = Depends(require_roles("admin", "manager", "sales")),
+    table: str = Query(pattern="^(staffRanking|funnel|loss|trend)$"),
+    export_format: str = Query(default="csv", alias="format", pattern="^(csv|xlsx)$"),
+    trend_window: str = Query(default="7days", pattern="^(7days|30days|90days|365days)$"),
+    start_date: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    end_date: str | None = Query(default=None, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    dept_name: str | None = Query(default=None),
+    owner_id: str | None = Query(default=None),
+) -> StreamingResponse:
+    title, header, rows = await reports_service.build_report_export(
+        db,
+        table,
+        trend_window,
+        start_date,
+        end_date,
+        dept_name,
+        owner_id,
+        current_staff,
+    )
+    filename = f"report-{table}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{export_format}"
+    if export_format == "xlsx":
+        content = iter_xlsx(title, header, rows)
+        media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    else:
+        content = iter_csv(header, rows)
+        media_type = "text/csv; charset=utf-8"
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -4,6 +4,7 @@ import json
 import logging
 from datetime import datetime, timezone
 from typing import Any
+import importlib
 
 from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
 
@@ -16,6 +17,8 @@ from app.schemas.common import ApiEnvelope
 from app.schemas.ws import VoiceAssistPublishData, VoiceAssistPublishRequest
 from app.ws.bus import build_voice_assist_channel, get_message_bus
 
+dashboard_service = importlib.import_module("app.services.dashboard_service")
+
 router = APIRouter(prefix="/ws", tags=["ws"])
 logger = logging.getLogger(__name__)
 WS_SCHEMA_VERSION = "1.0"
@@ -72,6 +75,7 @@ async def publish_voice_assist_event(
 @router.websocket("/voice-assist/{staff_id}")
 async def voice_assist_ws(websocket: WebSocket, staff_id: str, token: str | None = Query(default=None)) -> None:
     verified_staff_id = staff_id
+    verified_role: str | None = None
     if settings.auth_enabled:
         if not token:
             await websocket.close(code=1008, reason="missing token")
@@ -82,6 +86,7 @@ async def voice_assist_ws(websocket: WebSocket, staff_id: str, token: str | None
             await websocket.close(code=1008, reason="staff mismatch")
             return
         verified_staff_id = token_staff_id
+        verified_role = str(payload.get("role") or "") or None
 
     bus = get_message_bus()
     channel = build_voice_assist_channel(verified_staff_id)
@@ -104,7 +109,18 @@ async def voice_assist_ws(websocket: WebSocket, staff_id: str, token: str | None
                 payload = {"type": "ai_hint", "content": raw_message}
             await websocket.send_json(_normalize_event(payload))
 
+    async def relay_dashboard_deltas(dashboard_channel: str, metrics: set[str] | None) -> None:
+        async for raw_message in bus.subscribe(dashboard_channel):
+            try:
+                payload = json.loads(raw_message)
+            except json.JSONDecodeError:
+                continue
+            if metrics is not None and payload.get("metric") not in metrics:
+                continue
+            await websocket.send_json(_normalize_event(payload))
+
     relay_task = asyncio.create_task(relay_bus_messages())
+    dashboard_tasks: list[asyncio.Task[None]] = []
     await asyncio.sleep(0)
 
     try:
@@ -120,6 +136,17 @@ async def voice_assist_ws(websocket: WebSocket, staff_id: str, token: str | None
                 await websocket.send_json(
                     _normalize_event({"type": "pong", "staffId": verified_staff_id})
                 )
+            elif event_type == "subscribe" and client_event.get("channel") == "dashboard":
+                if not dashboard_tasks:
+                    subscriptions = await dashboard_service.resolve_dashboard_subscriptions(
+                        verified_staff_id,
+                        verified_role,
+                    )
+                    dashboard_tasks = [
+                        asyncio.create_task(relay_dashboard_deltas(dashboard_channel, metrics))
+                        for dashboard_channel, metrics in subscriptions
+                    ]
+                await websocket.send_json(_normalize_event({"type": "subscribed", "channel": "dashboard"}))
             elif event_type == "publish_test":
                 content = client_event.get("content", "test message")
                 await _publish_with_retry(
@@ -130,6 +157,7 @@ async def voice_assist_ws(websocket: WebSocket, staff_id: str, token: str | None
     except WebSocketDisconnect:
         pass
     finally:
-        relay_task.cancel()
-        with contextlib.suppress(asyncio.CancelledError):
-            await relay_task
+        for task in [relay_task, *dashboard_tasks]:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 
+from app.api.v1.endpoints.analytics import router as analytics_router
 from app.api.v1.endpoints.auth import router as auth_router
 from app.api.v1.endpoints.dashboard import router as dashboard_router
 from app.api.v1.endpoints.dicts import router as dict_router
@@ -17,6 +18,7 @@ api_v1_router.include_router(leads_router)
 api_v1_router.include_router(notifications_router)
 api_v1_router.include_router(pool_router)
 api_v1_router.include_router(reports_router)
+api_v1_router.include_router(analytics_router)
 api_v1_router.include_router(dict_router)
 api_v1_router.include_router(settings_router)
 api_v1_router.include_router(ws_router)
@@ -0,0 +1,117 @@
+import asyncio
+import importlib
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, Protocol, TypeVar
+
+from app.core.config import settings
+
+
+T = TypeVar("T")
+
+
+class Cache(Protocol):
+    async def get(self, key: str) -> str | None: ...
+
+    async def set(self, key: str, value: str, ttl_seconds: int) -> None: ...
+
+    async def add(self, key: str, value: str, ttl_seconds: int) -> bool: ...
+
+    async def incr(self, key: str) -> int: ...
+
+    async def delete(self, *keys: str) -> None: ...
+
+
+class InMemoryCache:
+    def __init__(self) -> None:
+        self._items: dict[str, tuple[str, float | None]] = {}
+
+    def _live(self, key: str) -> str | None:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            _ = self._items.pop(key, None)
+            return None
+        return value
+
+    async def get(self, key: str) -> str | None:
+        return self._live(key)
+
+    async def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        self._items[key] = (value, time.monotonic() + ttl_seconds if ttl_seconds > 0 else None)
+
+    async def add(self, key: str, value: str, ttl_seconds: int) -> bool:
+        if self._live(key) is not None:
+            return False
+        await self.set(key, value, ttl_seconds)
+        return True
+
+    async def incr(self, key: str) -> int:
+        value = int(self._live(key) or 0) + 1
+        self._items[key] = (str(value), None)
+        return value
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            _ = self._items.pop(key, None)
+
+
+class RedisCache:
+    def __init__(self, redis_url: str) -> None:
+        self._redis_url: str = redis_url
+        self._redis: Any = None
+
+    async def _get_redis(self):
+        if self._redis is None:
+            redis_module = importlib.import_module("redis.asyncio")
+            self._redis = redis_module.Redis.from_url(self._redis_url, decode_responses=True)
+        return self._redis
+
+    async def get(self, key: str) -> str | None:
+        redis = await self._get_redis()
+        return await redis.get(key)
+
+    async def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        redis = await self._get_redis()
+        await redis.set(key, value, ex=ttl_seconds if ttl_seconds > 0 else None)
+
+    async def add(self, key: str, value: str, ttl_seconds: int) -> bool:
+        redis = await self._get_redis()
+        return bool(await redis.set(key, value, ex=ttl_seconds if ttl_seconds > 0 else None, nx=True))
+
+    async def incr(self, key: str) -> int:
+        redis = await self._get_redis()
+        return int(await redis.incr(key))
+
+    async def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        redis = await self._get_redis()
+        await redis.delete(*keys)
+
+
+_cache: Cache | None = None
+_inflight: dict[str, asyncio.Task[Any]] = {}
+
+
+def get_cache() -> Cache:
+    global _cache
+    if _cache is None:
+        if settings.message_bus_backend.lower() == "redis":
+            _cache = RedisCache(settings.redis_url)
+        else:
+            _cache = InMemoryCache()
+    return _cache
+
+
+async def single_flight(key: str, factory: Callable[[], Awaitable[T]]) -> T:
+    # Concurrent callers for the same key share one computation; a caller that is
+    # cancelled does not cancel the work the others are waiting on.
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(factory())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(task)
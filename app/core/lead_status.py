@@ -0,0 +1,42 @@
+from typing import Final
+
+
+LEAD_STATUS_SIGNED: Final[str] = "signed"
+LEAD_STATUS_DEPOSIT_PAID: Final[str] = "deposit_paid"
+LEAD_STATUS_INVITED: Final[str] = "invited"
+LEAD_STATUS_VISITED: Final[str] = "visited"
+
+TERMINAL_LEAD_STATUSES: Final[list[str]] = ["signed", "lost", "invalid"]
+LOST_LEAD_STATUSES: Final[list[str]] = ["lost", "invalid"]
+SIGNED_LEAD_STATUSES: Final[list[str]] = [LEAD_STATUS_SIGNED]
+DEPOSIT_LEAD_STATUSES: Final[list[str]] = [LEAD_STATUS_DEPOSIT_PAID]
+
+# Legacy labels that older imports and clients stored in leads.status.
+LEAD_STATUS_ALIASES: Final[dict[str, str]] = {
+    "待跟进": "pending",
+    "初步沟通": "communicating",
+    "深度跟进": "deep_following",
+    "已邀约": "invited",
+    "已到访": "visited",
+    "已交定金": "deposit_paid",
+    "已定金": "deposit_paid",
+    "已签约": "signed",
+    "无效线索": "invalid",
+    "无效客户": "invalid",
+    "战败流失": "lost",
+}
+
+ACTIVE_LEAD_STATUS_PREDICATE: Final[str] = "status NOT IN ({})".format(
+    ", ".join(f"'{status}'" for status in TERMINAL_LEAD_STATUSES)
+)
+
+
+def normalize_lead_status(value: str | None) -> str:
+    text = str(value or "").strip()
+    if not text:
+        return "pending"
+    return LEAD_STATUS_ALIASES.get(text, text)
+
+
+def is_active_status(status: str | None) -> bool:
+    return str(status or "") not in TERMINAL_LEAD_STATUSES
@@ -0,0 +1,124 @@
+import csv
+import io
+import re
+import zipfile
+from collections.abc import Iterable, Iterator
+from typing import Any
+from xml.sax.saxutils import escape
+
+
+EXPORT_CHUNK_ROWS = 500
+
+_XML_ILLEGAL_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_SHEET_NAME_ILLEGAL_RE = re.compile(r"[\[\]:*?/\\\x00-\x1f]")
+
+_CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    "</Types>"
+)
+_ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+_WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    "</Relationships>"
+)
+_SHEET_HEAD_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL_XML = "</sheetData></worksheet>"
+
+
+def iter_csv(header: list[str], rows: Iterable[list[Any]]) -> Iterator[bytes]:
+    # BOM first so Excel opens the UTF-8 file with the right encoding, matching the lead export.
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(header)
+    yield output.getvalue().encode("utf-8-sig")
+    pending = 0
+    output.seek(0)
+    output.truncate()
+    for row in rows:
+        writer.writerow(["" if value is None else value for value in row])
+        pending += 1
+        if pending >= EXPORT_CHUNK_ROWS:
+            yield output.getvalue().encode("utf-8")
+            output.seek(0)
+            output.truncate()
+            pending = 0
+    if pending:
+        yield output.getvalue().encode("utf-8")
+
+
+class _DrainableStream(io.RawIOBase):
+    # zipfile writes here; the generator hands each drained piece to the response.
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _cell_xml(value: Any) -> str:
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c t="n"><v>{value}</v></c>'
+    text = _XML_ILLEGAL_RE.sub("", "" if value is None else str(value))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def _row_xml(values: list[Any]) -> str:
+    return "<row>" + "".join(_cell_xml(value) for value in values) + "</row>"
+
+
+def iter_xlsx(sheet_name: str, header: list[str], rows: Iterable[list[Any]]) -> Iterator[bytes]:
+    # Single-sheet workbook with inline strings, written row by row into a non-seekable zip.
+    stream = _DrainableStream()
+    safe_name = escape(_SHEET_NAME_ILLEGAL_RE.sub("", sheet_name)[:31] or "Sheet1", {'"': "&quot;"})
+    with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES_XML)
+        archive.writestr("_rels/.rels", _ROOT_RELS_XML)
+        archive.writestr(
+            "xl/workbook.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{safe_name}" sheetId="1" r:id="rId1"/></sheets></workbook>',
+        )
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS_XML)
+        yield stream.drain()
+        with archive.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write((_SHEET_HEAD_XML + _row_xml(header)).encode("utf-8"))
+            for index, row in enumerate(rows, start=1):
+                sheet.write(_row_xml(list(row)).encode("utf-8"))
+                if index % EXPORT_CHUNK_ROWS == 0:
+                    yield stream.drain()
+            sheet.write(_SHEET_TAIL_XML.encode("utf-8"))
+    yield stream.drain()
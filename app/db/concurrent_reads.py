@@ -0,0 +1,43 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+
+
+ReadCall = Callable[[AsyncSession], Awaitable[Any]]
+
+
+def _global_slot_count() -> int:
+    # Fan-out sessions are opened while each request still holds its own connection, so they may
+    # use at most half of the engine pool; the rest stays available for request sessions.
+    pool_capacity = settings.db_pool_size + settings.db_max_overflow
+    return max(1, min(settings.db_read_fanout_global, pool_capacity // 2))
+
+
+# Process-wide cap so concurrent pages cannot drain the engine pool between them.
+_global_slots = asyncio.Semaphore(_global_slot_count())
+
+
+async def run_concurrent_reads(
+    session: AsyncSession,
+    *calls: ReadCall,
+    budget: int | None = None,
+) -> list[Any]:
+    # Each call gets its own pooled session, so results are not from one snapshot:
+    # only use this for independent read-only queries feeding a dashboard-style page.
+    limit = settings.db_read_fanout_per_request if budget is None else budget
+    if limit <= 1 or len(calls) <= 1:
+        return [await call(session) for call in calls]
+
+    request_slots = asyncio.Semaphore(limit)
+
+    async def _run(call: ReadCall) -> Any:
+        async with request_slots, _global_slots:
+            async with AsyncSessionLocal() as read_session:
+                return await call(read_session)
+
+    return list(await asyncio.gather(*(_run(call) for call in calls)))
@@ -9,6 +9,7 @@ from app.core.config import ensure_runtime_security
 from app.core.config import settings
 from app.core.exception_handlers import register_exception_handlers
 from app.core.response import success_response
+from app.services.platform_setting_service import listen_for_invalidations
 from app.services.recycle_runner_service import recycle_worker_loop
 
 
@@ -35,6 +36,29 @@ def create_app() -> FastAPI:
         app.state.recycle_worker_stop_event = stop_event
         app.state.recycle_worker_task = task
 
+    @app.on_event("startup")
+    async def _startup_platform_settings_listener() -> None:
+        if os.getenv("PYTEST_CURRENT_TEST"):
+            return
+        stop_event = asyncio.Event()
+        task = asyncio.create_task(listen_for_invalidations(stop_event))
+        app.state.platform_settings_stop_event = stop_event
+        app.state.platform_settings_task = task
+
+    @app.on_event("shutdown")
+    async def _shutdown_platform_settings_listener() -> None:
+        stop_event = getattr(app.state, "platform_settings_stop_event", None)
+        task = getattr(app.state, "platform_settings_task", None)
+        if stop_event is not None:
+            stop_event.set()
+        if task is not None:
+            # The listener blocks on the bus, so cancel rather than wait for the next message.
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
     @app.on_event("shutdown")
     async def _shutdown_recycle_worker() -> None:
         stop_event = getattr(app.state, "recycle_worker_stop_event", None)
@@ -2,12 +2,21 @@ from app.db.base import Base
 from app.models.dict_item import DictItem
 from app.models.department import Department
 from app.models.custom_field import CustomField
+from app.models.daily_lead_stat import DailyLeadStat
 from app.models.follow_up_record import FollowUpRecord
 from app.models.lead import Lead
+from app.models.lead_status_event import LeadStatusEvent
+from app.models.monthly_follow_up_bucket import MonthlyFollowUpBucket
+from app.models.monthly_lead_bucket import MonthlyLeadBucket
 from app.models.platform_setting import PlatformSetting
 from app.models.pool_transfer_log import PoolTransferLog
 from app.models.refresh_session import RefreshSession
+from app.models.report_bucket_month import ReportBucketMonth
+from app.models.report_cache_entry import ReportCacheEntry
+from app.models.report_snapshot import ReportSnapshot
 from app.models.recycle_rule import RecycleRule
+from app.models.recycle_run import RecycleRun
+from app.models.staff_lead_counter import StaffLeadCounter
 from app.models.system_role import SystemRole
 from app.models.system_notification import SystemNotification
 from app.models.user import User
@@ -16,6 +25,7 @@ __all__ = [
     "Base",
     "User",
     "Lead",
+    "LeadStatusEvent",
     "FollowUpRecord",
     "DictItem",
     "PoolTransferLog",
@@ -24,6 +34,14 @@ __all__ = [
     "Department",
     "SystemRole",
     "SystemNotification",
+    "StaffLeadCounter",
+    "DailyLeadStat",
+    "ReportCacheEntry",
+    "ReportSnapshot",
+    "MonthlyLeadBucket",
+    "MonthlyFollowUpBucket",
+    "ReportBucketMonth",
     "CustomField",
     "RecycleRule",
+    "RecycleRun",
 ]
@@ -0,0 +1,32 @@
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Index, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class DailyLeadStat(Base):
+    __tablename__ = "daily_lead_stats"
+    __table_args__ = (
+        Index("ix_daily_lead_stats_owner_id_day", "owner_id", "day"),
+        Index("ix_daily_lead_stats_dept_name_day", "dept_name", "day"),
+    )
+
+    # Lead rows are keyed by the lead's creation day and its current owner/source/status;
+    # follow-up rows are keyed by the follow-up day and operator, with empty source/status.
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    owner_id: Mapped[str] = mapped_column(String(32), primary_key=True, default="")
+    dept_name: Mapped[str] = mapped_column(String(128), primary_key=True, default="")
+    source: Mapped[str] = mapped_column(String(64), primary_key=True, default="")
+    status: Mapped[str] = mapped_column(String(64), primary_key=True, default="")
+    new_leads: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    follow_ups: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    signed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    deposit_paid: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
@@ -13,6 +13,7 @@ class FollowUpRecord(Base):
     __table_args__ = (
         Index("ix_follow_up_records_lead_id", "lead_id"),
         Index("ix_follow_up_records_timestamp", "timestamp"),
+        Index("ix_follow_up_records_operator_staff_timestamp", "operator_staff_id", "timestamp"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -24,6 +25,11 @@ class FollowUpRecord(Base):
     type: Mapped[str] = mapped_column(String(32), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     operator: Mapped[str] = mapped_column(String(64), nullable=False)
+    operator_staff_id: Mapped[str | None] = mapped_column(
+        String(32),
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True,
+    )
     timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     audio_url: Mapped[str | None] = mapped_column(String(512), nullable=True)
     ai_analysis: Mapped[dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
@@ -1,10 +1,11 @@
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import DateTime, ForeignKey, Index, String
+from sqlalchemy import DateTime, ForeignKey, Index, String, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
+from app.core.lead_status import ACTIVE_LEAD_STATUS_PREDICATE
 from app.db.base import Base
 from app.models.mixins import TimestampMixin
 
@@ -15,6 +16,43 @@ class Lead(TimestampMixin, Base):
         Index("ix_leads_status", "status"),
         Index("ix_leads_source", "source"),
         Index("ix_leads_owner_id", "owner_id"),
+        Index(
+            "ix_leads_pool_listing",
+            text("drop_time DESC"),
+            text("id DESC"),
+            postgresql_where=text("owner_id IS NULL"),
+        ),
+        Index(
+            "ix_leads_active_owner_follow_up",
+            "owner_id",
+            text("last_follow_up ASC NULLS FIRST"),
+            text("updated_at ASC"),
+            postgresql_where=text(f"owner_id IS NOT NULL AND {ACTIVE_LEAD_STATUS_PREDICATE}"),
+        ),
+        Index(
+            "ix_leads_active_follow_up",
+            text("last_follow_up ASC NULLS FIRST"),
+            text("updated_at ASC"),
+            postgresql_where=text(f"owner_id IS NOT NULL AND {ACTIVE_LEAD_STATUS_PREDICATE}"),
+        ),
+        Index("ix_leads_created_at", "created_at"),
+        Index(
+            "ix_leads_signed_created_at",
+            "created_at",
+            postgresql_where=text("status = 'signed'"),
+        ),
+        Index(
+            "ix_leads_pool_drop_reason_type",
+            "drop_reason_type",
+            text("drop_time DESC"),
+            postgresql_where=text("owner_id IS NULL"),
+        ),
+        Index(
+            "ix_leads_pool_original_owner_id",
+            "original_owner_id",
+            text("drop_time DESC"),
+            postgresql_where=text("owner_id IS NULL"),
+        ),
     )
 
     id: Mapped[str] = mapped_column(String(32), primary_key=True)
@@ -30,5 +68,8 @@ class Lead(TimestampMixin, Base):
         nullable=True,
     )
     last_follow_up: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    drop_reason_type: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    drop_time: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    original_owner_id: Mapped[str | None] = mapped_column(String(32), nullable=True)
     tags: Mapped[list[str]] = mapped_column(JSONB, nullable=False, default=list)
     dynamic_data: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False, default=dict)
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class LeadStatusEvent(Base):
+    __tablename__ = "lead_status_events"
+    __table_args__ = (
+        Index("ix_lead_status_events_occurred_at_to_status", "occurred_at", "to_status"),
+        Index("ix_lead_status_events_lead_id", "lead_id"),
+    )
+
+    # Append-only: one row each time a lead enters a status; from_status is NULL on creation.
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    lead_id: Mapped[str] = mapped_column(
+        String(32),
+        ForeignKey("leads.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    from_status: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    to_status: Mapped[str] = mapped_column(String(64), nullable=False)
+    owner_id: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,15 @@
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class MonthlyFollowUpBucket(Base):
+    __tablename__ = "monthly_follow_up_buckets"
+
+    month: Mapped[date] = mapped_column(Date, primary_key=True)
+    operator_staff_id: Mapped[str] = mapped_column(String(32), primary_key=True, default="")
+    follow_ups: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    first_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
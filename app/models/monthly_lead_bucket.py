@@ -0,0 +1,21 @@
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, Index, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class MonthlyLeadBucket(Base):
+    __tablename__ = "monthly_lead_buckets"
+    __table_args__ = (Index("ix_monthly_lead_buckets_owner_id_month", "owner_id", "month"),)
+
+    # Leads created in a closed UTC month, grouped by every dimension the reports filter or
+    # group on; loss_reason is only set for lost statuses.
+    month: Mapped[date] = mapped_column(Date, primary_key=True)
+    owner_id: Mapped[str] = mapped_column(String(32), primary_key=True, default="")
+    status: Mapped[str] = mapped_column(String(64), primary_key=True)
+    level: Mapped[str] = mapped_column(String(64), primary_key=True)
+    loss_reason: Mapped[str] = mapped_column(Text, primary_key=True, default="")
+    leads: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    first_created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
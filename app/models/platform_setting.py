@@ -22,3 +22,4 @@ class PlatformSetting(TimestampMixin, Base):
     ai_base_url: Mapped[str] = mapped_column(String(255), nullable=False, default="https://api.openai.com/v1")
     ai_model: Mapped[str] = mapped_column(String(128), nullable=False, default="gpt-4o-mini")
     ai_timeout_seconds: Mapped[int] = mapped_column(Integer, nullable=False, default=12)
+    report_timezone: Mapped[str] = mapped_column(String(64), nullable=False, default="Asia/Shanghai")
@@ -1,20 +1,29 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Sequence, String, Text, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
 
 
+POOL_TRANSFER_LOG_ID_SEQ = Sequence("pool_transfer_logs_id_seq")
+
+
 class PoolTransferLog(Base):
     __tablename__ = "pool_transfer_logs"
     __table_args__ = (
-        Index("ix_pool_transfer_logs_lead_id", "lead_id"),
+        Index("ix_pool_transfer_logs_lead_id_created_at", "lead_id", "created_at"),
         Index("ix_pool_transfer_logs_action", "action"),
-        Index("ix_pool_transfer_logs_created_at", "created_at"),
+        Index("ix_pool_transfer_logs_created_at_id", text("created_at DESC"), text("id DESC")),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(
+        Integer,
+        POOL_TRANSFER_LOG_ID_SEQ,
+        primary_key=True,
+        server_default=POOL_TRANSFER_LOG_ID_SEQ.next_value(),
+    )
     lead_id: Mapped[str] = mapped_column(
         String(32),
         ForeignKey("leads.id", ondelete="CASCADE"),
@@ -25,4 +34,9 @@ class PoolTransferLog(Base):
     to_owner_id: Mapped[str | None] = mapped_column(String(32), nullable=True)
     operator_staff_id: Mapped[str] = mapped_column(String(32), nullable=False)
     note: Mapped[str | None] = mapped_column(Text, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
+        nullable=False,
+        server_default=func.now(),
+    )
@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import DateTime, Integer, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class RecycleRun(Base):
+    __tablename__ = "recycle_runs"
+
+    # One row per run day; last_lead_id is the last candidate whose chunk was committed, so an
+    # interrupted run resumes after it. finished_at is set once every candidate was processed.
+    run_key: Mapped[str] = mapped_column(String(16), primary_key=True)
+    last_lead_id: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    recycled_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    before_notified_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    after_notified_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Recycled leads of this pass by reason and department, sent to supervisors when the run finishes.
+    digest: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False, default=dict)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
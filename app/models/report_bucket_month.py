@@ -0,0 +1,14 @@
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ReportBucketMonth(Base):
+    __tablename__ = "report_bucket_months"
+
+    # A row means the month's buckets are complete; months without one are read from raw rows.
+    month: Mapped[date] = mapped_column(Date, primary_key=True)
+    built_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import DateTime, Index, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ReportCacheEntry(Base):
+    __tablename__ = "report_cache_entries"
+    __table_args__ = (
+        Index("ix_report_cache_entries_range", "range_start", "range_end"),
+        Index("ix_report_cache_entries_expires_at", "expires_at"),
+    )
+
+    # cache_key hashes (scope, period, filters); range_start/range_end span every period the
+    # entry aggregates so a backdated write can find the entries it invalidates.
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    range_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    range_end: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    # NULL keeps the entry until a purge; set for periods that are still open.
+    expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,91 @@
+from collections.abc import AsyncIterator
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+
+
+# table -> (export query, DuckDB column types in query order). Contact details and free text
+# (names of leads, phones, follow-up content, notes) stay out of the analytics copies.
+SNAPSHOT_TABLES: dict[str, tuple[str, dict[str, str]]] = {
+    "leads": (
+        """
+        SELECT id, project, source, status, level, owner_id, original_owner_id,
+               drop_reason_type, drop_time, last_follow_up, created_at
+          FROM leads
+         ORDER BY created_at, id
+        """,
+        {
+            "id": "VARCHAR",
+            "project": "VARCHAR",
+            "source": "VARCHAR",
+            "status": "VARCHAR",
+            "level": "VARCHAR",
+            "owner_id": "VARCHAR",
+            "original_owner_id": "VARCHAR",
+            "drop_reason_type": "VARCHAR",
+            "drop_time": "TIMESTAMPTZ",
+            "last_follow_up": "TIMESTAMPTZ",
+            "created_at": "TIMESTAMPTZ",
+        },
+    ),
+    "follow_up_records": (
+        """
+        SELECT id, lead_id, type, operator_staff_id, timestamp
+          FROM follow_up_records
+         ORDER BY timestamp, id
+        """,
+        {
+            "id": "BIGINT",
+            "lead_id": "VARCHAR",
+            "type": "VARCHAR",
+            "operator_staff_id": "VARCHAR",
+            "timestamp": "TIMESTAMPTZ",
+        },
+    ),
+    "pool_transfer_logs": (
+        """
+        SELECT id, lead_id, action, from_owner_id, to_owner_id, operator_staff_id, created_at
+          FROM pool_transfer_logs
+         ORDER BY created_at, id
+        """,
+        {
+            "id": "BIGINT",
+            "lead_id": "VARCHAR",
+            "action": "VARCHAR",
+            "from_owner_id": "VARCHAR",
+            "to_owner_id": "VARCHAR",
+            "operator_staff_id": "VARCHAR",
+            "created_at": "TIMESTAMPTZ",
+        },
+    ),
+    # Small dimension table so analytics can group by rep and department.
+    "users": (
+        """
+        SELECT id, name, role, dept_name, active, created_at
+          FROM users
+         ORDER BY id
+        """,
+        {
+            "id": "VARCHAR",
+            "name": "VARCHAR",
+            "role": "VARCHAR",
+            "dept_name": "VARCHAR",
+            "active": "BOOLEAN",
+            "created_at": "TIMESTAMPTZ",
+        },
+    ),
+}
+
+
+async def stream_table_rows(session: AsyncSession, table: str) -> AsyncIterator[Any]:
+    query, _ = SNAPSHOT_TABLES[table]
+    result = await session.stream(text(query), execution_options={"yield_per": 5000})
+    async for row in result:
+        yield row
+
+
+async def get_user(session: AsyncSession, user_id: str) -> User | None:
+    return await session.get(User, user_id)
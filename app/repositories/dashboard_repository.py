@@ -1,162 +1,232 @@
 from datetime import datetime
 
-from sqlalchemy import func, select
+from sqlalchemy import ColumnElement, Select, and_, bindparam, false, func, literal, select, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.follow_up_record import FollowUpRecord
+from app.core.lead_status import TERMINAL_LEAD_STATUSES
+from app.models.daily_lead_stat import DailyLeadStat
+from app.models.department import Department
 from app.models.user import User
 from app.models.lead import Lead
-from app.models.platform_setting import PlatformSetting
 
 
-async def count_leads_between(
-    session: AsyncSession,
-    *,
-    start_at: datetime,
-    end_at: datetime,
-    owner_id: str | None = None,
-    dept_name: str | None = None,
-) -> int:
-    stmt = select(func.count()).select_from(Lead).where(Lead.created_at >= start_at, Lead.created_at < end_at)
-    if owner_id:
-        stmt = stmt.where(Lead.owner_id == owner_id)
-    if dept_name:
-        stmt = stmt.join(User, User.id == Lead.owner_id, isouter=True).where(User.dept_name == dept_name)
-    value = await session.scalar(stmt)
-    return int(value or 0)
+def _active_status_filter() -> ColumnElement[bool]:
+    # Inline the literals so the planner can match the partial indexes on active statuses.
+    terminal = bindparam("terminal_statuses", TERMINAL_LEAD_STATUSES, expanding=True, literal_execute=True)
+    return Lead.status.not_in(terminal)
 
 
-async def count_signed_leads_between(
-    session: AsyncSession,
-    *,
-    start_at: datetime,
-    end_at: datetime,
-    owner_id: str | None = None,
-    dept_name: str | None = None,
-) -> int:
+_FOLLOW_UP_ORDER = (Lead.last_follow_up.asc().nullsfirst(), Lead.updated_at.asc())
+_POOL_WARNING_ORDER = (Lead.drop_time.asc(), Lead.id.asc())
+
+
+async def get_overview_context(session: AsyncSession, staff_id: str) -> tuple[User | None, int]:
+    if not staff_id:
+        return None, 0
     stmt = (
-        select(func.count())
-        .select_from(Lead)
-        .where(
-            Lead.created_at >= start_at,
-            Lead.created_at < end_at,
-            Lead.status.in_(["signed", "已签约"]),
-        )
+        select(User, Department.monthly_target)
+        .outerjoin(Department, Department.name == User.dept_name)
+        .where(User.id == staff_id)
+        .limit(1)
     )
+    row = (await session.execute(stmt)).first()
+    if row is None:
+        return None, 0
+    return row[0], int(row[1] or 0)
+
+
+def _scope_stats(stmt: Select, *, owner_id: str | None, dept_name: str | None) -> Select:
+    # Rollup rows keep the department at write time; scope by the owner's current department
+    # like the lead queries do.
     if owner_id:
-        stmt = stmt.where(Lead.owner_id == owner_id)
+        stmt = stmt.where(DailyLeadStat.owner_id == owner_id)
     if dept_name:
-        stmt = stmt.join(User, User.id == Lead.owner_id, isouter=True).where(User.dept_name == dept_name)
-    value = await session.scalar(stmt)
-    return int(value or 0)
+        stmt = stmt.join(User, User.id == DailyLeadStat.owner_id).where(User.dept_name == dept_name)
+    return stmt
 
 
-async def count_deposit_leads_between(
+def _sum_where(column, *conditions: ColumnElement[bool]) -> ColumnElement[int]:
+    return func.coalesce(func.sum(column).filter(*conditions), 0)
+
+
+async def count_lead_overview(
     session: AsyncSession,
     *,
-    start_at: datetime,
-    end_at: datetime,
+    now: datetime,
+    today_start: datetime,
+    yesterday_start: datetime,
+    month_start: datetime,
+    prev_month_start: datetime,
     owner_id: str | None = None,
     dept_name: str | None = None,
-) -> int:
-    stmt = (
-        select(func.count())
-        .select_from(Lead)
-        .where(
-            Lead.created_at >= start_at,
-            Lead.created_at < end_at,
-            Lead.status.in_(["deposit_paid", "已定金", "已交定金"]),
-        )
+    personal_owner_id: str | None = None,
+    department_name: str | None = None,
+) -> dict[str, int]:
+    # All bounds are UTC midnights, so whole daily_lead_stats days answer each counter; lead rows
+    # are keyed by creation day with the lead's current status.
+    day = DailyLeadStat.day
+    this_month = day >= month_start.date()
+    prev_month = and_(day >= prev_month_start.date(), day < month_start.date())
+    personal_month = and_(this_month, DailyLeadStat.owner_id == personal_owner_id) if personal_owner_id else this_month
+    department_month = and_(this_month, User.dept_name == department_name) if department_name else false()
+    stmt = select(
+        _sum_where(DailyLeadStat.new_leads, day == today_start.date()).label("today_new"),
+        _sum_where(DailyLeadStat.new_leads, day == yesterday_start.date()).label("yesterday_new"),
+        _sum_where(DailyLeadStat.signed, this_month).label("month_signed"),
+        _sum_where(DailyLeadStat.signed, prev_month).label("prev_month_signed"),
+        _sum_where(DailyLeadStat.signed, personal_month).label("personal_signed"),
+        _sum_where(DailyLeadStat.signed, department_month).label("department_signed"),
+    ).where(
+        day >= min(yesterday_start, prev_month_start).date(),
+        day <= now.date(),
     )
     if owner_id:
-        stmt = stmt.where(Lead.owner_id == owner_id)
+        stmt = stmt.where(DailyLeadStat.owner_id == owner_id)
+    if dept_name or department_name:
+        stmt = stmt.select_from(DailyLeadStat).join(User, User.id == DailyLeadStat.owner_id, isouter=True)
     if dept_name:
-        stmt = stmt.join(User, User.id == Lead.owner_id, isouter=True).where(User.dept_name == dept_name)
-    value = await session.scalar(stmt)
-    return int(value or 0)
+        stmt = stmt.where(User.dept_name == dept_name)
+    row = (await session.execute(stmt)).one()
+    return {key: int(value or 0) for key, value in row._mapping.items()}
 
 
-async def count_followups_between(
+async def count_deposit_leads_between(
     session: AsyncSession,
     *,
     start_at: datetime,
     end_at: datetime,
-    operator_keys: list[str] | None = None,
+    owner_id: str | None = None,
+    dept_name: str | None = None,
 ) -> int:
-    stmt = (
-        select(func.count())
-        .select_from(FollowUpRecord)
-        .where(FollowUpRecord.timestamp >= start_at, FollowUpRecord.timestamp < end_at)
+    # start_at/end_at are UTC midnights.
+    stmt = select(func.coalesce(func.sum(DailyLeadStat.deposit_paid), 0)).where(
+        DailyLeadStat.day >= start_at.date(),
+        DailyLeadStat.day < end_at.date(),
     )
-    if operator_keys:
-        stmt = stmt.where(FollowUpRecord.operator.in_(operator_keys))
+    stmt = _scope_stats(stmt, owner_id=owner_id, dept_name=dept_name)
     value = await session.scalar(stmt)
     return int(value or 0)
 
 
-async def list_todo_leads(
+async def count_followup_overview(
     session: AsyncSession,
+    *,
+    now: datetime,
+    week_start: datetime,
+    prev_week_start: datetime,
+    operator_staff_id: str | None = None,
+) -> dict[str, int]:
+    # Follow-up rows are keyed by UTC day and the operator resolved to a staff ID.
+    day = DailyLeadStat.day
+    stmt = select(
+        _sum_where(DailyLeadStat.follow_ups, day >= week_start.date()).label("week_followups"),
+        _sum_where(DailyLeadStat.follow_ups, day < week_start.date()).label("prev_week_followups"),
+    ).where(day >= prev_week_start.date(), day <= now.date())
+    stmt = _scope_stats(stmt, owner_id=operator_staff_id, dept_name=None)
+    row = (await session.execute(stmt)).one()
+    return {key: int(value or 0) for key, value in row._mapping.items()}
+
+
+def build_todo_leads_query(
     limit: int = 4,
     owner_id: str | None = None,
     dept_name: str | None = None,
-) -> list[Lead]:
+) -> Select[tuple[Lead]]:
     stmt = (
         select(Lead)
-        .where(Lead.owner_id.is_not(None), Lead.status.not_in(["signed", "已签约", "lost", "战败流失", "invalid", "无效线索", "无效客户"]))
-        .order_by(Lead.last_follow_up.asc().nullsfirst(), Lead.updated_at.asc())
+        .where(Lead.owner_id.is_not(None), _active_status_filter())
+        .order_by(*_FOLLOW_UP_ORDER)
         .limit(limit)
     )
     if owner_id:
         stmt = stmt.where(Lead.owner_id == owner_id)
     if dept_name:
         stmt = stmt.join(User, User.id == Lead.owner_id, isouter=True).where(User.dept_name == dept_name)
-    result = await session.execute(stmt)
-    return list(result.scalars().all())
+    return stmt
 
 
-async def list_pool_warning_leads(
-    session: AsyncSession,
+def build_pool_warning_query(
     limit: int = 2,
     owner_id: str | None = None,
     dept_name: str | None = None,
-) -> list[Lead]:
+) -> Select[tuple[Lead]]:
     if owner_id:
-        stmt = (
+        return (
             select(Lead)
             .where(
                 Lead.owner_id == owner_id,
-            Lead.status.not_in(["signed", "已签约", "lost", "战败流失", "invalid", "无效线索", "无效客户"]),
+                _active_status_filter(),
             )
-            .order_by(Lead.last_follow_up.asc().nullsfirst(), Lead.updated_at.asc())
+            .order_by(*_FOLLOW_UP_ORDER)
             .limit(limit)
         )
-    elif dept_name:
-        stmt = (
+    if dept_name:
+        return (
             select(Lead)
             .join(User, User.id == Lead.owner_id)
             .where(
                 User.dept_name == dept_name,
-            Lead.status.not_in(["signed", "已签约", "lost", "战败流失", "invalid", "无效线索", "无效客户"]),
+                _active_status_filter(),
             )
-            .order_by(Lead.last_follow_up.asc().nullsfirst(), Lead.updated_at.asc())
+            .order_by(*_FOLLOW_UP_ORDER)
             .limit(limit)
         )
-    else:
-        stmt = (
-            select(Lead)
-            .where(Lead.owner_id.is_(None))
-            .order_by(Lead.updated_at.asc())
-            .limit(limit)
-        )
-    result = await session.execute(stmt)
-    return list(result.scalars().all())
+    return (
+        select(Lead)
+        .where(Lead.owner_id.is_(None))
+        .order_by(*_POOL_WARNING_ORDER)
+        .limit(limit)
+    )
 
 
-async def get_platform_setting(session: AsyncSession) -> PlatformSetting | None:
-    stmt = select(PlatformSetting).order_by(PlatformSetting.id.asc()).limit(1)
+async def list_overview_leads(
+    session: AsyncSession,
+    *,
+    todo_limit: int = 4,
+    warning_limit: int = 2,
+    owner_id: str | None = None,
+    dept_name: str | None = None,
+) -> tuple[list[Lead], list[Lead]]:
+    if owner_id or dept_name:
+        # Scoped warnings are the stalest owned leads, i.e. the head of the todo list.
+        result = await session.execute(
+            build_todo_leads_query(max(todo_limit, warning_limit), owner_id=owner_id, dept_name=dept_name)
+        )
+        leads = list(result.scalars().all())
+        return leads[:todo_limit], leads[:warning_limit]
+
+    ranked = union_all(
+        build_todo_leads_query(todo_limit).with_only_columns(
+            Lead.id,
+            literal("todo").label("kind"),
+            func.row_number().over(order_by=_FOLLOW_UP_ORDER).label("position"),
+        ),
+        build_pool_warning_query(warning_limit).with_only_columns(
+            Lead.id,
+            literal("pool").label("kind"),
+            func.row_number().over(order_by=_POOL_WARNING_ORDER).label("position"),
+        ),
+    ).subquery()
+    stmt = (
+        select(Lead, ranked.c.kind)
+        .join(ranked, ranked.c.id == Lead.id)
+        .order_by(ranked.c.kind.desc(), ranked.c.position.asc())
+    )
     result = await session.execute(stmt)
-    return result.scalar_one_or_none()
+    todo_leads: list[Lead] = []
+    warning_leads: list[Lead] = []
+    for lead, kind in result.all():
+        (todo_leads if kind == "todo" else warning_leads).append(lead)
+    return todo_leads, warning_leads
 
 
 async def get_user(session: AsyncSession, user_id: str) -> User | None:
     return await session.get(User, user_id)
+
+
+async def list_dept_names(session: AsyncSession, user_ids: list[str]) -> list[str]:
+    if not user_ids:
+        return []
+    stmt = select(User.dept_name).where(User.id.in_(user_ids), User.dept_name.is_not(None)).distinct()
+    result = await session.execute(stmt)
+    return sorted(str(name) for name in result.scalars().all() if name)
@@ -0,0 +1,99 @@
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.lead_status import ACTIVE_LEAD_STATUS_PREDICATE
+from app.models.staff_lead_counter import StaffLeadCounter
+
+
+async def increment_counters(session: AsyncSession, deltas: dict[str, int]) -> None:
+    rows = [
+        {"staff_id": staff_id, "active_leads": delta}
+        for staff_id, delta in sorted(deltas.items())
+        if delta != 0
+    ]
+    if not rows:
+        return
+    stmt = insert(StaffLeadCounter).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[StaffLeadCounter.staff_id],
+        set_={
+            "active_leads": StaffLeadCounter.active_leads + stmt.excluded.active_leads,
+            "updated_at": func.now(),
+        },
+    )
+    await session.execute(stmt)
+
+
+async def get_counter(session: AsyncSession, staff_id: str) -> StaffLeadCounter | None:
+    return await session.get(StaffLeadCounter, staff_id)
+
+
+async def get_counts(session: AsyncSession, staff_ids: list[str]) -> dict[str, int]:
+    if not staff_ids:
+        return {}
+    stmt = select(StaffLeadCounter.staff_id, StaffLeadCounter.active_leads).where(
+        StaffLeadCounter.staff_id.in_(staff_ids)
+    )
+    result = await session.execute(stmt)
+    return {str(staff_id): int(count) for staff_id, count in result.all()}
+
+
+async def lock_counts(session: AsyncSession, staff_ids: list[str]) -> dict[str, int]:
+    # Rows are created first so every target can be locked; staff id order avoids deadlocks.
+    if not staff_ids:
+        return {}
+    ordered_ids = sorted(set(staff_ids))
+    await session.execute(
+        insert(StaffLeadCounter)
+        .values([{"staff_id": staff_id, "active_leads": 0} for staff_id in ordered_ids])
+        .on_conflict_do_nothing(index_elements=[StaffLeadCounter.staff_id])
+    )
+    stmt = (
+        select(StaffLeadCounter.staff_id, StaffLeadCounter.active_leads)
+        .where(StaffLeadCounter.staff_id.in_(ordered_ids))
+        .order_by(StaffLeadCounter.staff_id.asc())
+        .with_for_update()
+    )
+    result = await session.execute(stmt)
+    return {str(staff_id): int(count) for staff_id, count in result.all()}
+
+
+# Drift is applied as a delta in one statement: the counts and the stored values come from the
+# same snapshot, while the update adds to the row's latest value, so increments committed by
+# concurrent assigns or recycles are kept instead of being overwritten.
+_RECONCILE_COUNTERS_SQL = text(
+    f"""
+    WITH actual AS (
+        SELECT owner_id AS staff_id, count(*) AS active_leads
+          FROM leads
+         WHERE owner_id IS NOT NULL AND {ACTIVE_LEAD_STATUS_PREDICATE}
+         GROUP BY owner_id
+    ), drift AS (
+        SELECT coalesce(a.staff_id, c.staff_id) AS staff_id,
+               c.active_leads AS stored,
+               coalesce(a.active_leads, 0) AS actual
+          FROM actual AS a
+          FULL JOIN staff_lead_counters AS c ON c.staff_id = a.staff_id
+    ), fixed AS (
+        INSERT INTO staff_lead_counters (staff_id, active_leads)
+        SELECT staff_id, actual - coalesce(stored, 0)
+          FROM drift
+         WHERE stored IS DISTINCT FROM actual
+        ON CONFLICT (staff_id) DO UPDATE
+           SET active_leads = staff_lead_counters.active_leads + EXCLUDED.active_leads,
+               updated_at = now()
+        RETURNING staff_id
+    )
+    SELECT staff_id, stored, actual FROM drift ORDER BY staff_id
+    """
+)
+
+
+async def reconcile_counts(session: AsyncSession) -> list[tuple[str, int | None, int]]:
+    result = await session.execute(_RECONCILE_COUNTERS_SQL)
+    return [(str(staff_id), stored, int(actual)) for staff_id, stored, actual in result.all()]
+
+
+async def commit(session: AsyncSession) -> None:
+    await session.commit()
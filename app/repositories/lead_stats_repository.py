@@ -0,0 +1,167 @@
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import delete, func, literal_column, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.daily_lead_stat import DailyLeadStat
+from app.models.follow_up_record import FollowUpRecord
+from app.models.user import User
+
+
+_REBUILD_LEAD_ROWS_SQL = text(
+    """
+    INSERT INTO daily_lead_stats (day, owner_id, dept_name, source, status, new_leads, follow_ups, signed, deposit_paid)
+    SELECT (l.created_at AT TIME ZONE 'UTC')::date,
+           coalesce(l.owner_id, ''),
+           coalesce(u.dept_name, ''),
+           l.source,
+           l.status,
+           count(*),
+           0,
+           CASE WHEN l.status = ANY(:signed_statuses) THEN count(*) ELSE 0 END,
+           CASE WHEN l.status = ANY(:deposit_statuses) THEN count(*) ELSE 0 END
+      FROM leads AS l
+      LEFT JOIN users AS u ON u.id = l.owner_id
+     WHERE l.created_at >= :start_at
+       AND l.created_at < :end_at
+     GROUP BY 1, 2, 3, 4, 5
+    """
+)
+
+_REBUILD_FOLLOW_UP_ROWS_SQL = text(
+    """
+    INSERT INTO daily_lead_stats (day, owner_id, dept_name, source, status, new_leads, follow_ups, signed, deposit_paid)
+    SELECT (f.timestamp AT TIME ZONE 'UTC')::date,
+           coalesce(op.id, ''),
+           coalesce(op.dept_name, ''),
+           '',
+           '',
+           0,
+           count(*),
+           0,
+           0
+      FROM follow_up_records AS f
+      LEFT JOIN LATERAL (
+            SELECT u.id, u.dept_name
+              FROM users AS u
+             WHERE u.id = coalesce(f.operator_staff_id, f.operator)
+                OR (f.operator_staff_id IS NULL AND u.name = f.operator)
+             ORDER BY (u.id = coalesce(f.operator_staff_id, f.operator)) DESC, u.id
+             LIMIT 1
+      ) AS op ON true
+     WHERE f.timestamp >= :start_at
+       AND f.timestamp < :end_at
+     GROUP BY 1, 2, 3
+    ON CONFLICT (day, owner_id, dept_name, source, status)
+    DO UPDATE SET follow_ups = daily_lead_stats.follow_ups + EXCLUDED.follow_ups
+    """
+)
+
+
+async def upsert_stat_deltas(session: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    if not rows:
+        return
+    stmt = insert(DailyLeadStat).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            DailyLeadStat.day,
+            DailyLeadStat.owner_id,
+            DailyLeadStat.dept_name,
+            DailyLeadStat.source,
+            DailyLeadStat.status,
+        ],
+        set_={
+            "new_leads": DailyLeadStat.new_leads + stmt.excluded.new_leads,
+            "follow_ups": DailyLeadStat.follow_ups + stmt.excluded.follow_ups,
+            "signed": DailyLeadStat.signed + stmt.excluded.signed,
+            "deposit_paid": DailyLeadStat.deposit_paid + stmt.excluded.deposit_paid,
+            "updated_at": func.now(),
+        },
+    )
+    await session.execute(stmt)
+
+
+async def map_dept_names(session: AsyncSession, user_ids: list[str]) -> dict[str, str]:
+    if not user_ids:
+        return {}
+    result = await session.execute(select(User.id, User.dept_name).where(User.id.in_(user_ids)))
+    return {str(user_id): str(dept_name or "") for user_id, dept_name in result.all()}
+
+
+async def resolve_operators(session: AsyncSession, operators: list[str]) -> dict[str, tuple[str, str]]:
+    # Follow-up operators are stored as a staff ID or a display name; prefer an ID match,
+    # then the lowest ID sharing the name, matching the rebuild query.
+    if not operators:
+        return {}
+    stmt = (
+        select(User.id, User.name, User.dept_name)
+        .where((User.id.in_(operators)) | (User.name.in_(operators)))
+        .order_by(User.id.asc())
+    )
+    result = await session.execute(stmt)
+    by_id: dict[str, tuple[str, str]] = {}
+    by_name: dict[str, tuple[str, str]] = {}
+    for user_id, name, dept_name in result.all():
+        resolved = (str(user_id), str(dept_name or ""))
+        by_id[str(user_id)] = resolved
+        by_name.setdefault(str(name), resolved)
+    return {
+        operator: by_id.get(operator) or by_name.get(operator) or ("", "")
+        for operator in operators
+    }
+
+
+async def count_follow_ups_by_day_operator(
+    session: AsyncSession,
+    lead_ids: list[str],
+) -> list[tuple[date, str, str | None, int]]:
+    # (day, operator as recorded for the rollup, operator_staff_id for the monthly buckets, count).
+    if not lead_ids:
+        return []
+    day = func.date(func.timezone(literal_column("'UTC'"), FollowUpRecord.timestamp))
+    operator = func.coalesce(FollowUpRecord.operator_staff_id, FollowUpRecord.operator)
+    stmt = (
+        select(day, operator, FollowUpRecord.operator_staff_id, func.count())
+        .where(FollowUpRecord.lead_id.in_(lead_ids))
+        .group_by(day, operator, FollowUpRecord.operator_staff_id)
+    )
+    result = await session.execute(stmt)
+    return [
+        (value, str(operator), staff_id, int(count))
+        for value, operator, staff_id, count in result.all()
+    ]
+
+
+async def lock_for_rebuild(session: AsyncSession) -> None:
+    # Blocks concurrent delta upserts until the rebuild commits, so no write is lost or double counted.
+    await session.execute(text("LOCK TABLE daily_lead_stats IN EXCLUSIVE MODE"))
+
+
+async def delete_range(session: AsyncSession, start_day: date, end_day: date) -> None:
+    await session.execute(delete(DailyLeadStat).where(DailyLeadStat.day >= start_day, DailyLeadStat.day < end_day))
+
+
+async def insert_rebuilt_rows(
+    session: AsyncSession,
+    *,
+    start_at: datetime,
+    end_at: datetime,
+    signed_statuses: list[str],
+    deposit_statuses: list[str],
+) -> None:
+    await session.execute(
+        _REBUILD_LEAD_ROWS_SQL,
+        {
+            "start_at": start_at,
+            "end_at": end_at,
+            "signed_statuses": signed_statuses,
+            "deposit_statuses": deposit_statuses,
+        },
+    )
+    await session.execute(_REBUILD_FOLLOW_UP_ROWS_SQL, {"start_at": start_at, "end_at": end_at})
+
+
+async def commit(session: AsyncSession) -> None:
+    await session.commit()
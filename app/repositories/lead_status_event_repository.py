@@ -0,0 +1,23 @@
+from datetime import date
+from typing import Any
+
+from sqlalchemy import func, insert, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.lead_status_event import LeadStatusEvent
+
+
+async def insert_events(session: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    if not rows:
+        return
+    await session.execute(insert(LeadStatusEvent), rows)
+
+
+async def list_event_days(session: AsyncSession, lead_ids: list[str]) -> list[date]:
+    # UTC days of the events that cascade away with these leads.
+    if not lead_ids:
+        return []
+    day = func.date(func.timezone(literal_column("'UTC'"), LeadStatusEvent.occurred_at))
+    stmt = select(day).where(LeadStatusEvent.lead_id.in_(lead_ids)).distinct()
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
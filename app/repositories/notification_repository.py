@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Any
 
 from sqlalchemy import Select, func, select, update
 from sqlalchemy.dialects.postgresql import insert
@@ -37,6 +38,29 @@ async def insert_notification_if_absent(
     return result.scalar_one_or_none() is not None
 
 
+# Seven bind parameters per row (staff_id, title, content, category, event_key, payload, is_read):
+# 7 x 1000 = 7000 stays well under the driver's 32767 limit.
+BULK_INSERT_BATCH_SIZE = 1000
+
+
+async def insert_notifications_if_absent(session: AsyncSession, rows: list[dict[str, Any]]) -> set[str]:
+    # rows carry staff_id, title, content, category, event_key and an optional payload;
+    # returns the event keys inserted.
+    unique_rows = list({row["event_key"]: row for row in rows}.values())
+    inserted: set[str] = set()
+    for offset in range(0, len(unique_rows), BULK_INSERT_BATCH_SIZE):
+        batch = unique_rows[offset : offset + BULK_INSERT_BATCH_SIZE]
+        stmt = (
+            insert(SystemNotification)
+            .values([{"payload": None, **row, "is_read": False} for row in batch])
+            .on_conflict_do_nothing(index_elements=[SystemNotification.event_key])
+            .returning(SystemNotification.event_key)
+        )
+        result = await session.execute(stmt)
+        inserted.update(result.scalars().all())
+    return inserted
+
+
 async def get_notification_by_event_key(session: AsyncSession, event_key: str) -> SystemNotification | None:
     result = await session.execute(select(SystemNotification).where(SystemNotification.event_key == event_key))
     return result.scalar_one_or_none()
@@ -1,9 +1,13 @@
-from sqlalchemy import Select, delete, func, or_, select
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Row, Select, delete, func, insert, or_, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.follow_up_record import FollowUpRecord
 from app.models.lead import Lead
 from app.models.pool_transfer_log import PoolTransferLog
+from app.models.user import User
 
 
 def build_pool_query(
@@ -16,9 +20,10 @@ def build_pool_query(
     if keyword:
         query = query.where(or_(Lead.name.ilike(f"%{keyword}%"), Lead.phone.ilike(f"%{keyword}%")))
     if drop_reason:
-        query = query.where(Lead.dynamic_data.op("->>")("drop_reason_type") == drop_reason)
+        query = query.where(Lead.drop_reason_type == drop_reason)
     if previous_owner:
-        query = query.where(Lead.dynamic_data.op("->>")("original_owner") == previous_owner)
+        owner_ids = select(User.id).where(or_(User.id == previous_owner, User.name == previous_owner))
+        query = query.where(Lead.original_owner_id.in_(owner_ids))
     return query
 
 
@@ -28,12 +33,74 @@ async def count_pool_leads(session: AsyncSession, base_query: Select[tuple[Lead]
     return int(value or 0)
 
 
+def build_pool_page_query(base_query: Select[tuple[Lead]], page: int, page_size: int) -> Select[tuple[Lead]]:
+    return base_query.order_by(Lead.drop_time.desc(), Lead.id.desc()).offset((page - 1) * page_size).limit(page_size)
+
+
 async def list_pool_leads(session: AsyncSession, base_query: Select[tuple[Lead]], page: int, page_size: int) -> list[Lead]:
-    stmt = base_query.order_by(Lead.updated_at.desc()).offset((page - 1) * page_size).limit(page_size)
+    stmt = build_pool_page_query(base_query, page, page_size)
     result = await session.execute(stmt)
     return list(result.scalars().all())
 
 
+async def list_pool_leads_for_distribution(
+    session: AsyncSession,
+    base_query: Select[tuple[Lead]],
+    limit: int,
+    *,
+    lock: bool,
+) -> list[Row[tuple[str, str | None, str, str, str, dict[str, Any], datetime]]]:
+    # Carries the columns lead_stats_service.lead_snapshot reads.
+    stmt = (
+        base_query.with_only_columns(
+            Lead.id,
+            Lead.owner_id,
+            Lead.status,
+            Lead.source,
+            Lead.level,
+            Lead.dynamic_data,
+            Lead.created_at,
+        )
+        .order_by(Lead.drop_time.asc(), Lead.id.asc())
+        .limit(limit)
+    )
+    if lock:
+        stmt = stmt.with_for_update(skip_locked=True)
+    result = await session.execute(stmt)
+    return list(result.all())
+
+
+async def get_user(session: AsyncSession, user_id: str) -> User | None:
+    return await session.get(User, user_id)
+
+
+async def list_active_users_by_ids(session: AsyncSession, user_ids: list[str]) -> list[User]:
+    if not user_ids:
+        return []
+    stmt = select(User).where(User.id.in_(user_ids), User.active.is_(True))
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
+async def assign_pool_leads_to_owner(session: AsyncSession, lead_ids: list[str], owner_id: str) -> int:
+    if not lead_ids:
+        return 0
+    stmt = (
+        update(Lead)
+        .where(Lead.id.in_(lead_ids), Lead.owner_id.is_(None))
+        .values(owner_id=owner_id, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.execute(stmt)
+    return int(result.rowcount or 0)
+
+
+async def bulk_add_transfer_logs(session: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    if not rows:
+        return
+    await session.execute(insert(PoolTransferLog), rows)
+
+
 async def get_lead(session: AsyncSession, lead_id: str) -> Lead | None:
     return await session.get(Lead, lead_id)
 
@@ -82,7 +149,12 @@ async def list_transfer_logs(
     base_query: Select[tuple[PoolTransferLog]],
     page: int,
     page_size: int,
+    after: tuple[datetime, int] | None = None,
 ) -> list[PoolTransferLog]:
-    stmt = base_query.order_by(PoolTransferLog.created_at.desc()).offset((page - 1) * page_size).limit(page_size)
+    stmt = base_query.order_by(PoolTransferLog.created_at.desc(), PoolTransferLog.id.desc()).limit(page_size)
+    if after is not None:
+        stmt = stmt.where(tuple_(PoolTransferLog.created_at, PoolTransferLog.id) < tuple_(*after))
+    else:
+        stmt = stmt.offset((page - 1) * page_size)
     result = await session.execute(stmt)
     return list(result.scalars().all())
@@ -1,25 +1,86 @@
+from collections.abc import AsyncIterator
 from datetime import datetime
+from typing import Any
 
-from sqlalchemy import Select, func, select
+from sqlalchemy import Integer, Select, cast, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.lead_status import TERMINAL_LEAD_STATUSES
 from app.models.follow_up_record import FollowUpRecord
 from app.models.lead import Lead
 from app.models.pool_transfer_log import PoolTransferLog
+from app.models.recycle_run import RecycleRun
 from app.models.user import User
 
 
-def build_assigned_leads_query() -> Select[tuple[Lead]]:
-    return select(Lead).where(Lead.owner_id.is_not(None))
-
-
-async def list_assigned_leads(session: AsyncSession) -> list[Lead]:
-    result = await session.execute(build_assigned_leads_query())
-    return list(result.scalars().all())
-
-
-async def list_followups_for_lead(session: AsyncSession, lead_id: str) -> list[FollowUpRecord]:
-    stmt = select(FollowUpRecord).where(FollowUpRecord.lead_id == lead_id).order_by(FollowUpRecord.timestamp.asc())
+def _gap_days(now_utc: datetime, column: Any) -> Any:
+    # Whole days elapsed, floored like timedelta.days.
+    return cast(func.floor(func.extract("epoch", now_utc - column) / 86400), Integer)
+
+
+def build_recycle_candidates_query(now_utc: datetime, after_lead_id: str | None = None) -> Select[Any]:
+    # One row per active assigned lead whose owner still exists, with its follow-up aggregates.
+    stmt = (
+        select(
+            Lead.id.label("lead_id"),
+            Lead.owner_id,
+            User.name.label("owner_name"),
+            User.dept_name.label("owner_dept"),
+            func.count(FollowUpRecord.id).label("followup_count"),
+            func.count(FollowUpRecord.id)
+            .filter(
+                # Older records only carry the operator's id or display name.
+                or_(
+                    FollowUpRecord.operator_staff_id == Lead.owner_id,
+                    FollowUpRecord.operator == Lead.owner_id,
+                    FollowUpRecord.operator == User.name,
+                )
+            )
+            .label("owner_followup_count"),
+            _gap_days(now_utc, func.coalesce(Lead.created_at, Lead.updated_at)).label("assigned_gap_days"),
+            _gap_days(now_utc, Lead.last_follow_up).label("contact_gap_days"),
+            Lead.level.op("~")(r"^\s*[aA]").label("is_high_intent"),
+            Lead.level,
+            Lead.last_follow_up,
+        )
+        .join(User, User.id == Lead.owner_id)
+        .outerjoin(FollowUpRecord, FollowUpRecord.lead_id == Lead.id)
+        .where(Lead.owner_id.is_not(None), Lead.status.not_in(TERMINAL_LEAD_STATUSES))
+        .group_by(Lead.id, User.id)
+        .order_by(Lead.id)
+    )
+    if after_lead_id is not None:
+        stmt = stmt.where(Lead.id > after_lead_id)
+    return stmt
+
+
+async def stream_recycle_candidate_chunks(
+    session: AsyncSession,
+    now_utc: datetime,
+    *,
+    after_lead_id: str | None,
+    chunk_size: int,
+) -> AsyncIterator[list[Any]]:
+    # Server-side cursor; chunks arrive in lead id order so progress can be recorded as a key.
+    result = await session.stream(
+        build_recycle_candidates_query(now_utc, after_lead_id),
+        execution_options={"yield_per": chunk_size},
+    )
+    async for partition in result.partitions(chunk_size):
+        yield list(partition)
+
+
+async def lock_leads_by_ids(session: AsyncSession, lead_ids: list[str]) -> list[Lead]:
+    # Rows locked by another writer are left out rather than waited for.
+    if not lead_ids:
+        return []
+    stmt = (
+        select(Lead)
+        .where(Lead.id.in_(lead_ids))
+        .order_by(Lead.id)
+        .with_for_update(skip_locked=True)
+        .execution_options(populate_existing=True)
+    )
     result = await session.execute(stmt)
     return list(result.scalars().all())
 
@@ -44,5 +105,26 @@ def add_pool_transfer_log(session: AsyncSession, log: PoolTransferLog) -> None:
     session.add(log)
 
 
+async def get_run(session: AsyncSession, run_key: str) -> RecycleRun | None:
+    return await session.get(RecycleRun, run_key)
+
+
+async def list_unfinished_runs(session: AsyncSession, *, before_key: str | None = None) -> list[RecycleRun]:
+    # Passes interrupted by a crash or restart; before_key limits the result to earlier days.
+    stmt = select(RecycleRun).where(RecycleRun.finished_at.is_(None)).order_by(RecycleRun.run_key)
+    if before_key is not None:
+        stmt = stmt.where(RecycleRun.run_key < before_key)
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
+def add_run(session: AsyncSession, run: RecycleRun) -> None:
+    session.add(run)
+
+
 async def commit(session: AsyncSession) -> None:
     await session.commit()
+
+
+async def rollback(session: AsyncSession) -> None:
+    await session.rollback()
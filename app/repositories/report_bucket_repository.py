@@ -0,0 +1,177 @@
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import Date, DateTime, Integer, String, Text, column, delete, exists, func, select, text, tuple_, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.monthly_follow_up_bucket import MonthlyFollowUpBucket
+from app.models.monthly_lead_bucket import MonthlyLeadBucket
+from app.models.report_bucket_month import ReportBucketMonth
+
+
+# The loss reason expression must stay in step with reports_repository._loss_reason_expr.
+_INSERT_LEAD_BUCKETS_SQL = text(
+    """
+    INSERT INTO monthly_lead_buckets (month, owner_id, status, level, loss_reason, leads, first_created_at)
+    SELECT :month,
+           coalesce(l.owner_id, ''),
+           l.status,
+           l.level,
+           CASE WHEN l.status = ANY(:lost_statuses)
+                THEN coalesce(
+                    nullif(btrim(l.dynamic_data ->> 'loss_reason'), ''),
+                    nullif(btrim(l.dynamic_data ->> 'drop_reason_type'), ''),
+                    '其他原因'
+                )
+                ELSE ''
+           END AS loss_reason,
+           count(*),
+           min(l.created_at)
+      FROM leads AS l
+     WHERE l.created_at >= :start_at
+       AND l.created_at < :end_at
+     GROUP BY 2, 3, 4, 5
+    """
+)
+
+_INSERT_FOLLOW_UP_BUCKETS_SQL = text(
+    """
+    INSERT INTO monthly_follow_up_buckets (month, operator_staff_id, follow_ups, first_at)
+    SELECT :month,
+           f.operator_staff_id,
+           count(*),
+           min(f.timestamp)
+      FROM follow_up_records AS f
+     WHERE f.timestamp >= :start_at
+       AND f.timestamp < :end_at
+       AND f.operator_staff_id IS NOT NULL
+     GROUP BY 2
+    """
+)
+
+
+_LEAD_BUCKET_COLUMNS = ("month", "owner_id", "status", "level", "loss_reason", "leads", "first_created_at")
+
+
+def _month_lock_args(month: date) -> tuple:
+    return func.hashtext("report_bucket_months"), month.year * 12 + month.month - 1
+
+
+async def lock_month_for_build(session: AsyncSession, month: date) -> None:
+    # Exclusive per month until commit: writers applying deltas to this month wait for the new
+    # rows, and the build does not start until their deltas are committed and visible to it.
+    await session.execute(select(func.pg_advisory_xact_lock(*_month_lock_args(month))))
+
+
+async def lock_months_for_deltas(session: AsyncSession, months: list[date]) -> None:
+    # Shared, so writers never block each other; callers pass months sorted.
+    for month in months:
+        await session.execute(select(func.pg_advisory_xact_lock_shared(*_month_lock_args(month))))
+
+
+async def list_built_months(session: AsyncSession, first_month: date, last_month: date) -> set[date]:
+    stmt = select(ReportBucketMonth.month).where(
+        ReportBucketMonth.month >= first_month,
+        ReportBucketMonth.month <= last_month,
+    )
+    result = await session.execute(stmt)
+    return set(result.scalars().all())
+
+
+async def delete_month(session: AsyncSession, month: date) -> None:
+    await session.execute(delete(MonthlyLeadBucket).where(MonthlyLeadBucket.month == month))
+    await session.execute(delete(MonthlyFollowUpBucket).where(MonthlyFollowUpBucket.month == month))
+    await session.execute(delete(ReportBucketMonth).where(ReportBucketMonth.month == month))
+
+
+async def insert_month(
+    session: AsyncSession,
+    *,
+    month: date,
+    start_at: datetime,
+    end_at: datetime,
+    lost_statuses: list[str],
+) -> None:
+    params = {"month": month, "start_at": start_at, "end_at": end_at}
+    await session.execute(_INSERT_LEAD_BUCKETS_SQL, {**params, "lost_statuses": lost_statuses})
+    await session.execute(_INSERT_FOLLOW_UP_BUCKETS_SQL, params)
+    await session.execute(insert(ReportBucketMonth).values(month=month))
+
+
+async def apply_lead_bucket_deltas(session: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    # Months without a marker are read from raw rows and built later, so they are skipped.
+    if not rows:
+        return
+    deltas = values(
+        column("month", Date),
+        column("owner_id", String),
+        column("status", String),
+        column("level", String),
+        column("loss_reason", Text),
+        column("leads", Integer),
+        column("first_created_at", DateTime(timezone=True)),
+        name="deltas",
+    ).data([tuple(row[name] for name in _LEAD_BUCKET_COLUMNS) for row in rows])
+    built = exists().where(ReportBucketMonth.month == deltas.c.month)
+    stmt = insert(MonthlyLeadBucket).from_select(list(_LEAD_BUCKET_COLUMNS), select(deltas).where(built))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            MonthlyLeadBucket.month,
+            MonthlyLeadBucket.owner_id,
+            MonthlyLeadBucket.status,
+            MonthlyLeadBucket.level,
+            MonthlyLeadBucket.loss_reason,
+        ],
+        set_={
+            "leads": MonthlyLeadBucket.leads + stmt.excluded.leads,
+            "first_created_at": func.least(MonthlyLeadBucket.first_created_at, stmt.excluded.first_created_at),
+        },
+    )
+    await session.execute(stmt)
+    keys = [tuple(row[name] for name in _LEAD_BUCKET_COLUMNS[:5]) for row in rows]
+    await session.execute(
+        delete(MonthlyLeadBucket).where(
+            tuple_(
+                MonthlyLeadBucket.month,
+                MonthlyLeadBucket.owner_id,
+                MonthlyLeadBucket.status,
+                MonthlyLeadBucket.level,
+                MonthlyLeadBucket.loss_reason,
+            ).in_(keys),
+            MonthlyLeadBucket.leads == 0,
+        )
+    )
+
+
+async def apply_follow_up_bucket_deltas(session: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    if not rows:
+        return
+    deltas = values(
+        column("month", Date),
+        column("operator_staff_id", String),
+        column("follow_ups", Integer),
+        column("first_at", DateTime(timezone=True)),
+        name="deltas",
+    ).data([(row["month"], row["operator_staff_id"], row["follow_ups"], row["first_at"]) for row in rows])
+    built = exists().where(ReportBucketMonth.month == deltas.c.month)
+    stmt = insert(MonthlyFollowUpBucket).from_select(
+        ["month", "operator_staff_id", "follow_ups", "first_at"],
+        select(deltas).where(built),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MonthlyFollowUpBucket.month, MonthlyFollowUpBucket.operator_staff_id],
+        set_={
+            "follow_ups": MonthlyFollowUpBucket.follow_ups + stmt.excluded.follow_ups,
+            "first_at": func.least(MonthlyFollowUpBucket.first_at, stmt.excluded.first_at),
+        },
+    )
+    await session.execute(stmt)
+
+
+async def commit(session: AsyncSession) -> None:
+    await session.commit()
+
+
+async def rollback(session: AsyncSession) -> None:
+    await session.rollback()
@@ -0,0 +1,82 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.report_cache_entry import ReportCacheEntry
+
+
+async def get_payload(session: AsyncSession, cache_key: str, now: datetime) -> dict[str, Any] | None:
+    stmt = select(ReportCacheEntry.payload).where(
+        ReportCacheEntry.cache_key == cache_key,
+        or_(ReportCacheEntry.expires_at.is_(None), ReportCacheEntry.expires_at > now),
+    )
+    return await session.scalar(stmt)
+
+
+async def upsert_entry(
+    session: AsyncSession,
+    *,
+    cache_key: str,
+    range_start: datetime,
+    range_end: datetime,
+    payload: dict[str, Any],
+    expires_at: datetime | None,
+) -> None:
+    stmt = insert(ReportCacheEntry).values(
+        cache_key=cache_key,
+        range_start=range_start,
+        range_end=range_end,
+        payload=payload,
+        expires_at=expires_at,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ReportCacheEntry.cache_key],
+        set_={
+            "range_start": stmt.excluded.range_start,
+            "range_end": stmt.excluded.range_end,
+            "payload": stmt.excluded.payload,
+            "expires_at": stmt.excluded.expires_at,
+            "created_at": stmt.excluded.created_at,
+        },
+    )
+    await session.execute(stmt)
+
+
+def merge_days(days: list[date]) -> list[tuple[date, date]]:
+    ranges: list[tuple[date, date]] = []
+    for day in sorted(set(days)):
+        if ranges and ranges[-1][1] == day:
+            ranges[-1] = (ranges[-1][0], day + timedelta(days=1))
+        else:
+            ranges.append((day, day + timedelta(days=1)))
+    return ranges
+
+
+async def purge_days(session: AsyncSession, days: list[date]) -> None:
+    # Days are UTC calendar days touched by a write; drop every entry whose range overlaps one.
+    if not days:
+        return
+    conditions = []
+    for first_day, end_day in merge_days(days):
+        start_at = datetime.combine(first_day, time.min, tzinfo=timezone.utc)
+        end_at = datetime.combine(end_day, time.min, tzinfo=timezone.utc)
+        conditions.append((ReportCacheEntry.range_start < end_at) & (ReportCacheEntry.range_end > start_at))
+    await session.execute(delete(ReportCacheEntry).where(or_(*conditions)))
+
+
+async def delete_expired(session: AsyncSession, now: datetime) -> int:
+    result = await session.execute(
+        delete(ReportCacheEntry).where(ReportCacheEntry.expires_at.is_not(None), ReportCacheEntry.expires_at <= now)
+    )
+    return int(result.rowcount or 0)
+
+
+async def commit(session: AsyncSession) -> None:
+    await session.commit()
+
+
+async def rollback(session: AsyncSession) -> None:
+    await session.rollback()
@@ -0,0 +1,80 @@
+from datetime import date, datetime, time, timezone
+from typing import Any
+
+from sqlalchemy import delete, func, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.report_snapshot import ReportSnapshot
+from app.repositories.report_cache_repository import merge_days
+
+
+async def get_payload(session: AsyncSession, cache_key: str) -> dict[str, Any] | None:
+    return await session.scalar(select(ReportSnapshot.payload).where(ReportSnapshot.cache_key == cache_key))
+
+
+async def upsert_snapshot(
+    session: AsyncSession,
+    *,
+    cache_key: str,
+    scope_type: str,
+    scope_id: str,
+    period_start: datetime,
+    period_end: datetime,
+    range_start: datetime,
+    range_end: datetime,
+    payload: dict[str, Any],
+) -> None:
+    stmt = insert(ReportSnapshot).values(
+        cache_key=cache_key,
+        scope_type=scope_type,
+        scope_id=scope_id,
+        period_start=period_start,
+        period_end=period_end,
+        range_start=range_start,
+        range_end=range_end,
+        payload=payload,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ReportSnapshot.cache_key],
+        set_={"payload": stmt.excluded.payload, "generated_at": func.now()},
+    )
+    await session.execute(stmt)
+
+
+async def delete_scope_snapshots(session: AsyncSession, *, scope_type: str, scope_id: str, period_start: datetime) -> None:
+    # Any end: a month-to-date row from an earlier night shares the start but not the end.
+    await session.execute(
+        delete(ReportSnapshot).where(
+            ReportSnapshot.scope_type == scope_type,
+            ReportSnapshot.scope_id == scope_id,
+            ReportSnapshot.period_start == period_start,
+        )
+    )
+
+
+async def delete_other_scopes(session: AsyncSession, *, period_start: datetime, keep: list[tuple[str, str]]) -> None:
+    # Departments or staff that no longer exist still have rows from earlier builds.
+    stmt = delete(ReportSnapshot).where(ReportSnapshot.period_start == period_start)
+    if keep:
+        stmt = stmt.where(tuple_(ReportSnapshot.scope_type, ReportSnapshot.scope_id).not_in(keep))
+    await session.execute(stmt)
+
+
+async def purge_days(session: AsyncSession, days: list[date]) -> None:
+    if not days:
+        return
+    conditions = []
+    for first_day, end_day in merge_days(days):
+        start_at = datetime.combine(first_day, time.min, tzinfo=timezone.utc)
+        end_at = datetime.combine(end_day, time.min, tzinfo=timezone.utc)
+        conditions.append((ReportSnapshot.range_start < end_at) & (ReportSnapshot.range_end > start_at))
+    await session.execute(delete(ReportSnapshot).where(or_(*conditions)))
+
+
+async def commit(session: AsyncSession) -> None:
+    await session.commit()
+
+
+async def rollback(session: AsyncSession) -> None:
+    await session.rollback()
@@ -1,48 +1,454 @@
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
 
-from sqlalchemy import select
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    Select,
+    cast,
+    distinct,
+    false,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    union_all,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.lead_status import LEAD_STATUS_INVITED, LEAD_STATUS_SIGNED, LEAD_STATUS_VISITED, LOST_LEAD_STATUSES
+from app.models.daily_lead_stat import DailyLeadStat
 from app.models.follow_up_record import FollowUpRecord
 from app.models.department import Department
 from app.models.lead import Lead
+from app.models.lead_status_event import LeadStatusEvent
+from app.models.monthly_follow_up_bucket import MonthlyFollowUpBucket
+from app.models.monthly_lead_bucket import MonthlyLeadBucket
 from app.models.user import User
 
 
-async def list_leads_between(
+Period = tuple[datetime, datetime]
+
+# Report zones whose local day is the UTC day daily_lead_stats rows are keyed by.
+_UTC_ZONE_NAMES = frozenset({"UTC", "Etc/UTC"})
+
+
+@dataclass(frozen=True)
+class PeriodSegments:
+    # raw ranges are read from leads/follow_up_records; months (first day, UTC) from the monthly buckets.
+    raw: tuple[Period, ...]
+    months: tuple[date, ...] = ()
+
+
+def whole_period(period: Period) -> PeriodSegments:
+    return PeriodSegments(raw=(period,))
+
+
+def _scope_owner(stmt: Select, owner_column, *, owner_id: str | None, dept_name: str | None) -> Select:
+    if owner_id:
+        stmt = stmt.where(owner_column == owner_id)
+    if dept_name:
+        stmt = stmt.join(User, User.id == owner_column, isouter=True).where(User.dept_name == dept_name)
+    return stmt
+
+
+def _scope_leads(stmt: Select, *, owner_id: str | None, dept_name: str | None) -> Select:
+    return _scope_owner(stmt, Lead.owner_id, owner_id=owner_id, dept_name=dept_name)
+
+
+def _in_period(column, period: Period) -> ColumnElement[bool]:
+    return (column >= period[0]) & (column < period[1])
+
+
+def _in_ranges(column, ranges: tuple[Period, ...]) -> ColumnElement[bool]:
+    return or_(*(_in_period(column, period) for period in ranges)) if ranges else false()
+
+
+def _loss_reason_expr():
+    return func.coalesce(
+        func.nullif(func.btrim(Lead.dynamic_data["loss_reason"].astext), ""),
+        func.nullif(func.btrim(Lead.dynamic_data["drop_reason_type"].astext), ""),
+        "其他原因",
+    )
+
+
+def _lead_facts(
+    periods: list[tuple[str, PeriodSegments]],
+    *,
+    owner_id: str | None,
+    dept_name: str | None,
+    lost_only: bool = False,
+):
+    # One row per raw lead (leads=1) or per bucket row (leads=count), tagged with its period.
+    parts: list[Select] = []
+    for tag, segments in periods:
+        raw = select(
+            literal(tag).label("period"),
+            Lead.created_at.label("first_at"),
+            Lead.owner_id.label("owner_id"),
+            Lead.status.label("status"),
+            Lead.level.label("level"),
+            _loss_reason_expr().label("loss_reason"),
+            literal(1).label("leads"),
+        ).where(_in_ranges(Lead.created_at, segments.raw))
+        if lost_only:
+            raw = raw.where(Lead.status.in_(LOST_LEAD_STATUSES))
+        parts.append(_scope_leads(raw, owner_id=owner_id, dept_name=dept_name))
+        if not segments.months:
+            continue
+        bucket = select(
+            literal(tag).label("period"),
+            MonthlyLeadBucket.first_created_at.label("first_at"),
+            func.nullif(MonthlyLeadBucket.owner_id, "").label("owner_id"),
+            MonthlyLeadBucket.status.label("status"),
+            MonthlyLeadBucket.level.label("level"),
+            MonthlyLeadBucket.loss_reason.label("loss_reason"),
+            MonthlyLeadBucket.leads.label("leads"),
+        ).where(MonthlyLeadBucket.month.in_(segments.months))
+        if lost_only:
+            bucket = bucket.where(MonthlyLeadBucket.status.in_(LOST_LEAD_STATUSES))
+        parts.append(_scope_owner(bucket, MonthlyLeadBucket.owner_id, owner_id=owner_id, dept_name=dept_name))
+    return union_all(*parts).subquery("facts") if len(parts) > 1 else parts[0].subquery("facts")
+
+
+def _follow_up_facts(periods: list[tuple[str, PeriodSegments]], *, staff_ids: list[str]):
+    parts: list[Select] = []
+    for tag, segments in periods:
+        parts.append(
+            select(
+                literal(tag).label("period"),
+                FollowUpRecord.timestamp.label("first_at"),
+                FollowUpRecord.operator_staff_id.label("staff_id"),
+                literal(1).label("follow_ups"),
+            ).where(FollowUpRecord.operator_staff_id.in_(staff_ids), _in_ranges(FollowUpRecord.timestamp, segments.raw))
+        )
+        if not segments.months:
+            continue
+        parts.append(
+            select(
+                literal(tag).label("period"),
+                MonthlyFollowUpBucket.first_at.label("first_at"),
+                MonthlyFollowUpBucket.operator_staff_id.label("staff_id"),
+                MonthlyFollowUpBucket.follow_ups.label("follow_ups"),
+            ).where(
+                MonthlyFollowUpBucket.operator_staff_id.in_(staff_ids),
+                MonthlyFollowUpBucket.month.in_(segments.months),
+            )
+        )
+    return union_all(*parts).subquery("facts") if len(parts) > 1 else parts[0].subquery("facts")
+
+
+def _sum_if(column, condition: ColumnElement[bool]):
+    return func.coalesce(func.sum(column).filter(condition), 0)
+
+
+async def summarize_leads(
     session: AsyncSession,
     *,
-    start_at: datetime,
-    end_at: datetime,
+    current: PeriodSegments,
+    previous: PeriodSegments,
+    interested_levels: list[str],
     owner_id: str | None = None,
     dept_name: str | None = None,
-) -> list[Lead]:
-    stmt = select(Lead).where(Lead.created_at >= start_at, Lead.created_at < end_at)
-    if owner_id:
-        stmt = stmt.where(Lead.owner_id == owner_id)
-    if dept_name:
-        stmt = stmt.join(User, User.id == Lead.owner_id, isouter=True).where(User.dept_name == dept_name)
-    stmt = stmt.order_by(Lead.created_at.asc())
+) -> tuple[dict[str, int], dict[str, int]]:
+    facts = _lead_facts([("current", current), ("previous", previous)], owner_id=owner_id, dept_name=dept_name)
+    columns = []
+    for prefix in ("current", "previous"):
+        in_period = facts.c.period == prefix
+        columns.extend(
+            [
+                _sum_if(facts.c.leads, in_period).label(f"{prefix}_new"),
+                _sum_if(facts.c.leads, in_period & facts.c.owner_id.is_not(None)).label(f"{prefix}_assigned"),
+                _sum_if(facts.c.leads, in_period & facts.c.level.in_(interested_levels)).label(f"{prefix}_interested"),
+            ]
+        )
+    row = (await session.execute(select(*columns).select_from(facts))).one()
+    values = row._asdict()
+    metrics = ("new", "assigned", "interested")
+    return (
+        {metric: int(values[f"current_{metric}"] or 0) for metric in metrics},
+        {metric: int(values[f"previous_{metric}"] or 0) for metric in metrics},
+    )
+
+
+async def summarize_followups(
+    session: AsyncSession,
+    *,
+    current: PeriodSegments,
+    previous: PeriodSegments,
+    current_period: Period,
+    staff_ids: list[str],
+) -> dict[str, int]:
+    facts = _follow_up_facts([("current", current), ("previous", previous)], staff_ids=staff_ids)
+    # Distinct leads do not add up across buckets, so they always come from the raw rows.
+    followed_leads = (
+        select(func.count(distinct(FollowUpRecord.lead_id)))
+        .where(FollowUpRecord.operator_staff_id.in_(staff_ids), _in_period(FollowUpRecord.timestamp, current_period))
+        .scalar_subquery()
+    )
+    stmt = select(
+        _sum_if(facts.c.follow_ups, facts.c.period == "current").label("current"),
+        _sum_if(facts.c.follow_ups, facts.c.period == "previous").label("previous"),
+        followed_leads.label("current_leads"),
+    ).select_from(facts)
+    row = (await session.execute(stmt)).one()
+    return {key: int(value or 0) for key, value in row._asdict().items()}
+
+
+STATUS_EVENT_METRICS = {
+    "signed": [LEAD_STATUS_SIGNED],
+    "invited": [LEAD_STATUS_INVITED],
+    "visited": [LEAD_STATUS_VISITED],
+    "invitedOrVisited": [LEAD_STATUS_INVITED, LEAD_STATUS_VISITED],
+}
+
+
+async def count_status_transitions(
+    session: AsyncSession,
+    *,
+    current: Period,
+    previous: Period,
+    owner_id: str | None = None,
+    dept_name: str | None = None,
+) -> tuple[dict[str, int], dict[str, int]]:
+    # Distinct leads that entered each status during the period, whatever their status is now;
+    # owner and department scope follow the owner at the time of the change.
+    statuses = sorted({status for values in STATUS_EVENT_METRICS.values() for status in values})
+    columns = []
+    for prefix, period in (("current", current), ("previous", previous)):
+        in_period = _in_period(LeadStatusEvent.occurred_at, period)
+        columns.extend(
+            func.count(distinct(LeadStatusEvent.lead_id))
+            .filter(in_period & LeadStatusEvent.to_status.in_(values))
+            .label(f"{prefix}_{metric}")
+            for metric, values in STATUS_EVENT_METRICS.items()
+        )
+    stmt = _scope_owner(
+        select(*columns).where(
+            LeadStatusEvent.to_status.in_(statuses),
+            _in_ranges(LeadStatusEvent.occurred_at, (previous, current)),
+        ),
+        LeadStatusEvent.owner_id,
+        owner_id=owner_id,
+        dept_name=dept_name,
+    )
+    values = (await session.execute(stmt)).one()._asdict()
+    return (
+        {metric: int(values[f"current_{metric}"] or 0) for metric in STATUS_EVENT_METRICS},
+        {metric: int(values[f"previous_{metric}"] or 0) for metric in STATUS_EVENT_METRICS},
+    )
+
+
+COHORT_STATUS_METRICS = {
+    "invited": [LEAD_STATUS_INVITED],
+    "visited": [LEAD_STATUS_VISITED],
+}
+
+
+async def count_cohort_transitions(
+    session: AsyncSession,
+    *,
+    current: Period,
+    previous: Period,
+    owner_id: str | None = None,
+    dept_name: str | None = None,
+) -> tuple[dict[str, int], dict[str, int]]:
+    # Leads created in the period that entered each status within the same period. Scoped like
+    # the new-lead count so the two can be divided into a rate.
+    statuses = sorted({status for values in COHORT_STATUS_METRICS.values() for status in values})
+    columns = []
+    for prefix, period in (("current", current), ("previous", previous)):
+        in_period = _in_period(Lead.created_at, period) & _in_period(LeadStatusEvent.occurred_at, period)
+        columns.extend(
+            func.count(distinct(Lead.id))
+            .filter(in_period & LeadStatusEvent.to_status.in_(values))
+            .label(f"{prefix}_{metric}")
+            for metric, values in COHORT_STATUS_METRICS.items()
+        )
+    stmt = _scope_leads(
+        select(*columns)
+        .select_from(Lead)
+        .join(LeadStatusEvent, LeadStatusEvent.lead_id == Lead.id)
+        .where(
+            LeadStatusEvent.to_status.in_(statuses),
+            _in_ranges(Lead.created_at, (previous, current)),
+            _in_ranges(LeadStatusEvent.occurred_at, (previous, current)),
+        ),
+        owner_id=owner_id,
+        dept_name=dept_name,
+    )
+    values = (await session.execute(stmt)).one()._asdict()
+    return (
+        {metric: int(values[f"current_{metric}"] or 0) for metric in COHORT_STATUS_METRICS},
+        {metric: int(values[f"previous_{metric}"] or 0) for metric in COHORT_STATUS_METRICS},
+    )
+
+
+async def count_signed_by_owner(
+    session: AsyncSession,
+    *,
+    period: Period,
+    owner_id: str | None = None,
+    dept_name: str | None = None,
+) -> dict[str, int]:
+    stmt = _scope_owner(
+        select(LeadStatusEvent.owner_id, func.count(distinct(LeadStatusEvent.lead_id)).label("signed"))
+        .where(
+            LeadStatusEvent.to_status == LEAD_STATUS_SIGNED,
+            _in_period(LeadStatusEvent.occurred_at, period),
+            LeadStatusEvent.owner_id.is_not(None),
+        )
+        .group_by(LeadStatusEvent.owner_id)
+        .order_by(func.min(LeadStatusEvent.occurred_at).asc()),
+        LeadStatusEvent.owner_id,
+        owner_id=owner_id,
+        dept_name=dept_name,
+    )
     result = await session.execute(stmt)
-    return list(result.scalars().all())
+    return {row.owner_id: int(row.signed) for row in result}
+
+
+async def count_cohort_signed_by_owner(
+    session: AsyncSession,
+    *,
+    period: Period,
+    owner_id: str | None = None,
+    dept_name: str | None = None,
+) -> dict[str, int]:
+    # Leads created in the period that were signed within it, by their current owner; the same
+    # basis as count_leads_by_owner, so the two divide into a conversion rate.
+    stmt = _scope_leads(
+        select(Lead.owner_id, func.count(distinct(Lead.id)).label("signed"))
+        .select_from(Lead)
+        .join(LeadStatusEvent, LeadStatusEvent.lead_id == Lead.id)
+        .where(
+            LeadStatusEvent.to_status == LEAD_STATUS_SIGNED,
+            _in_period(Lead.created_at, period),
+            _in_period(LeadStatusEvent.occurred_at, period),
+            Lead.owner_id.is_not(None),
+        )
+        .group_by(Lead.owner_id),
+        owner_id=owner_id,
+        dept_name=dept_name,
+    )
+    result = await session.execute(stmt)
+    return {row.owner_id: int(row.signed) for row in result}
 
 
-async def list_followups_between(
+def _count_new_leads_from_stats(start_at: datetime, end_at: datetime, *, owner_id: str | None, dept_name: str | None):
+    # end_at is a UTC midnight or now; no lead is created after now, so a partial last day
+    # counts whole.
+    first_day = start_at.astimezone(timezone.utc).date()
+    end_utc = end_at.astimezone(timezone.utc)
+    end_day = end_utc.date() if end_utc.time() == time.min else end_utc.date() + timedelta(days=1)
+    stat_day = cast(DailyLeadStat.day, DateTime()).label("day")
+    return _scope_owner(
+        select(stat_day, func.sum(DailyLeadStat.new_leads).label("total"))
+        .where(DailyLeadStat.day >= first_day, DailyLeadStat.day < end_day)
+        .group_by(DailyLeadStat.day),
+        DailyLeadStat.owner_id,
+        owner_id=owner_id,
+        dept_name=dept_name,
+    ).subquery("counts")
+
+
+async def count_leads_by_day(
     session: AsyncSession,
     *,
+    first_day: datetime,
+    last_day: datetime,
+    timezone_name: str,
     start_at: datetime,
     end_at: datetime,
-    operator_keys: list[str] | None = None,
-) -> list[FollowUpRecord]:
-    stmt = select(FollowUpRecord).where(
-        FollowUpRecord.timestamp >= start_at,
-        FollowUpRecord.timestamp < end_at,
+    owner_id: str | None = None,
+    dept_name: str | None = None,
+) -> list[tuple[datetime, int]]:
+    # first_day/last_day are naive local midnights; start_at/end_at bound the scan on created_at.
+    if timezone_name in _UTC_ZONE_NAMES:
+        counts = _count_new_leads_from_stats(start_at, end_at, owner_id=owner_id, dept_name=dept_name)
+    else:
+        local_day = func.date_trunc("day", func.timezone(timezone_name, Lead.created_at)).label("day")
+        counts = _scope_leads(
+            select(local_day, func.count().label("total"))
+            .where(Lead.created_at >= start_at, Lead.created_at < end_at)
+            .group_by(literal_column("day")),
+            owner_id=owner_id,
+            dept_name=dept_name,
+        ).subquery("counts")
+    days = (
+        func.generate_series(
+            cast(first_day, DateTime()),
+            cast(last_day, DateTime()),
+            literal_column("interval '1 day'"),
+        )
+        .table_valued("day")
+        .render_derived("days")
+    )
+    stmt = (
+        select(days.c.day, func.coalesce(counts.c.total, 0).label("total"))
+        .select_from(days.outerjoin(counts, counts.c.day == days.c.day))
+        .order_by(days.c.day)
     )
-    if operator_keys:
-        stmt = stmt.where(FollowUpRecord.operator.in_(operator_keys))
-    stmt = stmt.order_by(FollowUpRecord.timestamp.asc())
     result = await session.execute(stmt)
-    return list(result.scalars().all())
+    return [(row.day, int(row.total)) for row in result]
+
+
+async def count_loss_reasons(
+    session: AsyncSession,
+    *,
+    period: PeriodSegments,
+    limit: int | None,
+    owner_id: str | None = None,
+    dept_name: str | None = None,
+) -> list[tuple[str, int]]:
+    facts = _lead_facts([("current", period)], owner_id=owner_id, dept_name=dept_name, lost_only=True)
+    total = func.sum(facts.c.leads).label("total")
+    # Ties keep the order in which each reason first appeared, as the old in-memory counter did.
+    stmt = (
+        select(facts.c.loss_reason.label("reason"), total)
+        .group_by(facts.c.loss_reason)
+        .order_by(total.desc(), func.min(facts.c.first_at).asc())
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    result = await session.execute(stmt)
+    return [(str(row.reason), int(row.total)) for row in result]
+
+
+async def count_leads_by_owner(
+    session: AsyncSession,
+    *,
+    period: PeriodSegments,
+    owner_id: str | None = None,
+    dept_name: str | None = None,
+) -> dict[str, int]:
+    facts = _lead_facts([("current", period)], owner_id=owner_id, dept_name=dept_name)
+    # First-appearance order keeps ranking ties stable the same way the old row scan did.
+    stmt = (
+        select(facts.c.owner_id, func.sum(facts.c.leads).label("new_leads"))
+        .where(facts.c.owner_id.is_not(None))
+        .group_by(facts.c.owner_id)
+        .order_by(func.min(facts.c.first_at).asc())
+    )
+    result = await session.execute(stmt)
+    return {row.owner_id: int(row.new_leads) for row in result}
+
+
+async def count_followups_by_staff(
+    session: AsyncSession,
+    *,
+    period: PeriodSegments,
+    staff_ids: list[str],
+) -> dict[str, int]:
+    facts = _follow_up_facts([("current", period)], staff_ids=staff_ids)
+    stmt = (
+        select(facts.c.staff_id, func.sum(facts.c.follow_ups).label("total"))
+        .group_by(facts.c.staff_id)
+        .order_by(func.min(facts.c.first_at).asc())
+    )
+    result = await session.execute(stmt)
+    return {row.staff_id: int(row.total) for row in result}
 
 
 async def list_active_users(session: AsyncSession) -> list[User]:
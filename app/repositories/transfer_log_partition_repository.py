@@ -0,0 +1,104 @@
+import re
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+PARENT_TABLE = "pool_transfer_logs"
+_PARTITION_NAME_RE = re.compile(rf"^{PARENT_TABLE}_(\d{{4}})m(\d{{2}})$")
+_ARCHIVE_COLUMNS = "id, lead_id, action, from_owner_id, to_owner_id, operator_staff_id, note, created_at"
+
+
+def build_partition_name(month_start: datetime) -> str:
+    return f"{PARENT_TABLE}_{month_start.year:04d}m{month_start.month:02d}"
+
+
+def parse_partition_month(name: str) -> tuple[int, int] | None:
+    matched = _PARTITION_NAME_RE.fullmatch(name)
+    if matched is None:
+        return None
+    return int(matched.group(1)), int(matched.group(2))
+
+
+def _checked_name(name: str) -> str:
+    if parse_partition_month(name) is None:
+        raise ValueError(f"unexpected partition name: {name}")
+    return name
+
+
+async def list_month_partitions(session: AsyncSession) -> list[str]:
+    result = await session.execute(
+        text(
+            """
+            SELECT child.relname
+              FROM pg_inherits
+              JOIN pg_class AS parent ON parent.oid = pg_inherits.inhparent
+              JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+             WHERE parent.relname = :parent
+             ORDER BY child.relname
+            """
+        ),
+        {"parent": PARENT_TABLE},
+    )
+    return [name for name in result.scalars().all() if parse_partition_month(name) is not None]
+
+
+async def list_detached_month_tables(session: AsyncSession) -> list[str]:
+    # Month tables left behind by an archive run that detached them but did not finish.
+    result = await session.execute(
+        text(
+            """
+            SELECT c.relname
+              FROM pg_class AS c
+             WHERE c.relkind = 'r'
+               AND c.relnamespace = to_regnamespace(current_schema())
+               AND c.relname LIKE :prefix
+               AND NOT EXISTS (SELECT 1 FROM pg_inherits AS i WHERE i.inhrelid = c.oid)
+             ORDER BY c.relname
+            """
+        ),
+        {"prefix": f"{PARENT_TABLE}\\_%"},
+    )
+    return [name for name in result.scalars().all() if parse_partition_month(name) is not None]
+
+
+async def create_month_partition(session: AsyncSession, month_start: datetime, month_end: datetime) -> None:
+    name = build_partition_name(month_start)
+    await session.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+            f"FOR VALUES FROM ('{month_start.isoformat()}') TO ('{month_end.isoformat()}')"
+        )
+    )
+
+
+async def detach_partition(session: AsyncSession, name: str) -> None:
+    await session.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {_checked_name(name)}"))
+
+
+async def stream_partition_rows(session: AsyncSession, name: str) -> AsyncIterator[Any]:
+    result = await session.stream(
+        text(f"SELECT {_ARCHIVE_COLUMNS} FROM {_checked_name(name)} ORDER BY created_at, id"),
+        execution_options={"yield_per": 5000},
+    )
+    async for row in result:
+        yield row
+
+
+def archive_columns() -> list[str]:
+    return [column.strip() for column in _ARCHIVE_COLUMNS.split(",")]
+
+
+async def drop_partition_table(session: AsyncSession, name: str) -> None:
+    await session.execute(text(f"DROP TABLE {_checked_name(name)}"))
+
+
+async def commit(session: AsyncSession) -> None:
+    await session.commit()
+
+
+async def rollback(session: AsyncSession) -> None:
+    await session.rollback()
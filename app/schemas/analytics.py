@@ -0,0 +1,42 @@
+from pydantic import BaseModel, Field
+
+
+class ConversionRow(BaseModel):
+    week: str
+    source: str
+    project: str
+    leads: int
+    signed: int
+    conversion: float = Field(ge=0)
+
+
+class ConversionAnalyticsData(BaseModel):
+    generatedAt: str
+    rows: list[ConversionRow]
+
+
+class RepCohortRow(BaseModel):
+    staffId: str
+    name: str
+    cohort: str
+    leads: int
+    followed: int
+    signed: int
+    recycled: int
+
+
+class RepCohortAnalyticsData(BaseModel):
+    generatedAt: str
+    rows: list[RepCohortRow]
+
+
+class PoolFlowRow(BaseModel):
+    week: str
+    action: str
+    transfers: int
+    leads: int
+
+
+class PoolFlowAnalyticsData(BaseModel):
+    generatedAt: str
+    rows: list[PoolFlowRow]
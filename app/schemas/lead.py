@@ -174,3 +174,24 @@ class AssignableStaffOut(BaseModel):
 
 class AssignableStaffData(BaseModel):
     list: list[AssignableStaffOut]
+
+
+class StaffLeadCounterOut(BaseModel):
+    staffId: str
+    name: str
+    activeLeads: int
+
+
+class StaffLeadCounterListData(BaseModel):
+    list: list[StaffLeadCounterOut]
+
+
+class StaffLeadCounterFixOut(BaseModel):
+    staffId: str
+    stored: int | None = None
+    actual: int
+
+
+class StaffLeadCounterReconcileData(BaseModel):
+    checked: int
+    fixed: list[StaffLeadCounterFixOut]
@@ -1,3 +1,5 @@
+from typing import Any
+
 from pydantic import BaseModel, ConfigDict, Field
 
 
@@ -6,6 +8,7 @@ class NotificationItem(BaseModel):
     title: str
     content: str
     category: str
+    payload: dict[str, Any] | None = None
     isRead: bool
     createdAt: str | None = None
     readAt: str | None = None
@@ -10,6 +10,16 @@ class PoolAssignRequest(BaseModel):
     staff_id: str = Field(description="Target staff id")
 
 
+class PoolDistributeRequest(BaseModel):
+    staff_ids: list[str] = Field(min_length=1, max_length=500)
+    strategy: str = Field(default="least_loaded", pattern="^(round_robin|least_loaded)$")
+    count: int = Field(ge=1, le=50000)
+    keyword: str | None = None
+    drop_reason: str | None = None
+    previous_owner: str | None = None
+    preview: bool = False
+
+
 class PoolLeadOut(BaseModel):
     id: str
     name: str
@@ -37,6 +47,26 @@ class PoolAssignData(BaseModel):
     count: int
 
 
+class PoolDistributeAllocation(BaseModel):
+    staffId: str
+    before: int
+    assigned: int
+    after: int
+    cap: int
+    leadIds: list[str]
+
+
+class PoolDistributeData(BaseModel):
+    preview: bool
+    strategy: str
+    requested: int
+    matched: int
+    assigned: int
+    unassigned: int
+    cap: int
+    allocations: list[PoolDistributeAllocation]
+
+
 class PoolDeleteData(BaseModel):
     leadId: str
 
@@ -63,4 +93,5 @@ class PoolTransferOut(BaseModel):
 
 class PoolTransferListData(BaseModel):
     list: list[PoolTransferOut]
-    total: int
+    total: int | None = None
+    nextCursor: str | None = None
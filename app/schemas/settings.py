@@ -14,6 +14,7 @@ class PlatformSettingsData(BaseModel):
     aiBaseUrl: str
     aiModel: str
     aiTimeoutSeconds: int
+    reportTimezone: str
 
 
 class PlatformSettingsUpdate(BaseModel):
@@ -31,6 +32,7 @@ class PlatformSettingsUpdate(BaseModel):
     aiBaseUrl: str = Field(default="https://api.openai.com/v1", max_length=255)
     aiModel: str = Field(default="gpt-4o-mini", max_length=128)
     aiTimeoutSeconds: int = Field(default=12, ge=3, le=60)
+    reportTimezone: str = Field(default="Asia/Shanghai", min_length=1, max_length=64)
 
 
 class PlatformAiTestRequest(BaseModel):
@@ -0,0 +1,282 @@
+import asyncio
+import csv
+import importlib
+import json
+import logging
+import os
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import AppException
+from app.core.rbac import normalize_role
+from app.db.session import AsyncSessionLocal
+from app.repositories import analytics_snapshot_repository
+from app.services import platform_setting_service
+
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = 5000
+MANIFEST_NAME = "manifest.json"
+DEFAULT_RANGE_DAYS = 84
+
+# Fixed, parameterized queries over the Parquet views; callers only choose values, never SQL.
+_ANALYTICS_QUERIES: dict[str, str] = {
+    "conversion": """
+        SELECT CAST(date_trunc('week', timezone($tz, l.created_at)) AS DATE) AS week,
+               l.source,
+               l.project,
+               count(*) AS leads,
+               count(*) FILTER (WHERE l.status = 'signed') AS signed
+          FROM leads AS l
+          LEFT JOIN users AS u ON u.id = l.owner_id
+         WHERE l.created_at >= $start_at
+           AND l.created_at < $end_at
+           {dept_filter}
+         GROUP BY ALL
+         ORDER BY week, leads DESC, l.source, l.project
+    """,
+    # Recycled leads stay with the rep who worked them through original_owner_id.
+    "rep_cohorts": """
+        WITH followed AS (
+            SELECT DISTINCT lead_id FROM follow_up_records
+        ), recycled AS (
+            SELECT DISTINCT lead_id FROM pool_transfer_logs WHERE action = 'auto_recycle'
+        )
+        SELECT u.id AS staff_id,
+               u.name,
+               CAST(date_trunc('month', timezone($tz, l.created_at)) AS DATE) AS cohort,
+               count(*) AS leads,
+               count(f.lead_id) AS followed,
+               count(*) FILTER (WHERE l.status = 'signed') AS signed,
+               count(r.lead_id) AS recycled
+          FROM leads AS l
+          JOIN users AS u ON u.id = coalesce(l.owner_id, l.original_owner_id)
+          LEFT JOIN followed AS f ON f.lead_id = l.id
+          LEFT JOIN recycled AS r ON r.lead_id = l.id
+         WHERE l.created_at >= $start_at
+           AND l.created_at < $end_at
+           {dept_filter}
+         GROUP BY ALL
+         ORDER BY cohort, leads DESC, staff_id
+    """,
+    "pool_flow": """
+        SELECT CAST(date_trunc('week', timezone($tz, p.created_at)) AS DATE) AS week,
+               p.action,
+               count(*) AS transfers,
+               count(DISTINCT p.lead_id) AS leads
+          FROM pool_transfer_logs AS p
+          LEFT JOIN users AS u ON u.id = coalesce(p.from_owner_id, p.to_owner_id)
+         WHERE p.created_at >= $start_at
+           AND p.created_at < $end_at
+           {dept_filter}
+         GROUP BY ALL
+         ORDER BY week, p.action
+    """,
+}
+
+
+def _load_duckdb() -> Any:
+    try:
+        return importlib.import_module("duckdb")
+    except ModuleNotFoundError as exc:
+        raise AppException("分析引擎未安装，请联系管理员", business_code=400, status_code=503) from exc
+
+
+def _snapshot_dir() -> Path:
+    return Path(settings.analytics_snapshot_dir)
+
+
+def _sql_path(path: Path) -> str:
+    return str(path).replace("'", "''")
+
+
+def _write_chunk(writer: Any, rows: list[Any]) -> None:
+    for row in rows:
+        writer.writerow(
+            [value.isoformat(sep=" ") if isinstance(value, datetime) else ("" if value is None else value) for value in row]
+        )
+
+
+def _csv_to_parquet(csv_path: Path, parquet_path: Path, columns: dict[str, str]) -> None:
+    duckdb = _load_duckdb()
+    column_spec = ", ".join(f"'{name}': '{column_type}'" for name, column_type in columns.items())
+    with duckdb.connect() as connection:
+        connection.execute(
+            f"COPY (SELECT * FROM read_csv('{_sql_path(csv_path)}', header = true, nullstr = '', "
+            f"columns = {{{column_spec}}})) TO '{_sql_path(parquet_path)}' (FORMAT PARQUET, COMPRESSION ZSTD)"
+        )
+
+
+async def _export_table(session: AsyncSession, table: str, target_dir: Path) -> int:
+    _, columns = analytics_snapshot_repository.SNAPSHOT_TABLES[table]
+    csv_path = target_dir / f"{table}.csv.tmp"
+    parquet_tmp = target_dir / f"{table}.parquet.tmp"
+    row_count = 0
+    try:
+        with csv_path.open("w", encoding="utf-8", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(list(columns))
+            chunk: list[Any] = []
+            async for row in analytics_snapshot_repository.stream_table_rows(session, table):
+                chunk.append(row)
+                if len(chunk) >= EXPORT_CHUNK_SIZE:
+                    await asyncio.to_thread(_write_chunk, writer, chunk)
+                    row_count += len(chunk)
+                    chunk = []
+            if chunk:
+                await asyncio.to_thread(_write_chunk, writer, chunk)
+                row_count += len(chunk)
+        await asyncio.to_thread(_csv_to_parquet, csv_path, parquet_tmp, columns)
+        os.replace(parquet_tmp, target_dir / f"{table}.parquet")
+    finally:
+        csv_path.unlink(missing_ok=True)
+        parquet_tmp.unlink(missing_ok=True)
+    return row_count
+
+
+async def export_snapshot(session: AsyncSession, now: datetime | None = None) -> dict[str, Any]:
+    _load_duckdb()
+    target_dir = _snapshot_dir()
+    target_dir.mkdir(parents=True, exist_ok=True)
+    tables: dict[str, int] = {}
+    # Read every table from one snapshot so the files agree with each other.
+    await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    for table in analytics_snapshot_repository.SNAPSHOT_TABLES:
+        tables[table] = await _export_table(session, table, target_dir)
+    manifest = {"generatedAt": (now or datetime.now(timezone.utc)).isoformat(), "tables": tables}
+    manifest_tmp = target_dir / f"{MANIFEST_NAME}.tmp"
+    manifest_tmp.write_text(json.dumps(manifest), encoding="utf-8")
+    os.replace(manifest_tmp, target_dir / MANIFEST_NAME)
+    return manifest
+
+
+async def run_export_once() -> dict[str, Any]:
+    async with AsyncSessionLocal() as session:
+        manifest = await export_snapshot(session)
+    logger.info("analytics snapshot exported tables=%s", manifest["tables"])
+    return manifest
+
+
+def _read_manifest() -> dict[str, Any]:
+    path = _snapshot_dir() / MANIFEST_NAME
+    if not path.exists():
+        raise AppException("分析快照尚未生成，请稍后再试", business_code=400, status_code=503)
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _run_query(name: str, params: dict[str, Any], dept_name: str | None) -> list[dict[str, Any]]:
+    duckdb = _load_duckdb()
+    snapshot_dir = _snapshot_dir()
+    sql = _ANALYTICS_QUERIES[name].format(dept_filter="AND u.dept_name = $dept_name" if dept_name else "")
+    if dept_name:
+        params = {**params, "dept_name": dept_name}
+    with duckdb.connect() as connection:
+        for table in analytics_snapshot_repository.SNAPSHOT_TABLES:
+            connection.execute(
+                f"CREATE VIEW {table} AS SELECT * FROM read_parquet('{_sql_path(snapshot_dir / f'{table}.parquet')}')"
+            )
+        cursor = connection.execute(sql, params)
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _resolve_range(start_date: str | None, end_date: str | None, now_utc: datetime) -> tuple[datetime, datetime]:
+    if start_date and end_date:
+        start_at = datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        end_at = datetime.strptime(end_date, "%Y-%m-%d").replace(tzinfo=timezone.utc) + timedelta(days=1)
+        if end_at <= start_at:
+            raise AppException("结束日期不能早于开始日期", business_code=400, status_code=400)
+        return start_at, end_at
+    end_at = now_utc.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return end_at - timedelta(days=DEFAULT_RANGE_DAYS), end_at
+
+
+async def _resolve_dept_scope(session: AsyncSession, dept_name: str | None, current_staff: dict[str, Any]) -> str | None:
+    if normalize_role(str(current_staff.get("role") or "")) != "manager":
+        return dept_name or None
+    actor = await analytics_snapshot_repository.get_user(session, str(current_staff.get("staffId") or ""))
+    if actor is None or not actor.dept_name:
+        raise AppException("主管未绑定所属部门", business_code=400, status_code=403)
+    return actor.dept_name
+
+
+def _to_json_value(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+async def run_analytics_query(
+    session: AsyncSession,
+    name: str,
+    *,
+    start_date: str | None,
+    end_date: str | None,
+    dept_name: str | None,
+    current_staff: dict[str, Any],
+) -> dict[str, Any]:
+    manifest = _read_manifest()
+    scope_dept = await _resolve_dept_scope(session, dept_name, current_staff)
+    start_at, end_at = _resolve_range(start_date, end_date, datetime.now(timezone.utc))
+    params = {
+        "tz": await platform_setting_service.get_report_timezone(session),
+        "start_at": start_at,
+        "end_at": end_at,
+    }
+    rows = await asyncio.to_thread(_run_query, name, params, scope_dept)
+    return {
+        "generatedAt": manifest["generatedAt"],
+        "rows": [{key: _to_json_value(value) for key, value in row.items()} for row in rows],
+    }
+
+
+async def get_conversion_by_source(session: AsyncSession, **kwargs: Any) -> dict[str, Any]:
+    result = await run_analytics_query(session, "conversion", **kwargs)
+    result["rows"] = [
+        {
+            "week": row["week"],
+            "source": row["source"],
+            "project": row["project"],
+            "leads": int(row["leads"]),
+            "signed": int(row["signed"]),
+            "conversion": round(row["signed"] / row["leads"] * 100, 1) if row["leads"] else 0.0,
+        }
+        for row in result["rows"]
+    ]
+    return result
+
+
+async def get_rep_cohorts(session: AsyncSession, **kwargs: Any) -> dict[str, Any]:
+    result = await run_analytics_query(session, "rep_cohorts", **kwargs)
+    result["rows"] = [
+        {
+            "staffId": row["staff_id"],
+            "name": row["name"],
+            "cohort": row["cohort"],
+            "leads": int(row["leads"]),
+            "followed": int(row["followed"]),
+            "signed": int(row["signed"]),
+            "recycled": int(row["recycled"]),
+        }
+        for row in result["rows"]
+    ]
+    return result
+
+
+async def get_pool_flow(session: AsyncSession, **kwargs: Any) -> dict[str, Any]:
+    result = await run_analytics_query(session, "pool_flow", **kwargs)
+    result["rows"] = [
+        {
+            "week": row["week"],
+            "action": row["action"],
+            "transfers": int(row["transfers"]),
+            "leads": int(row["leads"]),
+        }
+        for row in result["rows"]
+    ]
+    return result
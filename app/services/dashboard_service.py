@@ -1,13 +1,34 @@
+import asyncio
+import json
+import logging
+from collections.abc import Iterable
 from datetime import datetime, timedelta, timezone
+from functools import partial
 from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import Cache, get_cache, single_flight
+from app.core.config import settings
 from app.core.rbac import normalize_role
+from app.db.concurrent_reads import run_concurrent_reads
+from app.db.session import AsyncSessionLocal
+from app.ws.bus import build_dashboard_channel, get_message_bus
 from app.models.lead import Lead
-from app.repositories import dashboard_repository, settings_repository
+from app.repositories import dashboard_repository
+from app.services import platform_setting_service
 
 
+logger = logging.getLogger(__name__)
+
+DASHBOARD_DELTA_EVENT = "dashboard_delta"
+LEAD_DELTA_METRICS = {"todayNewLeads", "monthSigned"}
+FOLLOW_UP_DELTA_METRIC = "weekFollowUps"
+
+DASHBOARD_CACHE_PREFIX = "dashboard:overview"
+DASHBOARD_CACHE_LOCK_SECONDS = 10
+DASHBOARD_CACHE_LOCK_WAIT_SECONDS = 3.0
+
 def _compute_trend(current: int, previous: int) -> float:
     if previous <= 0:
         return 100.0 if current > 0 else 0.0
@@ -20,135 +41,101 @@ def _summary_from_lead(lead: Lead) -> str:
 
 
 def _days_overdue(lead: Lead, now_utc: datetime) -> int:
-    drop_time_raw = (lead.dynamic_data or {}).get("drop_time")
-    if isinstance(drop_time_raw, str):
-        try:
-            drop_time = datetime.fromisoformat(drop_time_raw.replace("Z", "+00:00"))
-            return max(0, (now_utc - drop_time.astimezone(timezone.utc)).days)
-        except ValueError:
-            pass
+    if lead.drop_time:
+        return max(0, (now_utc - lead.drop_time.astimezone(timezone.utc)).days)
     if lead.updated_at:
         return max(0, (now_utc - lead.updated_at.astimezone(timezone.utc)).days)
     return 0
 
 
+def _period_starts(now_utc: datetime) -> tuple[datetime, datetime, datetime]:
+    today_start = now_utc.replace(hour=0, minute=0, second=0, microsecond=0)
+    week_start = today_start - timedelta(days=today_start.weekday())
+    month_start = today_start.replace(day=1)
+    return today_start, week_start, month_start
+
+
 def _to_percent(current: int, target: int) -> int:
     if target <= 0:
         return 0
     return max(0, min(100, int(round((current / target) * 100))))
 
 
-async def get_dashboard_overview(session: AsyncSession, current_staff: dict[str, Any]) -> dict[str, Any]:
+async def build_dashboard_overview(session: AsyncSession, current_staff: dict[str, Any]) -> dict[str, Any]:
     now_utc = datetime.now(timezone.utc)
 
-    today_start = now_utc.replace(hour=0, minute=0, second=0, microsecond=0)
+    today_start, week_start, month_start = _period_starts(now_utc)
     yesterday_start = today_start - timedelta(days=1)
-
-    week_start = (today_start - timedelta(days=today_start.weekday()))
     prev_week_start = week_start - timedelta(days=7)
-
-    month_start = now_utc.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    prev_month_end = month_start
     prev_month_start = (month_start - timedelta(days=1)).replace(day=1)
 
     staff_id = str(current_staff.get("staffId") or "")
     staff_role = normalize_role(str(current_staff.get("role") or ""))
-    staff_user = await dashboard_repository.get_user(session, staff_id) if staff_id else None
+    platform = await platform_setting_service.get_platform_setting(session)
+    staff_user, department_monthly_target = await dashboard_repository.get_overview_context(session, staff_id)
 
     scope_owner_id: str | None = None
     scope_dept_name: str | None = None
-    operator_keys: list[str] | None = None
+    operator_staff_id: str | None = None
 
     if staff_role == "sales":
         scope_owner_id = staff_id or None
         if staff_user is not None:
-            operator_keys = [staff_user.id, staff_user.name]
+            operator_staff_id = staff_user.id
     elif staff_role == "manager" and staff_user is not None and staff_user.dept_name:
         scope_dept_name = staff_user.dept_name
-        operator_keys = [staff_user.name]
-
-    today_new = await dashboard_repository.count_leads_between(
-        session,
-        start_at=today_start,
-        end_at=now_utc,
-        owner_id=scope_owner_id,
-        dept_name=scope_dept_name,
-    )
-    yesterday_new = await dashboard_repository.count_leads_between(
-        session,
-        start_at=yesterday_start,
-        end_at=today_start,
-        owner_id=scope_owner_id,
-        dept_name=scope_dept_name,
-    )
+        operator_staff_id = staff_user.id
 
-    week_followups = await dashboard_repository.count_followups_between(
-        session,
-        start_at=week_start,
-        end_at=now_utc,
-        operator_keys=operator_keys,
-    )
-    prev_week_followups = await dashboard_repository.count_followups_between(
-        session,
-        start_at=prev_week_start,
-        end_at=week_start,
-        operator_keys=operator_keys,
-    )
+    department_name: str | None = None
+    if staff_user is not None and staff_user.dept_name and staff_role in {"admin", "manager"}:
+        department_name = staff_user.dept_name
 
-    month_signed = await dashboard_repository.count_signed_leads_between(
-        session,
-        start_at=month_start,
-        end_at=now_utc,
-        owner_id=scope_owner_id,
-        dept_name=scope_dept_name,
-    )
-    prev_month_signed = await dashboard_repository.count_signed_leads_between(
+    lead_counts, followup_counts, (todo_leads, pool_leads) = await run_concurrent_reads(
         session,
-        start_at=prev_month_start,
-        end_at=prev_month_end,
-        owner_id=scope_owner_id,
-        dept_name=scope_dept_name,
+        partial(
+            dashboard_repository.count_lead_overview,
+            now=now_utc,
+            today_start=today_start,
+            yesterday_start=yesterday_start,
+            month_start=month_start,
+            prev_month_start=prev_month_start,
+            owner_id=scope_owner_id,
+            dept_name=scope_dept_name,
+            personal_owner_id=staff_id or None,
+            department_name=department_name,
+        ),
+        partial(
+            dashboard_repository.count_followup_overview,
+            now=now_utc,
+            week_start=week_start,
+            prev_week_start=prev_week_start,
+            operator_staff_id=operator_staff_id,
+        ),
+        partial(
+            dashboard_repository.list_overview_leads,
+            todo_limit=4,
+            warning_limit=2,
+            owner_id=scope_owner_id,
+            dept_name=scope_dept_name,
+        ),
     )
 
-    todo_leads = await dashboard_repository.list_todo_leads(
-        session,
-        limit=4,
-        owner_id=scope_owner_id,
-        dept_name=scope_dept_name,
-    )
-    pool_leads = await dashboard_repository.list_pool_warning_leads(
-        session,
-        limit=2,
-        owner_id=scope_owner_id,
-        dept_name=scope_dept_name,
-    )
+    today_new = lead_counts["today_new"]
+    yesterday_new = lead_counts["yesterday_new"]
+    month_signed = lead_counts["month_signed"]
+    prev_month_signed = lead_counts["prev_month_signed"]
+    week_followups = followup_counts["week_followups"]
+    prev_week_followups = followup_counts["prev_week_followups"]
 
-    platform = await dashboard_repository.get_platform_setting(session)
     followup_target = int(platform.max_leads_per_rep) if platform else 200
     signed_target = int((platform.annual_target / 12)) if platform and platform.annual_target > 0 else 10
     announcement = (platform.announcement or "").strip() if platform else ""
 
     personal_signed_target = int(staff_user.monthly_target) if staff_user is not None else 0
-    personal_signed_current = await dashboard_repository.count_signed_leads_between(
-        session,
-        start_at=month_start,
-        end_at=now_utc,
-        owner_id=staff_id or None,
-    )
+    personal_signed_current = lead_counts["personal_signed"]
 
-    department_signed_target = 0
-    department_signed_current = 0
-    if staff_user is not None and staff_user.dept_name:
-        if staff_role in {"admin", "manager"}:
-            department_signed_current = await dashboard_repository.count_signed_leads_between(
-                session,
-                start_at=month_start,
-                end_at=now_utc,
-                dept_name=staff_user.dept_name,
-            )
-            department = await settings_repository.get_department_by_name(session, staff_user.dept_name)
-            if department is not None:
-                department_signed_target = int(department.monthly_target)
+    department_signed_target = department_monthly_target if department_name else 0
+    department_signed_current = lead_counts["department_signed"]
 
     if staff_role == "sales":
         if personal_signed_target > 0:
@@ -203,3 +190,149 @@ async def get_dashboard_overview(session: AsyncSession, current_staff: dict[str,
         },
         "announcement": announcement,
     }
+
+
+def _cache_scope(staff_role: str, staff_id: str, dept_name: str | None) -> str:
+    if staff_role == "sales":
+        return f"staff:{staff_id}"
+    if staff_role == "manager" and dept_name:
+        return f"dept:{dept_name}"
+    return "global"
+
+
+def _generation_key(scope: str) -> str:
+    return f"{DASHBOARD_CACHE_PREFIX}:gen:{scope}"
+
+
+async def _read_cached_overview(cache: Cache, entry_key: str) -> dict[str, Any] | None:
+    raw = await cache.get(entry_key)
+    if raw is None:
+        return None
+    entry = json.loads(raw)
+    generation = await cache.get(_generation_key(entry["scope"]))
+    if int(generation or 0) != entry["generation"]:
+        return None
+    return entry["data"]
+
+
+async def _compute_cached_overview(current_staff: dict[str, Any], entry_key: str) -> dict[str, Any]:
+    cache = get_cache()
+    lock_key = f"{entry_key}:lock"
+    locked = await cache.add(lock_key, "1", DASHBOARD_CACHE_LOCK_SECONDS)
+    if not locked:
+        # Another worker is already computing this key; wait briefly for its result.
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + DASHBOARD_CACHE_LOCK_WAIT_SECONDS
+        while loop.time() < deadline:
+            await asyncio.sleep(0.05)
+            data = await _read_cached_overview(cache, entry_key)
+            if data is not None:
+                return data
+
+    try:
+        staff_id = str(current_staff.get("staffId") or "")
+        staff_role = normalize_role(str(current_staff.get("role") or ""))
+        async with AsyncSessionLocal() as session:
+            staff_user = await dashboard_repository.get_user(session, staff_id) if staff_id else None
+            scope = _cache_scope(staff_role, staff_id, staff_user.dept_name if staff_user is not None else None)
+            # Read the generation before computing so a write landing mid-way invalidates this entry.
+            generation = int(await cache.get(_generation_key(scope)) or 0)
+            data = await build_dashboard_overview(session, current_staff)
+        entry = {"scope": scope, "generation": generation, "data": data}
+        await cache.set(entry_key, json.dumps(entry, ensure_ascii=False), settings.dashboard_cache_ttl_seconds)
+        return data
+    finally:
+        if locked:
+            await cache.delete(lock_key)
+
+
+async def get_dashboard_overview(session: AsyncSession, current_staff: dict[str, Any]) -> dict[str, Any]:
+    if settings.dashboard_cache_ttl_seconds <= 0:
+        return await build_dashboard_overview(session, current_staff)
+
+    staff_id = str(current_staff.get("staffId") or "")
+    staff_role = normalize_role(str(current_staff.get("role") or ""))
+    entry_key = f"{DASHBOARD_CACHE_PREFIX}:entry:{staff_role}:{staff_id}"
+    data = await _read_cached_overview(get_cache(), entry_key)
+    if data is not None:
+        return data
+    return await single_flight(entry_key, partial(_compute_cached_overview, current_staff, entry_key))
+
+
+async def invalidate_overview_cache(session: AsyncSession, staff_ids: Iterable[str | None]) -> None:
+    if settings.dashboard_cache_ttl_seconds <= 0:
+        return
+    owner_ids = sorted({str(staff_id) for staff_id in staff_ids if staff_id})
+    try:
+        dept_names = await dashboard_repository.list_dept_names(session, owner_ids)
+        cache = get_cache()
+        scopes = ["global", *(f"staff:{staff_id}" for staff_id in owner_ids), *(f"dept:{name}" for name in dept_names)]
+        for scope in scopes:
+            await cache.incr(_generation_key(scope))
+    except Exception:
+        # The write is already committed; a stale dashboard for one TTL beats failing the request.
+        logger.warning("dashboard_cache_invalidation_failed staff_ids=%s", owner_ids, exc_info=True)
+
+
+async def _publish_delta(scopes: list[str], metric: str, delta: int) -> None:
+    bus = get_message_bus()
+    for scope in scopes:
+        event = {"type": DASHBOARD_DELTA_EVENT, "metric": metric, "delta": delta, "scope": scope}
+        await bus.publish(build_dashboard_channel(scope), json.dumps(event, ensure_ascii=False))
+
+
+async def publish_lead_deltas(
+    session: AsyncSession,
+    *,
+    owner_id: str | None,
+    created_at: datetime | None,
+    is_new: bool,
+    became_signed: bool,
+) -> None:
+    now_utc = datetime.now(timezone.utc)
+    today_start, _, month_start = _period_starts(now_utc)
+    created = (created_at or now_utc).astimezone(timezone.utc)
+    metrics: list[str] = []
+    if is_new and created >= today_start:
+        metrics.append("todayNewLeads")
+    if became_signed and created >= month_start:
+        metrics.append("monthSigned")
+    if not metrics:
+        return
+    try:
+        scopes = ["global"]
+        if owner_id:
+            scopes.append(f"staff:{owner_id}")
+            scopes.extend(f"dept:{name}" for name in await dashboard_repository.list_dept_names(session, [owner_id]))
+        for metric in metrics:
+            await _publish_delta(scopes, metric, 1)
+    except Exception:
+        logger.warning("dashboard_delta_publish_failed owner_id=%s", owner_id, exc_info=True)
+
+
+async def publish_follow_up_delta(*, staff_id: str | None, timestamp: datetime | None) -> None:
+    now_utc = datetime.now(timezone.utc)
+    _, week_start, _ = _period_starts(now_utc)
+    if (timestamp or now_utc).astimezone(timezone.utc) < week_start:
+        return
+    try:
+        # Follow-up counters are per operator, never per department, so no dept channel here.
+        scopes = ["global", f"staff:{staff_id}"] if staff_id else ["global"]
+        await _publish_delta(scopes, FOLLOW_UP_DELTA_METRIC, 1)
+    except Exception:
+        logger.warning("dashboard_delta_publish_failed staff_id=%s", staff_id, exc_info=True)
+
+
+async def resolve_dashboard_subscriptions(staff_id: str, role: str | None) -> list[tuple[str, set[str] | None]]:
+    # Returns (channel, accepted metrics); None accepts every metric on that channel.
+    async with AsyncSessionLocal() as session:
+        staff_user = await dashboard_repository.get_user(session, staff_id) if staff_id else None
+    staff_role = normalize_role(role or (staff_user.role if staff_user is not None else ""))
+    if staff_role == "sales":
+        return [(build_dashboard_channel(f"staff:{staff_id}"), None)]
+    if staff_role == "manager" and staff_user is not None and staff_user.dept_name:
+        return [
+            (build_dashboard_channel(f"dept:{staff_user.dept_name}"), LEAD_DELTA_METRICS),
+            (build_dashboard_channel(f"staff:{staff_id}"), {FOLLOW_UP_DELTA_METRIC}),
+        ]
+    return [(build_dashboard_channel("global"), None)]
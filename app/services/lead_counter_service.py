@@ -0,0 +1,88 @@
+import logging
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.lead_status import is_active_status
+from app.core.rbac import normalize_role
+from app.db.session import AsyncSessionLocal
+from app.repositories import lead_counter_repository, leads_repository
+
+
+logger = logging.getLogger(__name__)
+
+
+def record_owner_change(
+    deltas: dict[str, int],
+    *,
+    old_owner_id: str | None,
+    old_status: str | None,
+    new_owner_id: str | None,
+    new_status: str | None,
+) -> None:
+    if old_owner_id and is_active_status(old_status):
+        deltas[old_owner_id] = deltas.get(old_owner_id, 0) - 1
+    if new_owner_id and is_active_status(new_status):
+        deltas[new_owner_id] = deltas.get(new_owner_id, 0) + 1
+
+
+async def apply_owner_deltas(session: AsyncSession, deltas: dict[str, int]) -> None:
+    await lead_counter_repository.increment_counters(session, deltas)
+
+
+async def get_active_lead_counts(session: AsyncSession, staff_ids: list[str]) -> dict[str, int]:
+    counts = await lead_counter_repository.get_counts(session, staff_ids)
+    return {staff_id: counts.get(staff_id, 0) for staff_id in staff_ids}
+
+
+async def lock_active_lead_counts(session: AsyncSession, staff_ids: list[str]) -> dict[str, int]:
+    # Holds the counter rows until commit so concurrent distributions cannot both fill the same room.
+    counts = await lead_counter_repository.lock_counts(session, staff_ids)
+    return {staff_id: counts.get(staff_id, 0) for staff_id in staff_ids}
+
+
+async def list_staff_lead_counters(
+    session: AsyncSession,
+    current_staff: dict[str, Any],
+    staff_id: str | None = None,
+) -> dict[str, Any]:
+    role = normalize_role(str(current_staff.get("role") or ""))
+    actor_staff_id = str(current_staff.get("staffId") or "")
+    if role == "sales":
+        actor = await leads_repository.get_user(session, actor_staff_id)
+        users = [actor] if actor is not None else []
+    elif role == "manager":
+        actor = await leads_repository.get_user(session, actor_staff_id)
+        if actor is None or not actor.dept_name:
+            return {"list": []}
+        users = await leads_repository.list_active_users_by_department(session, actor.dept_name)
+    else:
+        users = await leads_repository.list_active_users(session)
+
+    if staff_id:
+        users = [user for user in users if user.id == staff_id]
+    counts = await get_active_lead_counts(session, [user.id for user in users])
+    return {
+        "list": [
+            {"staffId": user.id, "name": user.name, "activeLeads": counts[user.id]}
+            for user in users
+        ]
+    }
+
+
+async def reconcile_staff_lead_counters(session: AsyncSession) -> dict[str, Any]:
+    rows = await lead_counter_repository.reconcile_counts(session)
+    fixes = [(staff_id, stored, actual) for staff_id, stored, actual in rows if stored != actual]
+    await lead_counter_repository.commit(session)
+    if fixes:
+        logger.warning("staff_lead_counters drift fixed staff_count=%s", len(fixes))
+
+    return {
+        "checked": len(rows),
+        "fixed": [{"staffId": staff_id, "stored": stored, "actual": actual} for staff_id, stored, actual in fixes],
+    }
+
+
+async def run_reconcile_once() -> dict[str, Any]:
+    async with AsyncSessionLocal() as session:
+        return await reconcile_staff_lead_counters(session)
@@ -0,0 +1,229 @@
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.lead_status import DEPOSIT_LEAD_STATUSES, LOST_LEAD_STATUSES, SIGNED_LEAD_STATUSES
+from app.db.session import AsyncSessionLocal
+from app.models.lead import Lead
+from app.repositories import (
+    lead_stats_repository,
+    lead_status_event_repository,
+    report_bucket_repository,
+    report_cache_repository,
+    report_snapshot_repository,
+)
+
+
+# (owner_id, source, status, level, loss_reason)
+LeadSnapshot = tuple[str | None, str, str, str, str]
+
+
+@dataclass
+class LeadStatDeltas:
+    # (day, owner_id, source, status) -> metric deltas; departments are resolved when applied.
+    leads: dict[tuple[date, str, str, str], dict[str, int]] = field(default_factory=dict)
+    # (day, operator) -> follow-up delta; operators are resolved to staff when applied.
+    follow_ups: dict[tuple[date, str], int] = field(default_factory=dict)
+    # UTC days on which a lead, follow-up or status event was added or removed; cached report
+    # periods covering them are purged.
+    report_days: set[date] = field(default_factory=set)
+    # (month, owner_id, status, level, loss_reason) -> (lead delta, earliest created_at) for
+    # monthly_lead_buckets; only months that are already built take the deltas.
+    lead_buckets: dict[tuple[date, str, str, str, str], tuple[int, datetime]] = field(default_factory=dict)
+    # (month, operator_staff_id) -> (follow-up delta, earliest timestamp) for monthly_follow_up_buckets.
+    follow_up_buckets: dict[tuple[date, str], tuple[int, datetime]] = field(default_factory=dict)
+    # Rows for lead_status_events, appended whenever a lead enters a new status.
+    status_events: list[dict[str, Any]] = field(default_factory=list)
+
+
+def _add_bucket_delta(buckets: dict[Any, tuple[int, datetime]], key: Any, count: int, at: datetime) -> None:
+    current, first_at = buckets.get(key, (0, at))
+    buckets[key] = (current + count, min(first_at, at))
+
+
+def _loss_reason(status: str, dynamic_data: dict[str, Any] | None) -> str:
+    # Same rule as reports_repository._loss_reason_expr: only lost statuses carry a reason.
+    if status not in LOST_LEAD_STATUSES:
+        return ""
+    for key in ("loss_reason", "drop_reason_type"):
+        value = (dynamic_data or {}).get(key)
+        if value is None:
+            continue
+        text = (value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)).strip(" ")
+        if text:
+            return text
+    return "其他原因"
+
+
+def lead_snapshot(lead: Lead) -> LeadSnapshot:
+    status = str(lead.status or "")
+    return (
+        lead.owner_id,
+        str(lead.source or ""),
+        status,
+        str(lead.level or ""),
+        _loss_reason(status, lead.dynamic_data),
+    )
+
+
+def record_lead_change(
+    deltas: LeadStatDeltas,
+    *,
+    lead_id: str,
+    created_at: datetime | None,
+    before: LeadSnapshot | None,
+    after: LeadSnapshot | None,
+) -> None:
+    if before == after:
+        return
+    if after is not None and (before is None or before[2] != after[2]):
+        occurred_at = datetime.now(timezone.utc)
+        deltas.status_events.append(
+            {
+                "lead_id": lead_id,
+                "from_status": before[2] if before is not None else None,
+                "to_status": after[2],
+                "owner_id": after[0],
+                "occurred_at": occurred_at,
+            }
+        )
+        deltas.report_days.add(occurred_at.date())
+    # Cached reports are only purged when the lead itself appears or disappears; owner and status
+    # changes on older leads reach closed periods when their cache entry expires. Buckets group
+    # leads by creation month with their current state, so they move the lead between rows.
+    created = (created_at or datetime.now(timezone.utc)).astimezone(timezone.utc)
+    day = created.date()
+    if before is None or after is None:
+        deltas.report_days.add(day)
+    for snapshot, sign in ((before, -1), (after, 1)):
+        if snapshot is None:
+            continue
+        owner_id, source, status, level, loss_reason = snapshot
+        _add_bucket_delta(
+            deltas.lead_buckets,
+            (day.replace(day=1), owner_id or "", status, level, loss_reason),
+            sign,
+            created,
+        )
+        metrics = deltas.leads.setdefault(
+            (day, owner_id or "", source, status),
+            {"new_leads": 0, "signed": 0, "deposit_paid": 0},
+        )
+        metrics["new_leads"] += sign
+        if status in SIGNED_LEAD_STATUSES:
+            metrics["signed"] += sign
+        if status in DEPOSIT_LEAD_STATUSES:
+            metrics["deposit_paid"] += sign
+
+
+def record_follow_up(
+    deltas: LeadStatDeltas,
+    *,
+    timestamp: datetime | None,
+    operator: str,
+    operator_staff_id: str | None,
+    count: int = 1,
+) -> None:
+    at = (timestamp or datetime.now(timezone.utc)).astimezone(timezone.utc)
+    key = (at.date(), operator)
+    deltas.follow_ups[key] = deltas.follow_ups.get(key, 0) + count
+    deltas.report_days.add(at.date())
+    # Monthly buckets only count follow-ups with a resolved staff ID, like the bucket build.
+    if operator_staff_id:
+        _add_bucket_delta(deltas.follow_up_buckets, (at.date().replace(day=1), operator_staff_id), count, at)
+
+
+async def record_lead_removals(session: AsyncSession, deltas: LeadStatDeltas, leads: list[Lead]) -> None:
+    # Call before the leads and their follow-ups are deleted.
+    for lead in leads:
+        record_lead_change(deltas, lead_id=lead.id, created_at=lead.created_at, before=lead_snapshot(lead), after=None)
+    lead_ids = [lead.id for lead in leads]
+    rows = await lead_stats_repository.count_follow_ups_by_day_operator(session, lead_ids)
+    for day, operator, staff_id, count in rows:
+        record_follow_up(
+            deltas,
+            timestamp=datetime.combine(day, time.min, tzinfo=timezone.utc),
+            operator=operator,
+            operator_staff_id=staff_id,
+            count=-count,
+        )
+    deltas.report_days.update(await lead_status_event_repository.list_event_days(session, lead_ids))
+
+
+async def apply_stat_deltas(session: AsyncSession, deltas: LeadStatDeltas) -> None:
+    owner_ids = sorted({owner_id for _, owner_id, _, _ in deltas.leads if owner_id})
+    dept_map = await lead_stats_repository.map_dept_names(session, owner_ids)
+    operators = sorted({operator for _, operator in deltas.follow_ups})
+    operator_map = await lead_stats_repository.resolve_operators(session, operators)
+
+    merged: dict[tuple[date, str, str, str, str], dict[str, int]] = {}
+    zero = {"new_leads": 0, "follow_ups": 0, "signed": 0, "deposit_paid": 0}
+    for (day, owner_id, source, status), metrics in deltas.leads.items():
+        row = merged.setdefault((day, owner_id, dept_map.get(owner_id, ""), source, status), dict(zero))
+        for name, value in metrics.items():
+            row[name] += value
+    for (day, operator), count in deltas.follow_ups.items():
+        staff_id, dept_name = operator_map.get(operator, ("", ""))
+        row = merged.setdefault((day, staff_id, dept_name, "", ""), dict(zero))
+        row["follow_ups"] += count
+
+    # Sorted keys keep concurrent writers locking rows in the same order.
+    rows = [
+        {"day": day, "owner_id": owner_id, "dept_name": dept_name, "source": source, "status": status, **metrics}
+        for (day, owner_id, dept_name, source, status), metrics in sorted(merged.items())
+        if any(metrics.values())
+    ]
+    await lead_stats_repository.upsert_stat_deltas(session, rows)
+    await lead_status_event_repository.insert_events(session, deltas.status_events)
+    # Only cache entries and snapshots whose range covers a day that gained or lost a fact are
+    # dropped; snapshots are rebuilt nightly anyway.
+    report_days = sorted(deltas.report_days)
+    await report_cache_repository.purge_days(session, report_days)
+    await report_snapshot_repository.purge_days(session, report_days)
+
+    # Sorted keys as for the rollup rows; each month's shared lock waits out a build of that month.
+    lead_bucket_rows = [
+        {
+            "month": month,
+            "owner_id": owner_id,
+            "status": status,
+            "level": level,
+            "loss_reason": loss_reason,
+            "leads": count,
+            "first_created_at": first_at,
+        }
+        for (month, owner_id, status, level, loss_reason), (count, first_at) in sorted(deltas.lead_buckets.items())
+        if count
+    ]
+    follow_up_bucket_rows = [
+        {"month": month, "operator_staff_id": staff_id, "follow_ups": count, "first_at": first_at}
+        for (month, staff_id), (count, first_at) in sorted(deltas.follow_up_buckets.items())
+        if count
+    ]
+    months = sorted({row["month"] for row in lead_bucket_rows + follow_up_bucket_rows})
+    await report_bucket_repository.lock_months_for_deltas(session, months)
+    await report_bucket_repository.apply_lead_bucket_deltas(session, lead_bucket_rows)
+    await report_bucket_repository.apply_follow_up_bucket_deltas(session, follow_up_bucket_rows)
+
+
+async def rebuild_daily_lead_stats(session: AsyncSession, start_day: date, end_day: date) -> dict[str, Any]:
+    # end_day is exclusive.
+    await lead_stats_repository.lock_for_rebuild(session)
+    await lead_stats_repository.delete_range(session, start_day, end_day)
+    await lead_stats_repository.insert_rebuilt_rows(
+        session,
+        start_at=datetime.combine(start_day, time.min, tzinfo=timezone.utc),
+        end_at=datetime.combine(end_day, time.min, tzinfo=timezone.utc),
+        signed_statuses=list(SIGNED_LEAD_STATUSES),
+        deposit_statuses=list(DEPOSIT_LEAD_STATUSES),
+    )
+    await lead_stats_repository.commit(session)
+    return {"startDay": start_day.isoformat(), "endDay": (end_day - timedelta(days=1)).isoformat()}
+
+
+async def run_rebuild_once(start_day: date, end_day: date) -> dict[str, Any]:
+    async with AsyncSessionLocal() as session:
+        return await rebuild_daily_lead_stats(session, start_day, end_day)
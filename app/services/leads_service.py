@@ -14,13 +14,15 @@ from app.core.config import settings
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import AppException
+from app.core.lead_status import LEAD_STATUS_SIGNED, normalize_lead_status
 from app.core.rbac import normalize_role
 from app.models.follow_up_record import FollowUpRecord
 from app.models.lead import Lead
 from app.models.pool_transfer_log import PoolTransferLog
 from app.models.user import User
-from app.repositories import leads_repository, settings_repository
+from app.repositories import lead_stats_repository, leads_repository, settings_repository
 from app.schemas.lead import FollowUpCreate, LeadCreate, LeadUpdate
+from app.services import dashboard_service, lead_counter_service, lead_stats_service, platform_setting_service
 
 
 logger = logging.getLogger(__name__)
@@ -39,7 +41,7 @@ class AiRuntimeConfig:
 async def _resolve_ai_runtime_config(session: AsyncSession) -> AiRuntimeConfig:
     platform_setting = None
     try:
-        platform_setting = await settings_repository.get_platform_setting(session)
+        platform_setting = await platform_setting_service.get_platform_setting(session)
     except Exception:
         platform_setting = None
 
@@ -96,29 +98,6 @@ _SOURCE_ALIASES: dict[str, str] = {
 }
 
 
-_STATUS_ALIASES: dict[str, str] = {
-    "待跟进": "pending",
-    "pending": "pending",
-    "初步沟通": "communicating",
-    "communicating": "communicating",
-    "深度跟进": "deep_following",
-    "deep_following": "deep_following",
-    "已邀约": "invited",
-    "invited": "invited",
-    "已到访": "visited",
-    "visited": "visited",
-    "已交定金": "deposit_paid",
-    "deposit_paid": "deposit_paid",
-    "已签约": "signed",
-    "signed": "signed",
-    "无效线索": "invalid",
-    "无效客户": "invalid",
-    "invalid": "invalid",
-    "战败流失": "lost",
-    "lost": "lost",
-}
-
-
 _SOURCE_EXPORT_LABELS: dict[str, str] = {
     "douyin": "抖音广告",
     "baidu": "百度搜索",
@@ -179,13 +158,6 @@ def _normalize_source(value: str) -> str:
     return _SOURCE_ALIASES.get(text, text)
 
 
-def _normalize_status(value: str) -> str:
-    text = value.strip()
-    if not text:
-        return "pending"
-    return _STATUS_ALIASES.get(text, text)
-
-
 def _normalize_level(value: str) -> str:
     text = value.strip().upper()
     if not text:
@@ -265,7 +237,7 @@ async def list_leads(
 
     base_query = leads_repository.build_leads_query(
         keyword,
-        status,
+        normalize_lead_status(status) if status else None,
         source,
         owner_id=owner_id,
         owner_ids=owner_ids,
@@ -335,16 +307,43 @@ async def create_lead(
         phone=payload.phone,
         project=payload.project,
         source=payload.source,
-        status=payload.status,
+        status=normalize_lead_status(payload.status),
         level=payload.level,
         owner_id=owner_id,
         last_follow_up=payload.last_follow_up,
         tags=payload.tags,
         dynamic_data=payload.dynamic_data,
+        drop_time=None if owner_id else datetime.now(timezone.utc),
     )
     leads_repository.add_lead(session, lead)
+    counter_deltas: dict[str, int] = {}
+    lead_counter_service.record_owner_change(
+        counter_deltas,
+        old_owner_id=None,
+        old_status=None,
+        new_owner_id=lead.owner_id,
+        new_status=lead.status,
+    )
+    await lead_counter_service.apply_owner_deltas(session, counter_deltas)
+    stat_deltas = lead_stats_service.LeadStatDeltas()
+    lead_stats_service.record_lead_change(
+        stat_deltas,
+        lead_id=lead.id,
+        created_at=lead.created_at,
+        before=None,
+        after=lead_stats_service.lead_snapshot(lead),
+    )
+    await lead_stats_service.apply_stat_deltas(session, stat_deltas)
     await leads_repository.commit(session)
+    await dashboard_service.invalidate_overview_cache(session, [lead.owner_id])
     await leads_repository.refresh(session, lead)
+    await dashboard_service.publish_lead_deltas(
+        session,
+        owner_id=lead.owner_id,
+        created_at=lead.created_at,
+        is_new=True,
+        became_signed=lead.status == LEAD_STATUS_SIGNED,
+    )
     return _to_lead_dict(lead)
 
 
@@ -360,6 +359,8 @@ async def update_lead(
     await _ensure_lead_access(session, lead, current_staff)
 
     updates = payload.model_dump(exclude_none=True)
+    if "status" in updates:
+        updates["status"] = normalize_lead_status(updates["status"])
     if "owner" in updates and updates["owner"]:
         target_staff = await leads_repository.get_user(session, updates["owner"])
         if target_staff is None:
@@ -373,14 +374,44 @@ async def update_lead(
                 target_staff=target_staff,
             )
 
+    old_owner_id = lead.owner_id
+    old_status = lead.status
+    old_snapshot = lead_stats_service.lead_snapshot(lead)
     for key, value in updates.items():
         if key == "owner":
             setattr(lead, "owner_id", value)
         else:
             setattr(lead, key, value)
 
+    counter_deltas: dict[str, int] = {}
+    lead_counter_service.record_owner_change(
+        counter_deltas,
+        old_owner_id=old_owner_id,
+        old_status=old_status,
+        new_owner_id=lead.owner_id,
+        new_status=lead.status,
+    )
+    await lead_counter_service.apply_owner_deltas(session, counter_deltas)
+    stat_deltas = lead_stats_service.LeadStatDeltas()
+    lead_stats_service.record_lead_change(
+        stat_deltas,
+        lead_id=lead.id,
+        created_at=lead.created_at,
+        before=old_snapshot,
+        after=lead_stats_service.lead_snapshot(lead),
+    )
+    await lead_stats_service.apply_stat_deltas(session, stat_deltas)
     await leads_repository.commit(session)
+    await dashboard_service.invalidate_overview_cache(session, [old_owner_id, lead.owner_id])
     await leads_repository.refresh(session, lead)
+    if old_status != LEAD_STATUS_SIGNED and lead.status == LEAD_STATUS_SIGNED:
+        await dashboard_service.publish_lead_deltas(
+            session,
+            owner_id=lead.owner_id,
+            created_at=lead.created_at,
+            is_new=False,
+            became_signed=True,
+        )
     return _to_lead_dict(lead)
 
 
@@ -394,9 +425,23 @@ async def delete_lead(
         raise AppException("客户不存在", business_code=400, status_code=404)
     await _ensure_lead_access(session, lead, current_staff)
 
+    owner_id = lead.owner_id
+    counter_deltas: dict[str, int] = {}
+    lead_counter_service.record_owner_change(
+        counter_deltas,
+        old_owner_id=owner_id,
+        old_status=lead.status,
+        new_owner_id=None,
+        new_status=None,
+    )
+    stat_deltas = lead_stats_service.LeadStatDeltas()
+    await lead_stats_service.record_lead_removals(session, stat_deltas, [lead])
     await leads_repository.delete_follow_ups_by_lead(session, lead_id)
     await leads_repository.delete_lead(session, lead)
+    await lead_counter_service.apply_owner_deltas(session, counter_deltas)
+    await lead_stats_service.apply_stat_deltas(session, stat_deltas)
     await leads_repository.commit(session)
+    await dashboard_service.invalidate_overview_cache(session, [owner_id])
 
 
 async def create_follow_up(
@@ -410,20 +455,35 @@ async def create_follow_up(
         raise AppException("客户不存在", business_code=400, status_code=404)
     await _ensure_lead_access(session, lead, current_staff)
 
+    resolved = await lead_stats_repository.resolve_operators(session, [payload.operator])
     record = FollowUpRecord(
         lead_id=lead_id,
         type=payload.type,
         content=payload.content,
         operator=payload.operator,
+        operator_staff_id=resolved[payload.operator][0] or None,
         timestamp=payload.timestamp or datetime.now(timezone.utc),
         audio_url=payload.audio_url,
         ai_analysis=payload.ai_analysis,
     )
     leads_repository.add_follow_up(session, record)
     lead.last_follow_up = record.timestamp
+    stat_deltas = lead_stats_service.LeadStatDeltas()
+    lead_stats_service.record_follow_up(
+        stat_deltas,
+        timestamp=record.timestamp,
+        operator=record.operator_staff_id or record.operator,
+        operator_staff_id=record.operator_staff_id,
+    )
+    await lead_stats_service.apply_stat_deltas(session, stat_deltas)
     await leads_repository.commit(session)
+    await dashboard_service.invalidate_overview_cache(
+        session,
+        [lead.owner_id, str(current_staff.get("staffId") or "") if current_staff else None],
+    )
     await leads_repository.refresh(session, record)
     await leads_repository.refresh(session, lead)
+    await dashboard_service.publish_follow_up_delta(staff_id=record.operator_staff_id, timestamp=record.timestamp)
     return _to_record_dict(record)
 
 
@@ -698,16 +758,38 @@ async def assign_leads(
     )
 
     assigned_ids: list[str] = []
+    previous_owner_ids: set[str | None] = set()
+    counter_deltas: dict[str, int] = {}
+    stat_deltas = lead_stats_service.LeadStatDeltas()
     for lead_id in lead_ids:
         lead = await leads_repository.get_lead(session, lead_id)
         if lead is None:
             continue
         if lead.owner_id == staff_id:
             continue
+        lead_counter_service.record_owner_change(
+            counter_deltas,
+            old_owner_id=lead.owner_id,
+            old_status=lead.status,
+            new_owner_id=staff_id,
+            new_status=lead.status,
+        )
+        previous_owner_ids.add(lead.owner_id)
+        old_snapshot = lead_stats_service.lead_snapshot(lead)
         lead.owner_id = staff_id
+        lead_stats_service.record_lead_change(
+            stat_deltas,
+            lead_id=lead.id,
+            created_at=lead.created_at,
+            before=old_snapshot,
+            after=lead_stats_service.lead_snapshot(lead),
+        )
         assigned_ids.append(lead_id)
 
+    await lead_counter_service.apply_owner_deltas(session, counter_deltas)
+    await lead_stats_service.apply_stat_deltas(session, stat_deltas)
     await leads_repository.commit(session)
+    await dashboard_service.invalidate_overview_cache(session, [staff_id, *previous_owner_ids])
     return {
         "leadIds": assigned_ids,
         "staffId": staff_id,
@@ -724,6 +806,9 @@ async def transfer_leads_to_pool(
     operator_name = str(current_staff.get("name") or "当前员工")
     now = datetime.now(timezone.utc)
     transferred_ids: list[str] = []
+    previous_owner_ids: set[str] = set()
+    counter_deltas: dict[str, int] = {}
+    stat_deltas = lead_stats_service.LeadStatDeltas()
 
     for lead_id in lead_ids:
         lead = await leads_repository.get_lead(session, lead_id)
@@ -739,6 +824,14 @@ async def transfer_leads_to_pool(
         if previous_owner is not None and previous_owner.name:
             previous_owner_name = previous_owner.name
 
+        lead_counter_service.record_owner_change(
+            counter_deltas,
+            old_owner_id=previous_owner_id,
+            old_status=lead.status,
+            new_owner_id=None,
+            new_status=lead.status,
+        )
+        old_snapshot = lead_stats_service.lead_snapshot(lead)
         lead.owner_id = None
         dynamic_data = dict(lead.dynamic_data or {})
         dynamic_data.update(
@@ -750,6 +843,17 @@ async def transfer_leads_to_pool(
             }
         )
         lead.dynamic_data = dynamic_data
+        lead.drop_reason_type = "手动转入公海"
+        lead.drop_time = now
+        lead.original_owner_id = previous_owner_id
+        # Taken after the drop reason is set; it is a lost lead's loss reason when it has none.
+        lead_stats_service.record_lead_change(
+            stat_deltas,
+            lead_id=lead.id,
+            created_at=lead.created_at,
+            before=old_snapshot,
+            after=lead_stats_service.lead_snapshot(lead),
+        )
 
         leads_repository.add_pool_transfer_log(
             session,
@@ -763,8 +867,12 @@ async def transfer_leads_to_pool(
             ),
         )
         transferred_ids.append(lead_id)
+        previous_owner_ids.add(previous_owner_id)
 
+    await lead_counter_service.apply_owner_deltas(session, counter_deltas)
+    await lead_stats_service.apply_stat_deltas(session, stat_deltas)
     await leads_repository.commit(session)
+    await dashboard_service.invalidate_overview_cache(session, previous_owner_ids)
     return {
         "leadIds": transferred_ids,
         "count": len(transferred_ids),
@@ -780,7 +888,7 @@ async def export_leads_csv(
 ) -> bytes:
     base_query = leads_repository.build_leads_query(
         keyword,
-        status,
+        normalize_lead_status(status) if status else None,
         source,
         exclude_pool=True,
     )
@@ -897,7 +1005,7 @@ async def import_leads_csv(
             phone = _field_value(row, "phone")
             source = _normalize_source(_field_value(row, "source"))
             project = _field_value(row, "project") or "默认项目"
-            status = _normalize_status(_field_value(row, "status"))
+            status = normalize_lead_status(_field_value(row, "status"))
             level = _normalize_level(_field_value(row, "level"))
             owner = _field_value(row, "owner") or None
 
@@ -14,6 +14,7 @@ def _to_dict(entity: SystemNotification) -> dict[str, Any]:
         "title": entity.title,
         "content": entity.content,
         "category": entity.category,
+        "payload": entity.payload,
         "isRead": entity.is_read,
         "createdAt": entity.created_at.isoformat(sep=" ") if entity.created_at else None,
         "readAt": entity.read_at.isoformat(sep=" ") if entity.read_at else None,
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, fields
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.platform_setting import PlatformSetting
+from app.repositories import settings_repository
+from app.ws.bus import get_message_bus
+
+
+logger = logging.getLogger(__name__)
+
+RESUBSCRIBE_DELAY_SECONDS = 5
+DEFAULT_REPORT_TIMEZONE = "Asia/Shanghai"
+
+
+@dataclass(frozen=True)
+class PlatformSettingSnapshot:
+    id: int
+    company_name: str
+    official_phone: str
+    announcement: str
+    annual_target: int
+    monthly_targets: list[int]
+    max_leads_per_rep: int
+    global_drop_warning_days: int
+    ai_enabled: bool
+    ai_api_key: str
+    ai_base_url: str
+    ai_model: str
+    ai_timeout_seconds: int
+    report_timezone: str
+
+
+@dataclass
+class _CacheEntry:
+    version: int
+    loaded_at: float
+    snapshot: PlatformSettingSnapshot | None
+
+
+# The row is process-wide and almost never changes; readers only hit the database
+# after an invalidation bumped the version or the safety TTL lapsed.
+_version = 0
+_entry: _CacheEntry | None = None
+_load_lock = asyncio.Lock()
+_worker_id = uuid.uuid4().hex
+
+
+def _to_snapshot(entity: PlatformSetting) -> PlatformSettingSnapshot:
+    values = {item.name: getattr(entity, item.name) for item in fields(PlatformSettingSnapshot)}
+    values["monthly_targets"] = list(values["monthly_targets"] or [])
+    return PlatformSettingSnapshot(**values)
+
+
+def _fresh(entry: _CacheEntry | None) -> bool:
+    return (
+        entry is not None
+        and entry.version == _version
+        and time.monotonic() - entry.loaded_at < settings.platform_settings_cache_ttl_seconds
+    )
+
+
+async def get_platform_setting(session: AsyncSession) -> PlatformSettingSnapshot | None:
+    global _entry
+    if _fresh(_entry):
+        return _entry.snapshot
+
+    async with _load_lock:
+        if _fresh(_entry):
+            return _entry.snapshot
+        version = _version
+        entity = await settings_repository.get_platform_setting(session)
+        snapshot = _to_snapshot(entity) if entity is not None else None
+        # An invalidation that landed while we were reading means the row may be stale.
+        if version == _version:
+            _entry = _CacheEntry(version=version, loaded_at=time.monotonic(), snapshot=snapshot)
+        return snapshot
+
+
+async def get_report_timezone(session: AsyncSession) -> str:
+    snapshot = await get_platform_setting(session)
+    return snapshot.report_timezone if snapshot is not None else DEFAULT_REPORT_TIMEZONE
+
+
+def _bump_version() -> int:
+    global _version
+    _version += 1
+    return _version
+
+
+async def invalidate_platform_setting_cache() -> None:
+    version = _bump_version()
+    message = json.dumps({"origin": _worker_id, "version": version})
+    try:
+        await get_message_bus().publish(settings.platform_settings_channel, message)
+    except Exception as exc:
+        # Other workers fall back to the cache TTL.
+        logger.warning("platform settings invalidation broadcast failed error=%s", exc)
+
+
+async def listen_for_invalidations(stop_event: asyncio.Event) -> None:
+    while not stop_event.is_set():
+        # Anything published while we were not subscribed is lost, so start from a clean slate.
+        _bump_version()
+        try:
+            async for raw in get_message_bus().subscribe(settings.platform_settings_channel):
+                try:
+                    origin = json.loads(raw).get("origin")
+                except (TypeError, ValueError):
+                    origin = None
+                if origin != _worker_id:
+                    _bump_version()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("platform settings invalidation listener failed error=%s", exc)
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=RESUBSCRIBE_DELAY_SECONDS)
+        except asyncio.TimeoutError:
+            pass
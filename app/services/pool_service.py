@@ -1,24 +1,33 @@
+import heapq
+from collections import deque
+from datetime import datetime
 from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exceptions import AppException
+from app.core.rbac import normalize_role
 from app.models.lead import Lead
 from app.models.pool_transfer_log import PoolTransferLog
 from app.repositories import pool_repository
+from app.services import dashboard_service, lead_counter_service, lead_stats_service, platform_setting_service
+
+
+DISTRIBUTION_STRATEGIES: set[str] = {"round_robin", "least_loaded"}
+DEFAULT_MAX_LEADS_PER_REP = 300
 
 
 def _to_pool_item(lead: Lead) -> dict[str, Any]:
     meta = lead.dynamic_data or {}
+    drop_time = lead.drop_time or lead.updated_at
     return {
         "id": lead.id,
         "name": lead.name,
         "phone": lead.phone,
         "source": lead.source,
-        "dropReasonType": meta.get("drop_reason_type", "超时未跟进"),
+        "dropReasonType": lead.drop_reason_type or meta.get("drop_reason_type", "超时未跟进"),
         "dropReasonDetail": meta.get("drop_reason_detail", "系统自动回收"),
-        "dropTime": meta.get("drop_time")
-        or (lead.updated_at.isoformat(sep=" ") if lead.updated_at else None),
+        "dropTime": drop_time.isoformat(sep=" ") if drop_time else None,
         "originalOwner": meta.get("original_owner"),
     }
 
@@ -36,6 +45,18 @@ def _to_transfer_item(log: PoolTransferLog) -> dict[str, Any]:
     }
 
 
+def _encode_transfer_cursor(log: PoolTransferLog) -> str:
+    return f"{log.created_at.isoformat()},{log.id}"
+
+
+def _decode_transfer_cursor(cursor: str) -> tuple[datetime, int]:
+    created_at, _, log_id = cursor.rpartition(",")
+    try:
+        return datetime.fromisoformat(created_at), int(log_id)
+    except ValueError as exc:
+        raise AppException("分页游标无效", business_code=400, status_code=400) from exc
+
+
 async def list_pool_leads(
     *,
     session: AsyncSession,
@@ -67,7 +88,26 @@ async def claim_pool_lead(session: AsyncSession, lead_id: str, staff_id: str) ->
         raise AppException("客户不在公海池", business_code=400, status_code=409)
 
     previous_owner_id = lead.owner_id
+    old_snapshot = lead_stats_service.lead_snapshot(lead)
     lead.owner_id = staff_id
+    stat_deltas = lead_stats_service.LeadStatDeltas()
+    lead_stats_service.record_lead_change(
+        stat_deltas,
+        lead_id=lead.id,
+        created_at=lead.created_at,
+        before=old_snapshot,
+        after=lead_stats_service.lead_snapshot(lead),
+    )
+    counter_deltas: dict[str, int] = {}
+    lead_counter_service.record_owner_change(
+        counter_deltas,
+        old_owner_id=previous_owner_id,
+        old_status=lead.status,
+        new_owner_id=staff_id,
+        new_status=lead.status,
+    )
+    await lead_counter_service.apply_owner_deltas(session, counter_deltas)
+    await lead_stats_service.apply_stat_deltas(session, stat_deltas)
     pool_repository.add_transfer_log(
         session,
         PoolTransferLog(
@@ -80,6 +120,7 @@ async def claim_pool_lead(session: AsyncSession, lead_id: str, staff_id: str) ->
         ),
     )
     await pool_repository.commit(session)
+    await dashboard_service.invalidate_overview_cache(session, [staff_id])
     return {"leadId": lead.id, "claimer": staff_id}
 
 
@@ -90,12 +131,29 @@ async def assign_pool_leads(
     operator_staff_id: str = "system",
 ) -> dict[str, Any]:
     claimed_ids: list[str] = []
+    counter_deltas: dict[str, int] = {}
+    stat_deltas = lead_stats_service.LeadStatDeltas()
     for lead_id in lead_ids:
         lead = await pool_repository.get_lead(session, lead_id)
         if lead is None or lead.owner_id is not None:
             continue
         previous_owner_id = lead.owner_id
+        old_snapshot = lead_stats_service.lead_snapshot(lead)
         lead.owner_id = staff_id
+        lead_stats_service.record_lead_change(
+            stat_deltas,
+            lead_id=lead.id,
+            created_at=lead.created_at,
+            before=old_snapshot,
+            after=lead_stats_service.lead_snapshot(lead),
+        )
+        lead_counter_service.record_owner_change(
+            counter_deltas,
+            old_owner_id=previous_owner_id,
+            old_status=lead.status,
+            new_owner_id=staff_id,
+            new_status=lead.status,
+        )
         pool_repository.add_transfer_log(
             session,
             PoolTransferLog(
@@ -109,7 +167,10 @@ async def assign_pool_leads(
         )
         claimed_ids.append(lead_id)
 
+    await lead_counter_service.apply_owner_deltas(session, counter_deltas)
+    await lead_stats_service.apply_stat_deltas(session, stat_deltas)
     await pool_repository.commit(session)
+    await dashboard_service.invalidate_overview_cache(session, [staff_id])
     return {
         "leadIds": claimed_ids,
         "assignee": staff_id,
@@ -124,13 +185,17 @@ async def list_pool_transfers(
     page_size: int = 20,
     lead_id: str | None = None,
     action: str | None = None,
+    cursor: str | None = None,
 ) -> dict[str, Any]:
     base_query = pool_repository.build_transfer_query(lead_id=lead_id, action=action)
-    total = await pool_repository.count_transfer_logs(session, base_query)
-    logs = await pool_repository.list_transfer_logs(session, base_query, page, page_size)
+    after = _decode_transfer_cursor(cursor) if cursor else None
+    # Cursor pages skip the count: it scans every partition and the client already has it from page one.
+    total = None if after is not None else await pool_repository.count_transfer_logs(session, base_query)
+    logs = await pool_repository.list_transfer_logs(session, base_query, page, page_size, after=after)
     return {
         "list": [_to_transfer_item(log) for log in logs],
         "total": total,
+        "nextCursor": _encode_transfer_cursor(logs[-1]) if len(logs) == page_size else None,
     }
 
 
@@ -141,28 +206,194 @@ async def delete_pool_lead(session: AsyncSession, lead_id: str) -> dict[str, Any
     if lead.owner_id is not None:
         raise AppException("客户不在公海池", business_code=400, status_code=409)
 
+    stat_deltas = lead_stats_service.LeadStatDeltas()
+    await lead_stats_service.record_lead_removals(session, stat_deltas, [lead])
     await pool_repository.delete_follow_ups_by_lead(session, lead_id)
     await pool_repository.delete_lead(session, lead)
+    await lead_stats_service.apply_stat_deltas(session, stat_deltas)
     await pool_repository.commit(session)
+    await dashboard_service.invalidate_overview_cache(session, [])
     return {"leadId": lead_id}
 
 
 async def delete_pool_leads_batch(session: AsyncSession, lead_ids: list[str]) -> dict[str, Any]:
     leads = await pool_repository.list_leads_by_ids(session, lead_ids)
     lead_map = {lead.id: lead for lead in leads}
+    deletable = [
+        lead_map[lead_id]
+        for lead_id in dict.fromkeys(lead_ids)
+        if lead_id in lead_map and lead_map[lead_id].owner_id is None
+    ]
+    stat_deltas = lead_stats_service.LeadStatDeltas()
+    await lead_stats_service.record_lead_removals(session, stat_deltas, deletable)
     deleted_ids: list[str] = []
-    for lead_id in lead_ids:
-        lead = lead_map.get(lead_id)
-        if lead is None:
-            continue
-        if lead.owner_id is not None:
-            continue
-        await pool_repository.delete_follow_ups_by_lead(session, lead_id)
+    for lead in deletable:
+        await pool_repository.delete_follow_ups_by_lead(session, lead.id)
         await pool_repository.delete_lead(session, lead)
-        deleted_ids.append(lead_id)
+        deleted_ids.append(lead.id)
 
+    await lead_stats_service.apply_stat_deltas(session, stat_deltas)
     await pool_repository.commit(session)
+    await dashboard_service.invalidate_overview_cache(session, [])
     return {
         "leadIds": deleted_ids,
         "count": len(deleted_ids),
     }
+
+
+def plan_distribution(
+    lead_ids: list[str],
+    staff_ids: list[str],
+    loads: dict[str, int],
+    cap: int,
+    strategy: str,
+) -> dict[str, list[str]]:
+    plan: dict[str, list[str]] = {staff_id: [] for staff_id in staff_ids}
+    if strategy == "least_loaded":
+        heap = [(loads.get(staff_id, 0), index, staff_id) for index, staff_id in enumerate(staff_ids)]
+        heap = [item for item in heap if item[0] < cap]
+        heapq.heapify(heap)
+        for lead_id in lead_ids:
+            if not heap:
+                break
+            load, index, staff_id = heapq.heappop(heap)
+            plan[staff_id].append(lead_id)
+            if load + 1 < cap:
+                heapq.heappush(heap, (load + 1, index, staff_id))
+        return plan
+
+    remaining = {staff_id: cap - loads.get(staff_id, 0) for staff_id in staff_ids}
+    rotation = deque(staff_id for staff_id in staff_ids if remaining[staff_id] > 0)
+    for lead_id in lead_ids:
+        if not rotation:
+            break
+        staff_id = rotation.popleft()
+        plan[staff_id].append(lead_id)
+        remaining[staff_id] -= 1
+        if remaining[staff_id] > 0:
+            rotation.append(staff_id)
+    return plan
+
+
+async def _resolve_distribution_targets(
+    session: AsyncSession,
+    staff_ids: list[str],
+    current_staff: dict[str, Any],
+) -> list[str]:
+    ordered_ids = list(dict.fromkeys(staff_ids))
+    users = await pool_repository.list_active_users_by_ids(session, ordered_ids)
+    user_map = {user.id: user for user in users}
+    missing = [staff_id for staff_id in ordered_ids if staff_id not in user_map]
+    if missing:
+        raise AppException(f"目标员工不存在或已停用: {', '.join(missing)}", business_code=400, status_code=400)
+
+    if normalize_role(str(current_staff.get("role") or "")) == "manager":
+        actor = await pool_repository.get_user(session, str(current_staff.get("staffId") or ""))
+        if actor is None or not actor.dept_name:
+            raise AppException("主管未绑定所属部门，无法分配", business_code=400, status_code=400)
+        if any(user_map[staff_id].dept_name != actor.dept_name for staff_id in ordered_ids):
+            raise AppException("主管仅可分配给本部门员工", business_code=400, status_code=403)
+    return ordered_ids
+
+
+async def distribute_pool_leads(
+    session: AsyncSession,
+    *,
+    staff_ids: list[str],
+    strategy: str,
+    count: int,
+    current_staff: dict[str, Any],
+    keyword: str | None = None,
+    drop_reason: str | None = None,
+    previous_owner: str | None = None,
+    preview: bool = False,
+) -> dict[str, Any]:
+    if strategy not in DISTRIBUTION_STRATEGIES:
+        raise AppException("不支持的分配策略", business_code=400, status_code=400)
+
+    target_ids = await _resolve_distribution_targets(session, staff_ids, current_staff)
+    platform = await platform_setting_service.get_platform_setting(session)
+    cap = int(platform.max_leads_per_rep) if platform else DEFAULT_MAX_LEADS_PER_REP
+
+    base_query = pool_repository.build_pool_query(
+        keyword=keyword,
+        drop_reason=drop_reason,
+        previous_owner=previous_owner,
+    )
+    pool_leads = await pool_repository.list_pool_leads_for_distribution(session, base_query, count, lock=not preview)
+    lead_ids = [row.id for row in pool_leads]
+    lead_rows = {row.id: row for row in pool_leads}
+    if preview:
+        loads = await lead_counter_service.get_active_lead_counts(session, target_ids)
+    else:
+        loads = await lead_counter_service.lock_active_lead_counts(session, target_ids)
+    plan = plan_distribution(lead_ids, target_ids, loads, cap, strategy)
+
+    operator_staff_id = str(current_staff.get("staffId") or "system")
+    assigned_total = 0
+    allocations: list[dict[str, Any]] = []
+    transfer_rows: list[dict[str, Any]] = []
+    counter_deltas: dict[str, int] = {}
+    stat_deltas = lead_stats_service.LeadStatDeltas()
+    for staff_id in target_ids:
+        planned_ids = plan[staff_id]
+        if not preview and planned_ids:
+            await pool_repository.assign_pool_leads_to_owner(session, planned_ids, staff_id)
+            for lead_id in planned_ids:
+                row = lead_rows[lead_id]
+                lead_counter_service.record_owner_change(
+                    counter_deltas,
+                    old_owner_id=None,
+                    old_status=None,
+                    new_owner_id=staff_id,
+                    new_status=row.status,
+                )
+                pool_snapshot = lead_stats_service.lead_snapshot(row)
+                lead_stats_service.record_lead_change(
+                    stat_deltas,
+                    lead_id=row.id,
+                    created_at=row.created_at,
+                    before=pool_snapshot,
+                    after=(staff_id, *pool_snapshot[1:]),
+                )
+            transfer_rows.extend(
+                {
+                    "lead_id": lead_id,
+                    "action": "assign",
+                    "from_owner_id": None,
+                    "to_owner_id": staff_id,
+                    "operator_staff_id": operator_staff_id,
+                    "note": "公海自动分配",
+                }
+                for lead_id in planned_ids
+            )
+        before = loads.get(staff_id, 0)
+        assigned_total += len(planned_ids)
+        allocations.append(
+            {
+                "staffId": staff_id,
+                "before": before,
+                "assigned": len(planned_ids),
+                "after": before + len(planned_ids),
+                "cap": cap,
+                "leadIds": planned_ids,
+            }
+        )
+
+    if not preview:
+        await pool_repository.bulk_add_transfer_logs(session, transfer_rows)
+        await lead_counter_service.apply_owner_deltas(session, counter_deltas)
+        await lead_stats_service.apply_stat_deltas(session, stat_deltas)
+        await pool_repository.commit(session)
+        await dashboard_service.invalidate_overview_cache(session, [staff_id for staff_id in target_ids if plan[staff_id]])
+
+    return {
+        "preview": preview,
+        "strategy": strategy,
+        "requested": count,
+        "matched": len(lead_ids),
+        "assigned": assigned_total,
+        "unassigned": len(lead_ids) - assigned_total,
+        "cap": cap,
+        "allocations": allocations,
+    }
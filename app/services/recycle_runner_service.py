@@ -1,16 +1,35 @@
 import asyncio
-from dataclasses import dataclass
+import logging
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.lead_status import is_active_status
 from app.db.session import AsyncSessionLocal
 from app.models.pool_transfer_log import PoolTransferLog
+from app.models.recycle_run import RecycleRun
+from app.models.user import User
 from app.repositories import notification_repository, recycle_repository
-from app.services import settings_service
+from app.services import (
+    analytics_service,
+    dashboard_service,
+    lead_counter_service,
+    lead_stats_service,
+    report_bucket_service,
+    report_snapshot_service,
+    reports_service,
+    settings_service,
+    transfer_log_retention_service,
+)
 
+logger = logging.getLogger(__name__)
 
-SIGNED_STATUSES = {"signed", "已签约", "invalid", "无效线索", "无效客户", "lost", "战败流失"}
+# Per-lead rows kept on a run's digest. Counts keep growing past this; the list stops so the
+# JSONB rewritten by every chunk, and the copy in each supervisor's payload, stay small.
+RECYCLE_DIGEST_LEAD_LIMIT = 200
 
 
 @dataclass(slots=True)
@@ -18,169 +37,357 @@ class RecycleResult:
     recycled_count: int
     before_notified_count: int
     after_notified_count: int
-
-
-def _normalize_level(value: str | None) -> str:
-    return str(value or "").strip().upper()
+    # (lead id, lead name, owner name, owner department, reason) for each lead recycled in this chunk.
+    recycled_leads: list[tuple[str, str, str, str, str]] = field(default_factory=list)
 
 
 def _build_event_key(prefix: str, lead_id: str, owner_id: str, date_key: str) -> str:
     return f"{prefix}:{lead_id}:{owner_id}:{date_key}"
 
 
-async def _push_notification_once(
+def _evaluate_candidate(candidate: Any, rules: dict[str, Any]) -> tuple[list[tuple[str, str]], str | None]:
+    # Returns the pre-drop warnings (event prefix, content) and the recycle reason, if any.
+    warnings: list[tuple[str, str]] = []
+    reason_text: str | None = None
+
+    # Rule 1: assigned but no follow-up in N days
+    if rules["rule1"]["active"] and candidate.followup_count == 0:
+        days = int(rules["rule1"]["days"] or 1)
+        gap_days = candidate.assigned_gap_days
+        if rules["notify"]["beforeDrop"] and gap_days == max(0, days - 1):
+            warnings.append(
+                ("before_rule1", f"客户 {candidate.lead_id} 将在 1 天后因未跟进被回收至公海，请及时处理。")
+            )
+        if gap_days >= days:
+            reason_text = "分配后未及时跟进"
+
+    # Rule 2: no contact for N days after follow-up
+    if reason_text is None and rules["rule2"]["active"] and candidate.contact_gap_days is not None:
+        days = int(rules["rule2"]["days"] or 1)
+        gap_days = candidate.contact_gap_days
+        if rules["rule2"].get("protectHighIntent") and candidate.is_high_intent:
+            gap_days = -1
+        if rules["notify"]["beforeDrop"] and gap_days == max(0, days - 1):
+            warnings.append(("before_rule2", f"客户 {candidate.lead_id} 将在 1 天后因长时间未联系被回收至公海。"))
+        if gap_days >= days:
+            reason_text = "跟进后长时间无联系"
+
+    # Rule 3: too many follow-ups but no deal
+    if reason_text is None and rules["rule3"]["active"]:
+        count_limit = int(rules["rule3"]["count"] or 1)
+        if candidate.owner_followup_count >= count_limit:
+            reason_text = "久攻不下死单"
+
+    return warnings, reason_text
+
+
+async def _recycle_chunk(
     session: AsyncSession,
-    *,
-    staff_id: str,
-    title: str,
-    content: str,
-    category: str,
-    event_key: str,
-) -> bool:
-    return await notification_repository.insert_notification_if_absent(
-        session,
-        staff_id=staff_id,
-        title=title,
-        content=content,
-        category=category,
-        event_key=event_key,
+    chunk: list[Any],
+    rules: dict[str, Any],
+    supervisors: list[User],
+    now_utc: datetime,
+    date_key: str,
+) -> tuple[RecycleResult, set[str]]:
+    recycled_leads: list[tuple[str, str, str, str, str]] = []
+    warning_rows: list[dict[str, Any]] = []
+    summary_rows: list[dict[str, Any]] = []
+    counter_deltas: dict[str, int] = {}
+    recycled_owner_ids: set[str] = set()
+    stat_deltas = lead_stats_service.LeadStatDeltas()
+    pending: dict[str, tuple[Any, str]] = {}
+
+    for candidate in chunk:
+        warnings, reason_text = _evaluate_candidate(candidate, rules)
+        for prefix, content in warnings:
+            warning_rows.append(
+                {
+                    "staff_id": candidate.owner_id,
+                    "title": "客户即将自动回收",
+                    "content": content,
+                    "category": "recycle_warning",
+                    "event_key": _build_event_key(prefix, candidate.lead_id, candidate.owner_id, date_key),
+                }
+            )
+        if reason_text is not None:
+            pending[candidate.lead_id] = (candidate, reason_text)
+
+    # Only the leads that actually move to the pool are loaded, locked; rows a user is editing
+    # right now are skipped and evaluated again on the next pass.
+    for lead in await recycle_repository.lock_leads_by_ids(session, list(pending)):
+        candidate, reason_text = pending[lead.id]
+        # The chunk was read from the streaming snapshot; skip leads whose rule inputs changed since.
+        if (
+            lead.owner_id != candidate.owner_id
+            or not is_active_status(lead.status)
+            or lead.level != candidate.level
+            or lead.last_follow_up != candidate.last_follow_up
+        ):
+            continue
+
+        old_owner_id = lead.owner_id
+        old_snapshot = lead_stats_service.lead_snapshot(lead)
+        lead.owner_id = None
+        lead_stats_service.record_lead_change(
+            stat_deltas,
+            lead_id=lead.id,
+            created_at=lead.created_at,
+            before=old_snapshot,
+            after=lead_stats_service.lead_snapshot(lead),
+        )
+        lead_counter_service.record_owner_change(
+            counter_deltas,
+            old_owner_id=old_owner_id,
+            old_status=lead.status,
+            new_owner_id=None,
+            new_status=lead.status,
+        )
+        meta = dict(lead.dynamic_data or {})
+        meta["drop_reason_type"] = reason_text
+        meta["drop_reason_detail"] = "系统自动回收"
+        meta["drop_time"] = now_utc.isoformat()
+        meta["original_owner"] = candidate.owner_name
+        lead.dynamic_data = meta
+        lead.drop_reason_type = reason_text
+        lead.drop_time = now_utc
+        lead.original_owner_id = old_owner_id
+
+        recycle_repository.add_pool_transfer_log(
+            session,
+            PoolTransferLog(
+                lead_id=lead.id,
+                action="auto_recycle",
+                from_owner_id=old_owner_id,
+                to_owner_id=None,
+                operator_staff_id="system",
+                note=f"自动回收: {reason_text}",
+            ),
+        )
+        recycled_leads.append(
+            (lead.id, lead.name or "", candidate.owner_name or "", candidate.owner_dept or "", reason_text)
+        )
+        recycled_owner_ids.add(old_owner_id)
+
+        for manager in supervisors:
+            summary_rows.append(
+                {
+                    "staff_id": manager.id,
+                    "title": "客户已自动回收",
+                    "content": f"客户 {lead.id} 已从 {candidate.owner_name} 处回收到公海，原因：{reason_text}。",
+                    "category": "recycle_summary",
+                    "event_key": _build_event_key("after_drop", lead.id, manager.id, date_key),
+                }
+            )
+
+    before_notified = len(await notification_repository.insert_notifications_if_absent(session, warning_rows))
+    after_notified = len(await notification_repository.insert_notifications_if_absent(session, summary_rows))
+    await lead_counter_service.apply_owner_deltas(session, counter_deltas)
+    await lead_stats_service.apply_stat_deltas(session, stat_deltas)
+    return (
+        RecycleResult(
+            recycled_count=len(recycled_leads),
+            before_notified_count=before_notified,
+            after_notified_count=after_notified,
+            recycled_leads=recycled_leads,
+        ),
+        recycled_owner_ids,
+    )
+
+
+def _merge_digest(digest: dict[str, Any], recycled_leads: list[tuple[str, str, str, str, str]]) -> dict[str, Any]:
+    # Returns a new dict so the JSONB column is seen as changed.
+    by_reason = dict(digest.get("byReason") or {})
+    by_dept = dict(digest.get("byDept") or {})
+    leads = list(digest.get("leads") or [])
+    for lead_id, lead_name, owner_name, dept_name, reason_text in recycled_leads:
+        by_reason[reason_text] = by_reason.get(reason_text, 0) + 1
+        dept_label = dept_name or "未分配部门"
+        by_dept[dept_label] = by_dept.get(dept_label, 0) + 1
+        if len(leads) < RECYCLE_DIGEST_LEAD_LIMIT:
+            leads.append([lead_id, lead_name, owner_name, reason_text])
+    total = int(digest.get("total") or 0) + len(recycled_leads)
+    return {"total": total, "byReason": by_reason, "byDept": by_dept, "leads": leads}
+
+
+def _format_counts(counts: dict[str, int]) -> str:
+    ordered = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return "、".join(f"{name} {count} 条" for name, count in ordered)
+
+
+def _build_digest_rows(run: RecycleRun, supervisors: list[User]) -> list[dict[str, Any]]:
+    # One summary per supervisor per pass; per-lead rows travel in the payload as compact lists,
+    # capped at RECYCLE_DIGEST_LEAD_LIMIT.
+    digest = run.digest
+    total = digest["total"]
+    leads = digest.get("leads") or []
+    content = (
+        f"{run.run_key} 共自动回收 {total} 条客户至公海。"
+        f"按原因：{_format_counts(digest['byReason'])}；按部门：{_format_counts(digest['byDept'])}。"
     )
+    payload = {
+        "runKey": run.run_key,
+        "total": total,
+        "byReason": digest["byReason"],
+        "byDept": digest["byDept"],
+        "columns": ["leadId", "name", "owner", "reason"],
+        "leads": leads,
+        "truncated": total > len(leads),
+    }
+    pass_key = f"{run.run_key}:{int(run.started_at.timestamp())}"
+    return [
+        {
+            "staff_id": manager.id,
+            "title": "客户自动回收汇总",
+            "content": content,
+            "category": "recycle_summary",
+            "event_key": f"recycle_digest:{pass_key}:{manager.id}",
+            "payload": payload,
+        }
+        for manager in supervisors
+    ]
+
+
+async def _finish_run(
+    session: AsyncSession,
+    run: RecycleRun,
+    supervisors: list[User],
+    digest_mode: bool,
+) -> None:
+    if digest_mode and supervisors and run.digest.get("total"):
+        inserted = await notification_repository.insert_notifications_if_absent(
+            session,
+            _build_digest_rows(run, supervisors),
+        )
+        run.after_notified_count += len(inserted)
+    run.finished_at = datetime.now(timezone.utc)
+    run.updated_at = run.finished_at
+
+
+def _local_date_key(now_utc: datetime) -> str:
+    # Server-local date, the same clock as the worker's nightly window, so a pass resumed after
+    # UTC midnight keeps its run.
+    return now_utc.astimezone().strftime("%Y-%m-%d")
 
 
 async def run_recycle_once() -> RecycleResult:
-    async with AsyncSessionLocal() as session:
+    async with AsyncSessionLocal() as session, AsyncSessionLocal() as read_session:
         rules = await settings_service.get_recycle_rules(session)
+        supervisors = await recycle_repository.list_active_supervisors(session) if rules["notify"]["afterDrop"] else []
+        digest_mode = settings.recycle_notify_digest
         if not rules.get("enabled"):
+            # Close a pass interrupted before recycling was switched off; otherwise the worker
+            # would keep polling it.
+            unfinished_runs = await recycle_repository.list_unfinished_runs(session)
+            for unfinished_run in unfinished_runs:
+                await _finish_run(session, unfinished_run, supervisors, digest_mode)
+            if unfinished_runs:
+                await recycle_repository.commit(session)
             return RecycleResult(recycled_count=0, before_notified_count=0, after_notified_count=0)
 
-        leads = await recycle_repository.list_assigned_leads(session)
         now_utc = datetime.now(timezone.utc)
+        date_key = _local_date_key(now_utc)
+
+        # A pass left unfinished on an earlier day is superseded by today's full pass; close it
+        # so its digest still goes out and the worker stops resuming it.
+        for stale_run in await recycle_repository.list_unfinished_runs(session, before_key=date_key):
+            await _finish_run(session, stale_run, supervisors, digest_mode)
 
-        recycled = 0
-        before_notified = 0
-        after_notified = 0
-
-        for lead in leads:
-            if str(lead.status or "") in SIGNED_STATUSES:
-                continue
-            if not lead.owner_id:
-                continue
-
-            owner = await recycle_repository.get_user(session, lead.owner_id)
-            if owner is None:
-                continue
-
-            followups = await recycle_repository.list_followups_for_lead(session, lead.id)
-            followup_count = len(followups)
-            owner_operator_keys = {owner.id, owner.name}
-            owner_followup_count = sum(1 for item in followups if item.operator in owner_operator_keys)
-
-            reason_text: str | None = None
-            date_key = now_utc.strftime("%Y-%m-%d")
-
-            # Rule 1: assigned but no follow-up in N days
-            if rules["rule1"]["active"] and followup_count == 0:
-                days = int(rules["rule1"]["days"] or 1)
-                assigned_at = lead.created_at or lead.updated_at
-                gap_days = (now_utc - assigned_at.astimezone(timezone.utc)).days
-                if rules["notify"]["beforeDrop"] and gap_days == max(0, days - 1):
-                    ok = await _push_notification_once(
-                        session,
-                        staff_id=owner.id,
-            title="客户即将自动回收",
-            content=f"客户 {lead.id} 将在 1 天后因未跟进被回收至公海，请及时处理。",
-                        category="recycle_warning",
-                        event_key=_build_event_key("before_rule1", lead.id, owner.id, date_key),
-                    )
-                    if ok:
-                        before_notified += 1
-                if gap_days >= days:
-                    reason_text = "分配后未及时跟进"
-
-            # Rule 2: no contact for N days after follow-up
-            if reason_text is None and rules["rule2"]["active"] and lead.last_follow_up is not None:
-                days = int(rules["rule2"]["days"] or 1)
-                gap_days = (now_utc - lead.last_follow_up.astimezone(timezone.utc)).days
-                is_high_intent = _normalize_level(lead.level).startswith("A")
-                if rules["rule2"].get("protectHighIntent") and is_high_intent:
-                    gap_days = -1
-                if rules["notify"]["beforeDrop"] and gap_days == max(0, days - 1):
-                    ok = await _push_notification_once(
-                        session,
-                        staff_id=owner.id,
-            title="客户即将自动回收",
-            content=f"客户 {lead.id} 将在 1 天后因长时间未联系被回收至公海。",
-                        category="recycle_warning",
-                        event_key=_build_event_key("before_rule2", lead.id, owner.id, date_key),
-                    )
-                    if ok:
-                        before_notified += 1
-                if gap_days >= days:
-                    reason_text = "跟进后长时间无联系"
-
-            # Rule 3: too many follow-ups but no deal
-            if reason_text is None and rules["rule3"]["active"]:
-                count_limit = int(rules["rule3"]["count"] or 1)
-                if owner_followup_count >= count_limit:
-                    reason_text = "久攻不下死单"
-
-            if reason_text is None:
-                continue
-
-            old_owner_id = lead.owner_id
-            lead.owner_id = None
-            meta = dict(lead.dynamic_data or {})
-            meta["drop_reason_type"] = reason_text
-            meta["drop_reason_detail"] = "系统自动回收"
-            meta["drop_time"] = now_utc.isoformat()
-            meta["original_owner"] = owner.name
-            lead.dynamic_data = meta
-
-            recycle_repository.add_pool_transfer_log(
-                session,
-                PoolTransferLog(
-                    lead_id=lead.id,
-                    action="auto_recycle",
-                    from_owner_id=old_owner_id,
-                    to_owner_id=None,
-                    operator_staff_id="system",
-                    note=f"自动回收: {reason_text}",
-                ),
+        run = await recycle_repository.get_run(session, date_key)
+        if run is None:
+            run = RecycleRun(
+                run_key=date_key,
+                recycled_count=0,
+                before_notified_count=0,
+                after_notified_count=0,
+                digest={},
+                started_at=now_utc,
             )
-            recycled += 1
-
-            if rules["notify"]["afterDrop"]:
-                supervisors = await recycle_repository.list_active_supervisors(session)
-                for manager in supervisors:
-                    ok = await _push_notification_once(
-                        session,
-                        staff_id=manager.id,
-            title="客户已自动回收",
-            content=f"客户 {lead.id} 已从 {owner.name} 处回收到公海，原因：{reason_text}。",
-                        category="recycle_summary",
-                        event_key=_build_event_key("after_drop", lead.id, manager.id, date_key),
-                    )
-                    if ok:
-                        after_notified += 1
+            recycle_repository.add_run(session, run)
+        elif run.finished_at is not None:
+            # A finished day is evaluated again from the start, e.g. by the admin "run now" action.
+            run.last_lead_id = None
+            run.recycled_count = 0
+            run.before_notified_count = 0
+            run.after_notified_count = 0
+            run.digest = {}
+            run.started_at = now_utc
+            run.finished_at = None
+        await recycle_repository.commit(session)
 
+        # Candidates stream from a separate read session so each chunk's commit keeps the cursor open
+        # and row locks are only held for one chunk.
+        chunks = recycle_repository.stream_recycle_candidate_chunks(
+            read_session,
+            now_utc,
+            after_lead_id=run.last_lead_id,
+            chunk_size=max(1, settings.recycle_chunk_size),
+        )
+        async for chunk in chunks:
+            try:
+                chunk_result, recycled_owner_ids = await _recycle_chunk(
+                    session, chunk, rules, [] if digest_mode else supervisors, now_utc, date_key
+                )
+                run.last_lead_id = chunk[-1].lead_id
+                run.recycled_count += chunk_result.recycled_count
+                run.before_notified_count += chunk_result.before_notified_count
+                run.after_notified_count += chunk_result.after_notified_count
+                if digest_mode and supervisors and chunk_result.recycled_leads:
+                    run.digest = _merge_digest(run.digest, chunk_result.recycled_leads)
+                run.updated_at = datetime.now(timezone.utc)
+                await recycle_repository.commit(session)
+            except Exception:
+                await recycle_repository.rollback(session)
+                raise
+            if recycled_owner_ids:
+                await dashboard_service.invalidate_overview_cache(session, recycled_owner_ids)
+
+        await _finish_run(session, run, supervisors, digest_mode)
         await recycle_repository.commit(session)
         return RecycleResult(
-            recycled_count=recycled,
-            before_notified_count=before_notified,
-            after_notified_count=after_notified,
+            recycled_count=run.recycled_count,
+            before_notified_count=run.before_notified_count,
+            after_notified_count=run.after_notified_count,
         )
 
 
+async def _has_unfinished_run() -> bool:
+    async with AsyncSessionLocal() as session:
+        return bool(await recycle_repository.list_unfinished_runs(session))
+
+
+async def _run_nightly_jobs() -> None:
+    jobs = [
+        ("recycle", run_recycle_once),
+        ("lead_counter_reconcile", lead_counter_service.run_reconcile_once),
+        ("transfer_log_retention", transfer_log_retention_service.run_retention_once),
+        ("report_cache_purge", reports_service.purge_expired_report_cache),
+        ("report_buckets", report_bucket_service.run_bucket_once),
+        ("report_snapshots", report_snapshot_service.run_snapshot_once),
+    ]
+    if settings.analytics_enabled:
+        jobs.append(("analytics_export", analytics_service.run_export_once))
+    # Jobs are independent; one failing must not skip the rest of the night's maintenance.
+    for name, job in jobs:
+        try:
+            _ = await job()
+        except Exception:
+            logger.exception("recycle_worker_job_failed job=%s", name)
+
+
 async def recycle_worker_loop(stop_event: asyncio.Event) -> None:
     last_run_date: str | None = None
     while not stop_event.is_set():
         try:
             now = datetime.now(timezone.utc).astimezone()
-            date_key = now.strftime("%Y-%m-%d")
+            date_key = _local_date_key(now)
             if now.hour == 0 and now.minute < 10 and last_run_date != date_key:
-                _ = await run_recycle_once()
+                await _run_nightly_jobs()
                 last_run_date = date_key
+            elif await _has_unfinished_run():
+                # A pass interrupted by a crash or deploy resumes from its recorded cursor
+                # instead of waiting for the next night's window.
+                _ = await run_recycle_once()
         except Exception:
             # Worker must keep running even if one cycle fails.
-            pass
+            logger.exception("recycle_worker_cycle_failed")
         await asyncio.sleep(60)
@@ -0,0 +1,70 @@
+import logging
+from datetime import date, datetime, timezone
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.lead_status import LOST_LEAD_STATUSES
+from app.db.session import AsyncSessionLocal
+from app.repositories import report_bucket_repository
+from app.services.report_snapshot_service import month_bounds
+
+
+logger = logging.getLogger(__name__)
+
+
+def closed_months(now: datetime, lookback_months: int) -> list[tuple[int, int]]:
+    # Oldest first, ending with the month before the current UTC month.
+    current = now.astimezone(timezone.utc)
+    index = current.year * 12 + current.month - 1
+    return [(value // 12, value % 12 + 1) for value in range(index - lookback_months, index)]
+
+
+async def build_month_buckets(session: AsyncSession, year: int, month: int) -> dict[str, Any]:
+    start_at, end_at = month_bounds(year, month)
+    month_day = date(year, month, 1)
+    try:
+        await report_bucket_repository.lock_month_for_build(session, month_day)
+        await report_bucket_repository.delete_month(session, month_day)
+        await report_bucket_repository.insert_month(
+            session,
+            month=month_day,
+            start_at=start_at,
+            end_at=end_at,
+            lost_statuses=list(LOST_LEAD_STATUSES),
+        )
+        await report_bucket_repository.commit(session)
+    except Exception:
+        await report_bucket_repository.rollback(session)
+        raise
+    return {"month": month_day.isoformat()}
+
+
+async def run_bucket_once(now: datetime | None = None) -> list[dict[str, Any]]:
+    # Builds closed months that have no marker yet; built months stay current through write deltas.
+    months = closed_months(now or datetime.now(timezone.utc), settings.report_bucket_lookback_months)
+    if not months:
+        return []
+    async with AsyncSessionLocal() as session:
+        built = await report_bucket_repository.list_built_months(
+            session,
+            date(*months[0], 1),
+            date(*months[-1], 1),
+        )
+    results: list[dict[str, Any]] = []
+    for year, month in months:
+        if date(year, month, 1) in built:
+            continue
+        async with AsyncSessionLocal() as session:
+            results.append(await build_month_buckets(session, year, month))
+        logger.info("report buckets built month=%s", results[-1]["month"])
+    return results
+
+
+async def run_rebuild(months: list[tuple[int, int]]) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+    for year, month in months:
+        async with AsyncSessionLocal() as session:
+            results.append(await build_month_buckets(session, year, month))
+    return results
@@ -0,0 +1,119 @@
+import logging
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.concurrent_reads import run_concurrent_reads
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+from app.repositories import report_snapshot_repository, reports_repository
+from app.services import reports_service
+
+
+logger = logging.getLogger(__name__)
+
+SCOPE_ALL = "all"
+SCOPE_DEPARTMENT = "dept"
+SCOPE_STAFF = "staff"
+
+
+def _day_start(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def month_bounds(year: int, month: int) -> tuple[datetime, datetime]:
+    start = datetime(year, month, 1, tzinfo=timezone.utc)
+    end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+    return start, end
+
+
+def snapshot_periods(now: datetime) -> list[tuple[datetime, datetime]]:
+    # Previous month plus month-to-date through yesterday. The latter is also the closed part of
+    # the default month-to-date request, which adds today's rows live.
+    today_start = _day_start(now)
+    month_start = today_start.replace(day=1)
+    prev_year, prev_month = (month_start.year, month_start.month - 1) if month_start.month > 1 else (month_start.year - 1, 12)
+    periods = [month_bounds(prev_year, prev_month)]
+    if today_start > month_start:
+        periods.append((month_start, today_start))
+    return periods
+
+
+def _snapshot_scopes(users: list[User], department_names: list[str]) -> list[tuple[str, str, dict[str, str | None], list[User]]]:
+    # Mirrors how get_reports_overview resolves lead scope and staff in scope for each filter.
+    scopes: list[tuple[str, str, dict[str, str | None], list[User]]] = [
+        (SCOPE_ALL, "", {"owner_id": None, "dept_name": None}, users),
+    ]
+    for dept_name in department_names:
+        dept_users = [user for user in users if user.dept_name == dept_name]
+        scopes.append((SCOPE_DEPARTMENT, dept_name, {"owner_id": None, "dept_name": dept_name}, dept_users))
+    for user in users:
+        scopes.append((SCOPE_STAFF, user.id, {"owner_id": user.id, "dept_name": None}, [user]))
+    return scopes
+
+
+async def build_period_snapshots(session: AsyncSession, period_start: datetime, period_end: datetime) -> dict[str, Any]:
+    users, departments = await run_concurrent_reads(
+        session,
+        reports_repository.list_active_users,
+        reports_repository.list_active_departments,
+    )
+    department_names = list(dict.fromkeys(name for name in ((dept.name or "").strip() for dept in departments) if name))
+    current = (period_start, period_end)
+    previous = reports_service.previous_period(period_start, period_end)
+
+    # One short transaction per scope, so the rows being replaced are only locked briefly and
+    # purges from concurrent lead writes are not held up for the whole build.
+    scopes = _snapshot_scopes(users, department_names)
+    for scope_type, scope_id, lead_scope, scope_users in scopes:
+        staff_ids = [user.id for user in scope_users]
+        _, aggregates = await reports_service.query_period_aggregates(
+            session,
+            current=current,
+            previous=previous,
+            lead_scope=lead_scope,
+            staff_ids=staff_ids,
+        )
+        await report_snapshot_repository.delete_scope_snapshots(
+            session,
+            scope_type=scope_type,
+            scope_id=scope_id,
+            period_start=period_start,
+        )
+        await report_snapshot_repository.upsert_snapshot(
+            session,
+            cache_key=reports_service.report_cache_key(current, previous, lead_scope, staff_ids),
+            scope_type=scope_type,
+            scope_id=scope_id,
+            period_start=period_start,
+            period_end=period_end,
+            range_start=previous[0],
+            range_end=period_end,
+            payload=aggregates,
+        )
+        await report_snapshot_repository.commit(session)
+    await report_snapshot_repository.delete_other_scopes(
+        session,
+        period_start=period_start,
+        keep=[(scope_type, scope_id) for scope_type, scope_id, _, _ in scopes],
+    )
+    await report_snapshot_repository.commit(session)
+    return {"periodStart": period_start.isoformat(), "periodEnd": period_end.isoformat(), "snapshots": len(scopes)}
+
+
+async def run_snapshot_once(now: datetime | None = None) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+    for period_start, period_end in snapshot_periods(now or datetime.now(timezone.utc)):
+        async with AsyncSessionLocal() as session:
+            results.append(await build_period_snapshots(session, period_start, period_end))
+        logger.info("report snapshots built period_start=%s count=%s", period_start.date(), results[-1]["snapshots"])
+    return results
+
+
+async def run_backfill(months: list[tuple[int, int]]) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = []
+    for year, month in months:
+        async with AsyncSessionLocal() as session:
+            results.append(await build_period_snapshots(session, *month_bounds(year, month)))
+    return results
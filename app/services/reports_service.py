@@ -1,14 +1,40 @@
-from datetime import datetime, timedelta, timezone
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from functools import partial
 from typing import Any
+from zoneinfo import ZoneInfo
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.follow_up_record import FollowUpRecord
+from app.core.config import settings
 from app.models.department import Department
-from app.models.lead import Lead
 from app.models.user import User
-from app.repositories import reports_repository
+from app.repositories import (
+    report_bucket_repository,
+    report_cache_repository,
+    report_snapshot_repository,
+    reports_repository,
+)
+from app.repositories.reports_repository import PeriodSegments, whole_period
 from app.core.rbac import normalize_role
+from app.db.concurrent_reads import run_concurrent_reads
+from app.db.session import AsyncSessionLocal
+from app.services import platform_setting_service
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached aggregate shape changes so stale entries are ignored.
+REPORT_CACHE_VERSION = 5
+
+
+TREND_WINDOW_DAYS = {"7days": 7, "30days": 30, "90days": 90, "365days": 365}
+INTERESTED_LEVELS = ["A", "B", "A级 (近期可成交)", "B级 (持续跟进)"]
+LOSS_REASON_LIMIT = 8
+STAFF_RANKING_LIMIT = 10
 
 
 def _month_range(now_utc: datetime) -> tuple[datetime, datetime, datetime, datetime]:
@@ -36,7 +62,7 @@ def _resolve_current_period(
     return _month_range(now_utc)[:2]
 
 
-def _previous_period(start_at: datetime, end_at: datetime) -> tuple[datetime, datetime]:
+def previous_period(start_at: datetime, end_at: datetime) -> tuple[datetime, datetime]:
     delta = end_at - start_at
     prev_end = start_at
     prev_start = prev_end - delta
@@ -49,35 +75,6 @@ def _compute_trend(current: int, previous: int) -> float:
     return round(((current - previous) / previous) * 100, 1)
 
 
-def _is_signed(status: str) -> bool:
-    return status in {"signed", "已签约"}
-
-
-def _is_invited_or_visited(status: str) -> bool:
-    return status in {"invited", "visited", "已邀约", "已到访"}
-
-
-def _is_invited(status: str) -> bool:
-    return status in {"invited", "已邀约"}
-
-
-def _is_visited(status: str) -> bool:
-    return status in {"visited", "已到访"}
-
-
-def _is_lost(status: str) -> bool:
-    return status in {"lost", "战败流失", "无效线索", "无效客户", "invalid"}
-
-
-def _lead_loss_reason(lead: Lead) -> str:
-    meta = lead.dynamic_data or {}
-    return (
-        str(meta.get("loss_reason") or "").strip()
-        or str(meta.get("drop_reason_type") or "").strip()
-        or "其他原因"
-    )
-
-
 def _normalize_dept_name(name: str | None) -> str:
     return (name or "").strip()
 
@@ -101,84 +98,70 @@ def _build_department_filters(
     return options
 
 
-def _build_trend_series(leads: list[Lead], now_utc: datetime, trend_window: str) -> dict[str, Any]:
-    days = 7 if trend_window == "7days" else 30
-    start_day = (now_utc - timedelta(days=days - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
-    daily_count: dict[str, int] = {}
-    for offset in range(days):
-        day = start_day + timedelta(days=offset)
-        key = day.strftime("%m-%d")
-        daily_count[key] = 0
-
-    for lead in leads:
-        if not lead.created_at:
-            continue
-        key = lead.created_at.astimezone(timezone.utc).strftime("%m-%d")
-        if key in daily_count:
-            daily_count[key] += 1
-
-    x_axis = list(daily_count.keys())
-    series = [daily_count[key] for key in x_axis]
-    return {"window": trend_window, "xAxis": x_axis, "series": series}
+def _resolve_trend_window(trend_window: str, timezone_name: str, now_utc: datetime) -> dict[str, Any]:
+    days = TREND_WINDOW_DAYS.get(trend_window, TREND_WINDOW_DAYS["7days"])
+    zone = ZoneInfo(timezone_name)
+    today = now_utc.astimezone(zone).replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+    first_day = today - timedelta(days=days - 1)
+    return {
+        "first_day": first_day,
+        "last_day": today,
+        "start_at": first_day.replace(tzinfo=zone),
+        "end_at": (today + timedelta(days=1)).replace(tzinfo=zone),
+    }
 
 
-def _build_funnel(month_leads: list[Lead], month_followups: list[FollowUpRecord]) -> list[dict[str, Any]]:
-    followed_ids = {record.lead_id for record in month_followups}
-    interested_ids = {
-        lead.id for lead in month_leads if lead.level in {"A", "B", "A级 (近期可成交)", "B级 (持续跟进)"}
+def _build_trend_series(daily_rows: list[tuple[datetime, int]], trend_window: str) -> dict[str, Any]:
+    return {
+        "window": trend_window,
+        "xAxis": [day.strftime("%m-%d") for day, _ in daily_rows],
+        "series": [total for _, total in daily_rows],
     }
-    invited_ids = {lead.id for lead in month_leads if _is_invited_or_visited(lead.status)}
-    signed_ids = {lead.id for lead in month_leads if _is_signed(lead.status)}
 
+
+def _build_funnel(
+    lead_summary: dict[str, int],
+    status_summary: dict[str, int],
+    followed_leads: int,
+) -> list[dict[str, Any]]:
     return [
-        {"name": "新增客户", "value": len(month_leads)},
-        {"name": "初次建联", "value": len(followed_ids)},
-        {"name": "产生意向", "value": len(interested_ids)},
-        {"name": "邀约看铺/探店", "value": len(invited_ids)},
-        {"name": "成功签约", "value": len(signed_ids)},
+        {"name": "新增客户", "value": lead_summary["new"]},
+        {"name": "初次建联", "value": followed_leads},
+        {"name": "产生意向", "value": lead_summary["interested"]},
+        {"name": "邀约看铺/探店", "value": status_summary["invitedOrVisited"]},
+        {"name": "成功签约", "value": status_summary["signed"]},
     ]
 
 
-def _build_loss_distribution(month_leads: list[Lead]) -> list[dict[str, Any]]:
-    counter: dict[str, int] = {}
-    for lead in month_leads:
-        if not _is_lost(lead.status):
-            continue
-        reason = _lead_loss_reason(lead)
-        counter[reason] = counter.get(reason, 0) + 1
-
-    if not counter:
+def _build_loss_distribution(reason_rows: list[tuple[str, int]]) -> list[dict[str, Any]]:
+    if not reason_rows:
         return [{"name": "暂无战败数据", "value": 0}]
+    return [{"name": name, "value": value} for name, value in reason_rows]
 
-    items = sorted(counter.items(), key=lambda item: item[1], reverse=True)
-    return [{"name": name, "value": value} for name, value in items[:8]]
 
-
-def _build_staff_ranking(month_leads: list[Lead], month_followups: list[FollowUpRecord], users: list[User]) -> list[dict[str, Any]]:
+def _build_staff_ranking(
+    owner_counts: dict[str, int],
+    signed_counts: dict[str, int],
+    cohort_signed_counts: dict[str, int],
+    followup_counts: dict[str, int],
+    users: list[User],
+    limit: int | None = STAFF_RANKING_LIMIT,
+) -> list[dict[str, Any]]:
     by_owner: dict[str, dict[str, int]] = {}
     user_map = {user.id: user for user in users}
-    operator_to_user: dict[str, str] = {}
-    for user in users:
-        operator_to_user[user.name] = user.id
-        operator_to_user[user.id] = user.id
-
-    for lead in month_leads:
-        owner_id = lead.owner_id
-        if not owner_id:
-            continue
+
+    for owner_id, new_leads in owner_counts.items():
+        by_owner[owner_id] = {"newLeads": new_leads, "signed": 0, "followUps": 0}
+
+    for owner_id, signed in signed_counts.items():
         if owner_id not in by_owner:
             by_owner[owner_id] = {"newLeads": 0, "signed": 0, "followUps": 0}
-        by_owner[owner_id]["newLeads"] += 1
-        if _is_signed(lead.status):
-            by_owner[owner_id]["signed"] += 1
+        by_owner[owner_id]["signed"] += signed
 
-    for record in month_followups:
-        owner_id = operator_to_user.get(record.operator)
-        if not owner_id:
-            continue
+    for owner_id, total in followup_counts.items():
         if owner_id not in by_owner:
             by_owner[owner_id] = {"newLeads": 0, "signed": 0, "followUps": 0}
-        by_owner[owner_id]["followUps"] += 1
+        by_owner[owner_id]["followUps"] += total
 
     ranking: list[dict[str, Any]] = []
     for owner_id, values in by_owner.items():
@@ -187,7 +170,10 @@ def _build_staff_ranking(month_leads: list[Lead], month_followups: list[FollowUp
             continue
         new_leads = values["newLeads"]
         signed = values["signed"]
-        conversion = round((signed / new_leads) * 100, 1) if new_leads > 0 else 0.0
+        # Conversion is the share of these new leads signed within the period; signings of older
+        # leads count in "signed" but not here, so it stays within 100%.
+        cohort_signed = cohort_signed_counts.get(owner_id, 0)
+        conversion = round((cohort_signed / new_leads) * 100, 1) if new_leads > 0 else 0.0
         ranking.append(
             {
                 "staffId": owner_id,
@@ -200,7 +186,7 @@ def _build_staff_ranking(month_leads: list[Lead], month_followups: list[FollowUp
         )
 
     ranking.sort(key=lambda item: (item["signed"], item["followUps"], item["newLeads"]), reverse=True)
-    return ranking[:10]
+    return ranking if limit is None else ranking[:limit]
 
 
 def _to_percent(current: int, target: int) -> int:
@@ -210,25 +196,427 @@ def _to_percent(current: int, target: int) -> int:
     return max(0, min(100, value))
 
 
-async def get_reports_overview(
+def build_period_sections(
+    aggregates: dict[str, Any],
+    users: list[User],
+    ranking_limit: int | None = STAFF_RANKING_LIMIT,
+) -> dict[str, Any]:
+    month_summary = aggregates["currentLeads"]
+    prev_month_summary = aggregates["previousLeads"]
+    month_status = aggregates["currentStatus"]
+    prev_month_status = aggregates["previousStatus"]
+    month_cohort = aggregates["currentCohort"]
+    prev_month_cohort = aggregates["previousCohort"]
+    followup_summary = aggregates["followUps"]
+    loss_rows = [(name, value) for name, value in aggregates["loss"][:LOSS_REASON_LIMIT]]
+    owner_counts = {owner: new_leads for owner, new_leads in aggregates["owners"]}
+    signed_counts = {owner: signed for owner, signed in aggregates["ownerSigned"]}
+    cohort_signed_counts = {owner: signed for owner, signed in aggregates["ownerCohortSigned"]}
+    followup_counts = {staff_id: total for staff_id, total in aggregates["staffFollowUps"]}
+
+    current_new = month_summary["new"]
+    previous_new = prev_month_summary["new"]
+
+    current_assigned = month_summary["assigned"]
+    previous_assigned = prev_month_summary["assigned"]
+
+    current_followups = followup_summary["current"]
+    previous_followups = followup_summary["previous"]
+
+    current_signed = month_status["signed"]
+    previous_signed = prev_month_status["signed"]
+
+    # Rates divide by new leads, so the numerators only count those same leads.
+    current_invited = month_cohort["invited"]
+    previous_invited = prev_month_cohort["invited"]
+    current_visited = month_cohort["visited"]
+    previous_visited = prev_month_cohort["visited"]
+
+    current_invitation_rate = int(round((current_invited / current_new) * 100)) if current_new > 0 else 0
+    previous_invitation_rate = int(round((previous_invited / previous_new) * 100)) if previous_new > 0 else 0
+    current_visit_rate = int(round((current_visited / current_new) * 100)) if current_new > 0 else 0
+    previous_visit_rate = int(round((previous_visited / previous_new) * 100)) if previous_new > 0 else 0
+
+    return {
+        "summary": {
+            "newLeads": {"value": current_new, "trend": _compute_trend(current_new, previous_new)},
+            "assignedLeads": {
+                "value": current_assigned,
+                "trend": _compute_trend(current_assigned, previous_assigned),
+            },
+            "followUps": {
+                "value": current_followups,
+                "trend": _compute_trend(current_followups, previous_followups),
+            },
+            "signedLeads": {
+                "value": current_signed,
+                "trend": _compute_trend(current_signed, previous_signed),
+            },
+            "invitationRate": {
+                "value": current_invitation_rate,
+                "trend": _compute_trend(current_invitation_rate, previous_invitation_rate),
+            },
+            "visitRate": {
+                "value": current_visit_rate,
+                "trend": _compute_trend(current_visit_rate, previous_visit_rate),
+            },
+        },
+        "funnel": _build_funnel(month_summary, month_status, followup_summary["current_leads"]),
+        "loss": _build_loss_distribution(loss_rows),
+        "staffRanking": _build_staff_ranking(
+            owner_counts,
+            signed_counts,
+            cohort_signed_counts,
+            followup_counts,
+            users,
+            ranking_limit,
+        ),
+    }
+
+
+def report_cache_key(
+    current: tuple[datetime, datetime],
+    previous: tuple[datetime, datetime],
+    lead_scope: dict[str, str | None],
+    staff_ids: list[str],
+    *,
+    now_utc: datetime | None = None,
+) -> str:
+    # A period that ends at the request time moves with every call; with now_utc given it is
+    # keyed by its start and the current hour instead, so repeat views share one entry.
+    tracks_now = now_utc is not None and current[1] == now_utc
+    if tracks_now:
+        hour = now_utc.replace(minute=0, second=0, microsecond=0)
+        current = (current[0], hour)
+        previous = previous_period(*current)
+    parts: dict[str, Any] = {
+        "version": REPORT_CACHE_VERSION,
+        "current": [current[0].isoformat(), current[1].isoformat()],
+        "previous": [previous[0].isoformat(), previous[1].isoformat()],
+        "scope": lead_scope,
+        "staffIds": sorted(staff_ids),
+    }
+    if tracks_now:
+        parts["tracksNow"] = True
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _whole_months(period: tuple[datetime, datetime]) -> list[tuple[datetime, datetime]]:
+    start_at, end_at = (value.astimezone(timezone.utc) for value in period)
+    month_start = start_at.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    if month_start < start_at:
+        month_start = (month_start + timedelta(days=32)).replace(day=1)
+    months: list[tuple[datetime, datetime]] = []
+    while True:
+        month_end = (month_start + timedelta(days=32)).replace(day=1)
+        if month_end > end_at:
+            return months
+        months.append((month_start, month_end))
+        month_start = month_end
+
+
+def _split_period(period: tuple[datetime, datetime], built: set[date]) -> PeriodSegments:
+    # Whole months with finished buckets are summed from them; the partial edges and any
+    # month without a bucket marker are scanned raw, merged into as few ranges as possible.
+    raw: list[tuple[datetime, datetime]] = []
+    months: list[date] = []
+    cursor = period[0]
+    for month_start, month_end in _whole_months(period):
+        if month_start.date() not in built:
+            continue
+        if cursor < month_start:
+            raw.append((cursor, month_start))
+        months.append(month_start.date())
+        cursor = month_end
+    if cursor < period[1]:
+        raw.append((cursor, period[1]))
+    return PeriodSegments(raw=tuple(raw), months=tuple(months))
+
+
+async def segment_periods(session: AsyncSession, periods: list[tuple[datetime, datetime]]) -> list[PeriodSegments]:
+    min_length = timedelta(days=settings.report_bucket_min_days)
+    candidates = [_whole_months(period) if period[1] - period[0] >= min_length else [] for period in periods]
+    month_starts = [month_start.date() for months in candidates for month_start, _ in months]
+    if not month_starts:
+        return [whole_period(period) for period in periods]
+    built = await report_bucket_repository.list_built_months(session, min(month_starts), max(month_starts))
+    return [
+        _split_period(period, built) if months else whole_period(period)
+        for period, months in zip(periods, candidates)
+    ]
+
+
+async def query_period_aggregates(
+    session: AsyncSession,
+    *,
+    current: tuple[datetime, datetime],
+    previous: tuple[datetime, datetime],
+    lead_scope: dict[str, str | None],
+    staff_ids: list[str],
+    extra_calls: tuple[Any, ...] = (),
+    whole_periods: tuple[tuple[datetime, datetime], tuple[datetime, datetime]] | None = None,
+) -> tuple[list[Any], dict[str, Any]]:
+    # whole_periods is set when current/previous are only the live tail of a longer request:
+    # distinct-lead counts do not add up across parts, so they are counted over the whole periods.
+    current_segments, previous_segments = await segment_periods(session, [current, previous])
+    whole_current, whole_previous = whole_periods or (current, previous)
+    (
+        *extra_results,
+        (current_leads, previous_leads),
+        (current_status, previous_status),
+        (current_cohort, previous_cohort),
+        follow_ups,
+        loss_rows,
+        owner_counts,
+        owner_signed,
+        owner_cohort_signed,
+        staff_follow_ups,
+    ) = await run_concurrent_reads(
+        session,
+        *extra_calls,
+        partial(
+            reports_repository.summarize_leads,
+            current=current_segments,
+            previous=previous_segments,
+            interested_levels=INTERESTED_LEVELS,
+            **lead_scope,
+        ),
+        partial(
+            reports_repository.count_status_transitions,
+            current=whole_current,
+            previous=whole_previous,
+            **lead_scope,
+        ),
+        partial(
+            reports_repository.count_cohort_transitions,
+            current=whole_current,
+            previous=whole_previous,
+            **lead_scope,
+        ),
+        partial(
+            reports_repository.summarize_followups,
+            current=current_segments,
+            previous=previous_segments,
+            current_period=whole_current,
+            staff_ids=staff_ids,
+        ),
+        # Unlimited so parts can be merged; sections cut the list to LOSS_REASON_LIMIT.
+        partial(reports_repository.count_loss_reasons, period=current_segments, limit=None, **lead_scope),
+        partial(reports_repository.count_leads_by_owner, period=current_segments, **lead_scope),
+        partial(reports_repository.count_signed_by_owner, period=whole_current, **lead_scope),
+        partial(reports_repository.count_cohort_signed_by_owner, period=whole_current, **lead_scope),
+        partial(reports_repository.count_followups_by_staff, period=current_segments, staff_ids=staff_ids),
+    )
+    # JSON-ready so the same shape can be stored in report_cache_entries; lists keep group order.
+    aggregates = {
+        "currentLeads": current_leads,
+        "previousLeads": previous_leads,
+        "currentStatus": current_status,
+        "previousStatus": previous_status,
+        "currentCohort": current_cohort,
+        "previousCohort": previous_cohort,
+        "followUps": follow_ups,
+        "loss": [[name, value] for name, value in loss_rows],
+        "owners": [[owner, new_leads] for owner, new_leads in owner_counts.items()],
+        "ownerSigned": [[owner, signed] for owner, signed in owner_signed.items()],
+        "ownerCohortSigned": [[owner, signed] for owner, signed in owner_cohort_signed.items()],
+        "staffFollowUps": [[staff_id, total] for staff_id, total in staff_follow_ups.items()],
+    }
+    return extra_results, aggregates
+
+
+async def _load_period_aggregates(
+    session: AsyncSession,
+    *,
+    cache_key: str,
+    now_utc: datetime,
+    current: tuple[datetime, datetime],
+    previous: tuple[datetime, datetime],
+    trend_call: Any | None,
+    lead_scope: dict[str, str | None],
+    staff_ids: list[str],
+) -> tuple[list[tuple[datetime, int]], dict[str, Any]]:
+    cached = await report_cache_repository.get_payload(session, cache_key, now_utc)
+    if cached is not None:
+        return (await trend_call(session) if trend_call is not None else []), cached
+
+    extra_results, aggregates = await query_period_aggregates(
+        session,
+        current=current,
+        previous=previous,
+        lead_scope=lead_scope,
+        staff_ids=staff_ids,
+        extra_calls=(trend_call,) if trend_call is not None else (),
+    )
+    trend_rows = extra_results[0] if extra_results else []
+    # The open period is cached only briefly. Closed periods are purged when a lead or follow-up
+    # inside them is added or removed, and otherwise refresh daily to pick up owner and status
+    # changes on their leads.
+    ttl_seconds = settings.report_cache_closed_ttl_seconds
+    if current[1] >= now_utc:
+        ttl_seconds = settings.report_cache_open_ttl_seconds
+    expires_at = now_utc + timedelta(seconds=ttl_seconds)
+    try:
+        await report_cache_repository.upsert_entry(
+            session,
+            cache_key=cache_key,
+            range_start=min(current[0], previous[0]),
+            range_end=max(current[1], previous[1]),
+            payload=aggregates,
+            expires_at=expires_at,
+        )
+        await report_cache_repository.commit(session)
+    except Exception:
+        await report_cache_repository.rollback(session)
+        logger.warning("report_cache_store_failed key=%s", cache_key, exc_info=True)
+    return trend_rows, aggregates
+
+
+def _merge_counts(*parts: list[list[Any]]) -> list[list[Any]]:
+    # [key, count] lists in first-appearance order; earlier parts must come first.
+    merged: dict[str, int] = {}
+    for rows in parts:
+        for key, value in rows:
+            merged[key] = merged.get(key, 0) + value
+    return [[key, value] for key, value in merged.items()]
+
+
+def _merge_split_aggregates(closed: dict[str, Any], live: dict[str, Any]) -> dict[str, Any]:
+    # Sums the closed part and the live tail. Distinct-lead counts already cover the whole
+    # period in the live aggregates (see query_period_aggregates whole_periods).
+    loss = _merge_counts(closed["loss"], live["loss"])
+    # Stable sort, so ties keep the order in which each reason first appeared.
+    loss.sort(key=lambda item: item[1], reverse=True)
+    return {
+        "currentLeads": {key: value + live["currentLeads"][key] for key, value in closed["currentLeads"].items()},
+        "previousLeads": {key: value + live["previousLeads"][key] for key, value in closed["previousLeads"].items()},
+        "currentStatus": live["currentStatus"],
+        "previousStatus": live["previousStatus"],
+        "currentCohort": live["currentCohort"],
+        "previousCohort": live["previousCohort"],
+        "followUps": {
+            "current": closed["followUps"]["current"] + live["followUps"]["current"],
+            "previous": closed["followUps"]["previous"] + live["followUps"]["previous"],
+            "current_leads": live["followUps"]["current_leads"],
+        },
+        "loss": loss,
+        "owners": _merge_counts(closed["owners"], live["owners"]),
+        "ownerSigned": live["ownerSigned"],
+        "ownerCohortSigned": live["ownerCohortSigned"],
+        "staffFollowUps": _merge_counts(closed["staffFollowUps"], live["staffFollowUps"]),
+    }
+
+
+async def _load_stored_aggregates(
+    session: AsyncSession,
+    *,
+    now_utc: datetime,
+    current: tuple[datetime, datetime],
+    previous: tuple[datetime, datetime],
+    trend_call: Any | None,
+    lead_scope: dict[str, str | None],
+    staff_ids: list[str],
+) -> tuple[list[tuple[datetime, int]], dict[str, Any]]:
+    cache_key = report_cache_key(current, previous, lead_scope, staff_ids, now_utc=now_utc)
+    snapshot = await report_snapshot_repository.get_payload(session, cache_key)
+    if snapshot is not None:
+        return (await trend_call(session) if trend_call is not None else []), snapshot
+    return await _load_period_aggregates(
+        session,
+        cache_key=cache_key,
+        now_utc=now_utc,
+        current=current,
+        previous=previous,
+        trend_call=trend_call,
+        lead_scope=lead_scope,
+        staff_ids=staff_ids,
+    )
+
+
+async def load_report_aggregates(
+    session: AsyncSession,
+    *,
+    now_utc: datetime,
+    current: tuple[datetime, datetime],
+    previous: tuple[datetime, datetime],
+    trend_call: Any | None,
+    lead_scope: dict[str, str | None],
+    staff_ids: list[str],
+) -> tuple[list[tuple[datetime, int]], dict[str, Any]]:
+    today_start = now_utc.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    if not current[0] < today_start < current[1]:
+        return await _load_stored_aggregates(
+            session,
+            now_utc=now_utc,
+            current=current,
+            previous=previous,
+            trend_call=trend_call,
+            lead_scope=lead_scope,
+            staff_ids=staff_ids,
+        )
+
+    # A period still open today (the default month-to-date request) is read as the closed part
+    # up to today's start, which report_snapshots and the cache keep, plus a live query of the
+    # rest. The previous period splits at the same offset, so both parts are themselves
+    # current/previous pairs.
+    closed_current = (current[0], today_start)
+    closed_previous = previous_period(*closed_current)
+    _, closed = await _load_stored_aggregates(
+        session,
+        now_utc=now_utc,
+        current=closed_current,
+        previous=closed_previous,
+        trend_call=None,
+        lead_scope=lead_scope,
+        staff_ids=staff_ids,
+    )
+    extra_results, live = await query_period_aggregates(
+        session,
+        current=(today_start, current[1]),
+        previous=(previous[0], closed_previous[0]),
+        lead_scope=lead_scope,
+        staff_ids=staff_ids,
+        extra_calls=(trend_call,) if trend_call is not None else (),
+        whole_periods=(current, previous),
+    )
+    trend_rows = extra_results[0] if extra_results else []
+    return trend_rows, _merge_split_aggregates(closed, live)
+
+
+async def purge_expired_report_cache() -> int:
+    async with AsyncSessionLocal() as session:
+        deleted = await report_cache_repository.delete_expired(session, datetime.now(timezone.utc))
+        await report_cache_repository.commit(session)
+    return deleted
+
+
+@dataclass(frozen=True)
+class ReportScope:
+    role: str
+    actor_staff_id: str
+    users: list[User]
+    departments: list[Department]
+    department_scope: set[str] | None
+    filtered_users: list[User]
+    staff_ids: list[str]
+    lead_scope: dict[str, str | None]
+
+
+async def _resolve_report_scope(
     session: AsyncSession,
-    trend_window: str,
-    start_date: str | None,
-    end_date: str | None,
     dept_name: str | None,
     owner_id: str | None,
     current_staff: dict[str, Any],
-) -> dict[str, Any]:
-    now_utc = datetime.now(timezone.utc)
-    month_start, month_end = _resolve_current_period(now_utc, start_date, end_date)
-    prev_month_start, prev_month_end = _previous_period(month_start, month_end)
-    trend_days = 7 if trend_window == "7days" else 30
-    trend_start = (now_utc - timedelta(days=trend_days - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
-
+) -> ReportScope | None:
+    # None means a manager without a department, who sees an empty report.
     role = normalize_role(str(current_staff.get("role") or ""))
     actor_staff_id = str(current_staff.get("staffId") or "")
 
-    users = await reports_repository.list_active_users(session)
+    users, departments = await run_concurrent_reads(
+        session,
+        reports_repository.list_active_users,
+        reports_repository.list_active_departments,
+    )
     if role == "sales":
         users = [user for user in users if user.id == actor_staff_id]
         owner_id = actor_staff_id
@@ -237,22 +625,9 @@ async def get_reports_overview(
         actor = next((user for user in users if user.id == actor_staff_id), None)
         actor_dept = actor.dept_name if actor else None
         if not actor_dept:
-            return {
-                "summary": {
-                    "newLeads": {"value": 0, "trend": 0.0},
-                    "assignedLeads": {"value": 0, "trend": 0.0},
-                    "followUps": {"value": 0, "trend": 0.0},
-                    "signedLeads": {"value": 0, "trend": 0.0},
-                },
-                "trend": {"window": trend_window, "xAxis": [], "series": []},
-                "funnel": [],
-                "loss": [],
-                "staffRanking": [],
-                "filtersMeta": {"departments": [], "staffs": []},
-            }
+            return None
         dept_name = actor_dept
         owner_id = None
-    departments = await reports_repository.list_active_departments(session)
     department_scope: set[str] | None = None
     if role == "manager" and dept_name:
         department_scope = {dept_name}
@@ -265,71 +640,84 @@ async def get_reports_overview(
         filtered_users = [user for user in filtered_users if user.dept_name == dept_name]
     if owner_id:
         filtered_users = [user for user in filtered_users if user.id == owner_id]
-    operator_keys = list({key for user in filtered_users for key in (user.name, user.id)})
+    staff_ids = [user.id for user in filtered_users]
 
     query_owner_id = owner_id
     query_dept_name = dept_name
     if owner_id:
         query_dept_name = None
 
-    month_leads = await reports_repository.list_leads_between(
-        session,
-        start_at=month_start,
-        end_at=month_end,
-        owner_id=query_owner_id,
-        dept_name=query_dept_name,
+    return ReportScope(
+        role=role,
+        actor_staff_id=actor_staff_id,
+        users=users,
+        departments=departments,
+        department_scope=department_scope,
+        filtered_users=filtered_users,
+        staff_ids=staff_ids,
+        lead_scope={"owner_id": query_owner_id, "dept_name": query_dept_name},
     )
-    prev_month_leads = await reports_repository.list_leads_between(
-        session,
-        start_at=prev_month_start,
-        end_at=prev_month_end,
-        owner_id=query_owner_id,
-        dept_name=query_dept_name,
-    )
-    month_followups = await reports_repository.list_followups_between(
-        session,
-        start_at=month_start,
-        end_at=month_end,
-        operator_keys=operator_keys,
-    )
-    prev_month_followups = await reports_repository.list_followups_between(
-        session,
-        start_at=prev_month_start,
-        end_at=prev_month_end,
-        operator_keys=operator_keys,
+
+
+async def get_reports_overview(
+    session: AsyncSession,
+    trend_window: str,
+    start_date: str | None,
+    end_date: str | None,
+    dept_name: str | None,
+    owner_id: str | None,
+    current_staff: dict[str, Any],
+) -> dict[str, Any]:
+    now_utc = datetime.now(timezone.utc)
+    month_start, month_end = _resolve_current_period(now_utc, start_date, end_date)
+    prev_month_start, prev_month_end = previous_period(month_start, month_end)
+    report_timezone = await platform_setting_service.get_report_timezone(session)
+    trend_range = _resolve_trend_window(trend_window, report_timezone, now_utc)
+
+    scope = await _resolve_report_scope(session, dept_name, owner_id, current_staff)
+    if scope is None:
+        return {
+            "summary": {
+                "newLeads": {"value": 0, "trend": 0.0},
+                "assignedLeads": {"value": 0, "trend": 0.0},
+                "followUps": {"value": 0, "trend": 0.0},
+                "signedLeads": {"value": 0, "trend": 0.0},
+            },
+            "trend": {"window": trend_window, "xAxis": [], "series": []},
+            "funnel": [],
+            "loss": [],
+            "staffRanking": [],
+            "filtersMeta": {"departments": [], "staffs": []},
+        }
+    role = scope.role
+    actor_staff_id = scope.actor_staff_id
+    users = scope.users
+    filtered_users = scope.filtered_users
+    staff_ids = scope.staff_ids
+    lead_scope = scope.lead_scope
+    trend_call = partial(
+        reports_repository.count_leads_by_day,
+        first_day=trend_range["first_day"],
+        last_day=trend_range["last_day"],
+        timezone_name=report_timezone,
+        start_at=trend_range["start_at"],
+        end_at=min(month_end, trend_range["end_at"]),
+        **lead_scope,
     )
-    trend_leads = await reports_repository.list_leads_between(
+    trend_rows, aggregates = await load_report_aggregates(
         session,
-        start_at=trend_start,
-        end_at=month_end,
-        owner_id=query_owner_id,
-        dept_name=query_dept_name,
+        now_utc=now_utc,
+        current=(month_start, month_end),
+        previous=(prev_month_start, prev_month_end),
+        trend_call=trend_call,
+        lead_scope=lead_scope,
+        staff_ids=staff_ids,
     )
-
-    current_new = len(month_leads)
-    previous_new = len(prev_month_leads)
-
-    current_assigned = sum(1 for lead in month_leads if lead.owner_id)
-    previous_assigned = sum(1 for lead in prev_month_leads if lead.owner_id)
-
-    current_followups = len(month_followups)
-    previous_followups = len(prev_month_followups)
-
-    current_signed = sum(1 for lead in month_leads if _is_signed(lead.status))
-    previous_signed = sum(1 for lead in prev_month_leads if _is_signed(lead.status))
-
-    current_invited = sum(1 for lead in month_leads if _is_invited(lead.status))
-    previous_invited = sum(1 for lead in prev_month_leads if _is_invited(lead.status))
-    current_visited = sum(1 for lead in month_leads if _is_visited(lead.status))
-    previous_visited = sum(1 for lead in prev_month_leads if _is_visited(lead.status))
-
-    current_invitation_rate = int(round((current_invited / current_new) * 100)) if current_new > 0 else 0
-    previous_invitation_rate = int(round((previous_invited / previous_new) * 100)) if previous_new > 0 else 0
-    current_visit_rate = int(round((current_visited / current_new) * 100)) if current_new > 0 else 0
-    previous_visit_rate = int(round((previous_visited / previous_new) * 100)) if previous_new > 0 else 0
+    sections = build_period_sections(aggregates, filtered_users)
 
     personal_goal: dict[str, Any] | None = None
     if role == "sales":
+        current_signed = sections["summary"]["signedLeads"]["value"]
         sales_user = next((user for user in users if user.id == actor_staff_id), None)
         signed_target = int(sales_user.monthly_target) if sales_user is not None else 0
         if signed_target <= 0:
@@ -341,35 +729,13 @@ async def get_reports_overview(
         }
 
     return {
-        "summary": {
-            "newLeads": {"value": current_new, "trend": _compute_trend(current_new, previous_new)},
-            "assignedLeads": {
-                "value": current_assigned,
-                "trend": _compute_trend(current_assigned, previous_assigned),
-            },
-            "followUps": {
-                "value": current_followups,
-                "trend": _compute_trend(current_followups, previous_followups),
-            },
-            "signedLeads": {
-                "value": current_signed,
-                "trend": _compute_trend(current_signed, previous_signed),
-            },
-            "invitationRate": {
-                "value": current_invitation_rate,
-                "trend": _compute_trend(current_invitation_rate, previous_invitation_rate),
-            },
-            "visitRate": {
-                "value": current_visit_rate,
-                "trend": _compute_trend(current_visit_rate, previous_visit_rate),
-            },
-        },
-        "trend": _build_trend_series(trend_leads, now_utc, trend_window),
-        "funnel": _build_funnel(month_leads, month_followups),
-        "loss": _build_loss_distribution(month_leads),
-        "staffRanking": _build_staff_ranking(month_leads, month_followups, filtered_users),
+        "summary": sections["summary"],
+        "trend": _build_trend_series(trend_rows, trend_window),
+        "funnel": sections["funnel"],
+        "loss": sections["loss"],
+        "staffRanking": sections["staffRanking"],
         "filtersMeta": {
-            "departments": _build_department_filters(departments, department_scope),
+            "departments": _build_department_filters(scope.departments, scope.department_scope),
             "staffs": [
                 {"label": user.name, "value": user.id}
                 for user in filtered_users
@@ -377,3 +743,65 @@ async def get_reports_overview(
         },
         "personalGoal": personal_goal,
     }
+
+
+REPORT_EXPORT_TABLES: dict[str, tuple[str, list[str]]] = {
+    "staffRanking": ("员工排行", ["员工ID", "员工姓名", "新增客户", "跟进次数", "签约客户", "转化率(%)"]),
+    "funnel": ("转化漏斗", ["阶段", "数量"]),
+    "loss": ("战败原因", ["原因", "数量"]),
+    "trend": ("每日新增", ["日期", "新增客户"]),
+}
+
+
+async def build_report_export(
+    session: AsyncSession,
+    table: str,
+    trend_window: str,
+    start_date: str | None,
+    end_date: str | None,
+    dept_name: str | None,
+    owner_id: str | None,
+    current_staff: dict[str, Any],
+) -> tuple[str, list[str], list[list[Any]]]:
+    # Same scope and aggregates as get_reports_overview, but the ranking and loss reasons are not
+    # cut to their on-screen top N.
+    title, header = REPORT_EXPORT_TABLES[table]
+    scope = await _resolve_report_scope(session, dept_name, owner_id, current_staff)
+    if scope is None:
+        return title, header, []
+
+    now_utc = datetime.now(timezone.utc)
+    current = _resolve_current_period(now_utc, start_date, end_date)
+    if table == "trend":
+        report_timezone = await platform_setting_service.get_report_timezone(session)
+        trend_range = _resolve_trend_window(trend_window, report_timezone, now_utc)
+        trend_rows = await reports_repository.count_leads_by_day(
+            session,
+            first_day=trend_range["first_day"],
+            last_day=trend_range["last_day"],
+            timezone_name=report_timezone,
+            start_at=trend_range["start_at"],
+            end_at=min(current[1], trend_range["end_at"]),
+            **scope.lead_scope,
+        )
+        return title, header, [[day.strftime("%Y-%m-%d"), total] for day, total in trend_rows]
+
+    previous = previous_period(*current)
+    _, aggregates = await load_report_aggregates(
+        session,
+        now_utc=now_utc,
+        current=current,
+        previous=previous,
+        trend_call=None,
+        lead_scope=scope.lead_scope,
+        staff_ids=scope.staff_ids,
+    )
+    if table == "loss":
+        return title, header, [[name, value] for name, value in aggregates["loss"]]
+    sections = build_period_sections(aggregates, scope.filtered_users, ranking_limit=None)
+    if table == "funnel":
+        return title, header, [[item["name"], item["value"]] for item in sections["funnel"]]
+    return title, header, [
+        [item["staffId"], item["name"], item["newLeads"], item["followUps"], item["signed"], item["conversion"]]
+        for item in sections["staffRanking"]
+    ]
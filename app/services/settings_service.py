@@ -4,6 +4,7 @@ import json
 import time
 import urllib.error
 import urllib.request
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -16,6 +17,7 @@ from app.models.recycle_rule import RecycleRule
 from app.models.system_role import SystemRole
 from app.models.user import User
 from app.repositories import settings_repository
+from app.services import platform_setting_service
 from app.services.auth_security_service import hash_password, is_weak_password
 from app.core.rbac import normalize_role, CANONICAL_ROLES
 from app.schemas.settings import (
@@ -153,7 +155,7 @@ async def _ensure_required_lead_status_items(session: AsyncSession) -> None:
         await settings_repository.commit(session)
 
 
-def _platform_to_dict(entity: PlatformSetting) -> dict[str, Any]:
+def _platform_to_dict(entity: PlatformSetting | platform_setting_service.PlatformSettingSnapshot) -> dict[str, Any]:
     monthly_targets = entity.monthly_targets or []
     if len(monthly_targets) != 12:
         monthly_targets = [0] * 12
@@ -173,6 +175,7 @@ def _platform_to_dict(entity: PlatformSetting) -> dict[str, Any]:
         "aiBaseUrl": entity.ai_base_url,
         "aiModel": entity.ai_model,
         "aiTimeoutSeconds": entity.ai_timeout_seconds,
+        "reportTimezone": entity.report_timezone,
     }
 
 
@@ -194,19 +197,30 @@ async def _ensure_platform_setting(session: AsyncSession) -> PlatformSetting:
         ai_base_url="https://api.openai.com/v1",
         ai_model="gpt-4o-mini",
         ai_timeout_seconds=12,
+        report_timezone=platform_setting_service.DEFAULT_REPORT_TIMEZONE,
     )
     settings_repository.add_platform_setting(session, entity)
     await settings_repository.commit(session)
     await settings_repository.refresh(session, entity)
+    await platform_setting_service.invalidate_platform_setting_cache()
     return entity
 
 
 async def get_platform_settings(session: AsyncSession) -> dict[str, Any]:
+    snapshot = await platform_setting_service.get_platform_setting(session)
+    if snapshot is not None:
+        return _platform_to_dict(snapshot)
     entity = await _ensure_platform_setting(session)
     return _platform_to_dict(entity)
 
 
 async def update_platform_settings(session: AsyncSession, payload: PlatformSettingsUpdate) -> dict[str, Any]:
+    report_timezone = payload.reportTimezone.strip()
+    try:
+        ZoneInfo(report_timezone)
+    except (ValueError, ZoneInfoNotFoundError):
+        raise AppException("报表时区无效", business_code=400, status_code=400)
+
     entity = await _ensure_platform_setting(session)
     entity.company_name = payload.companyName
     entity.official_phone = payload.officialPhone
@@ -223,9 +237,11 @@ async def update_platform_settings(session: AsyncSession, payload: PlatformSetti
     entity.ai_base_url = payload.aiBaseUrl.strip() or "https://api.openai.com/v1"
     entity.ai_model = payload.aiModel.strip() or "gpt-4o-mini"
     entity.ai_timeout_seconds = payload.aiTimeoutSeconds
+    entity.report_timezone = report_timezone
 
     await settings_repository.commit(session)
     await settings_repository.refresh(session, entity)
+    await platform_setting_service.invalidate_platform_setting_cache()
     return _platform_to_dict(entity)
 
 
@@ -0,0 +1,121 @@
+import asyncio
+import csv
+import gzip
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.repositories import transfer_log_partition_repository
+
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_CHUNK_SIZE = 5000
+
+
+def _month_start(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(month_start: datetime, months: int) -> datetime:
+    index = month_start.year * 12 + (month_start.month - 1) + months
+    return month_start.replace(year=index // 12, month=index % 12 + 1)
+
+
+async def ensure_future_partitions(session: AsyncSession, now: datetime | None = None) -> list[str]:
+    current = _month_start(now or datetime.now(timezone.utc))
+    existing = set(await transfer_log_partition_repository.list_month_partitions(session))
+    created: list[str] = []
+    for offset in range(settings.transfer_log_partitions_ahead + 1):
+        month_start = _add_months(current, offset)
+        name = transfer_log_partition_repository.build_partition_name(month_start)
+        if name in existing:
+            continue
+        await transfer_log_partition_repository.create_month_partition(
+            session,
+            month_start,
+            _add_months(month_start, 1),
+        )
+        created.append(name)
+    await transfer_log_partition_repository.commit(session)
+    return created
+
+
+def _write_chunk(writer: Any, rows: list[Any]) -> None:
+    for row in rows:
+        writer.writerow(
+            [value.isoformat() if isinstance(value, datetime) else ("" if value is None else value) for value in row]
+        )
+
+
+async def _archive_partition(session: AsyncSession, name: str, archive_dir: Path, *, attached: bool) -> dict[str, Any]:
+    target = archive_dir / f"{name}.csv.gz"
+    tmp_target = archive_dir / f"{name}.csv.gz.tmp"
+    row_count = 0
+    if attached:
+        # DETACH takes ACCESS EXCLUSIVE on the parent, so it commits on its own before the export;
+        # an interrupted export leaves a standalone table that the next run picks up.
+        try:
+            await transfer_log_partition_repository.detach_partition(session, name)
+            await transfer_log_partition_repository.commit(session)
+        except Exception:
+            await transfer_log_partition_repository.rollback(session)
+            raise
+    try:
+        with gzip.open(tmp_target, "wt", encoding="utf-8", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(transfer_log_partition_repository.archive_columns())
+            chunk: list[Any] = []
+            async for row in transfer_log_partition_repository.stream_partition_rows(session, name):
+                chunk.append(row)
+                if len(chunk) >= ARCHIVE_CHUNK_SIZE:
+                    await asyncio.to_thread(_write_chunk, writer, chunk)
+                    row_count += len(chunk)
+                    chunk = []
+            if chunk:
+                await asyncio.to_thread(_write_chunk, writer, chunk)
+                row_count += len(chunk)
+        await transfer_log_partition_repository.rollback(session)
+        os.replace(tmp_target, target)
+    except Exception:
+        await transfer_log_partition_repository.rollback(session)
+        tmp_target.unlink(missing_ok=True)
+        raise
+    try:
+        await transfer_log_partition_repository.drop_partition_table(session, name)
+        await transfer_log_partition_repository.commit(session)
+    except Exception:
+        await transfer_log_partition_repository.rollback(session)
+        raise
+    return {"partition": name, "rows": row_count, "file": str(target)}
+
+
+async def archive_expired_partitions(session: AsyncSession, now: datetime | None = None) -> list[dict[str, Any]]:
+    cutoff = _add_months(_month_start(now or datetime.now(timezone.utc)), -settings.transfer_log_retention_months)
+    archive_dir = Path(settings.transfer_log_archive_dir)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+
+    archived: list[dict[str, Any]] = []
+    for name in await transfer_log_partition_repository.list_detached_month_tables(session):
+        archived.append(await _archive_partition(session, name, archive_dir, attached=False))
+        logger.info("pool_transfer_logs detached table archived name=%s rows=%s", name, archived[-1]["rows"])
+    for name in await transfer_log_partition_repository.list_month_partitions(session):
+        year_month = transfer_log_partition_repository.parse_partition_month(name)
+        if year_month is None or (year_month[0], year_month[1]) >= (cutoff.year, cutoff.month):
+            continue
+        archived.append(await _archive_partition(session, name, archive_dir, attached=True))
+        logger.info("pool_transfer_logs partition archived name=%s rows=%s", name, archived[-1]["rows"])
+    return archived
+
+
+async def run_retention_once() -> dict[str, Any]:
+    async with AsyncSessionLocal() as session:
+        created = await ensure_future_partitions(session)
+        archived = await archive_expired_partitions(session)
+    return {"created": created, "archived": archived}
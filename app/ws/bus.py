@@ -100,3 +100,7 @@ def get_message_bus() -> MessageBus:
 
 def build_voice_assist_channel(staff_id: str) -> str:
     return f"{settings.ws_voice_assist_channel_prefix}:{staff_id}"
+
+
+def build_dashboard_channel(scope: str) -> str:
+    return f"{settings.ws_dashboard_channel_prefix}:{scope}"
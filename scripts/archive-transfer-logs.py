@@ -0,0 +1,17 @@
+import asyncio
+
+from app.services.transfer_log_retention_service import run_retention_once
+
+
+async def main() -> None:
+    result = await run_retention_once()
+    for name in result["created"]:
+        print(f"Created partition {name}")
+    for item in result["archived"]:
+        print(f"Archived {item['partition']}: rows={item['rows']} file={item['file']}")
+    if not result["created"] and not result["archived"]:
+        print("Partitions up to date, nothing to archive")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,33 @@
+import argparse
+import asyncio
+from datetime import datetime
+
+from app.services.report_snapshot_service import run_backfill
+
+
+def _parse_month(value: str) -> tuple[int, int]:
+    parsed = datetime.strptime(value, "%Y-%m")
+    return parsed.year, parsed.month
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute report snapshots for whole past months")
+    parser.add_argument("--start", type=_parse_month, required=True, help="first month to snapshot (YYYY-MM)")
+    parser.add_argument("--end", type=_parse_month, help="last month to snapshot, inclusive (default: --start)")
+    args = parser.parse_args()
+    end = args.end or args.start
+    if end < args.start:
+        parser.error("--end must not be before --start")
+
+    months: list[tuple[int, int]] = []
+    year, month = args.start
+    while (year, month) <= end:
+        months.append((year, month))
+        year, month = (year, month + 1) if month < 12 else (year + 1, 1)
+
+    for result in await run_backfill(months):
+        print(f"{result['periodStart'][:7]}: {result['snapshots']} snapshots")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
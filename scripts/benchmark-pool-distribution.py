@@ -0,0 +1,37 @@
+import argparse
+import random
+import time
+
+from app.services.pool_service import DISTRIBUTION_STRATEGIES, plan_distribution
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark pool distribution planning")
+    parser.add_argument("--leads", type=int, default=50000)
+    parser.add_argument("--reps", type=int, default=200)
+    parser.add_argument("--cap", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(20260226)
+    lead_ids = [f"LD{index:08d}" for index in range(args.leads)]
+    staff_ids = [f"ST{index:04d}" for index in range(1, args.reps + 1)]
+    loads = {staff_id: rng.randint(0, args.cap) for staff_id in staff_ids}
+
+    for strategy in sorted(DISTRIBUTION_STRATEGIES):
+        durations: list[float] = []
+        assigned = 0
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            plan = plan_distribution(lead_ids, staff_ids, loads, args.cap, strategy)
+            durations.append(time.perf_counter() - start)
+            assigned = sum(len(items) for items in plan.values())
+            overflow = [staff_id for staff_id, items in plan.items() if loads[staff_id] + len(items) > args.cap]
+            if overflow:
+                raise RuntimeError(f"{strategy} exceeded cap for {len(overflow)} reps")
+        best_ms = min(durations) * 1000
+        print(f"{strategy}: leads={args.leads} reps={args.reps} assigned={assigned} best={best_ms:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
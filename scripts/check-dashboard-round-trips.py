@@ -0,0 +1,47 @@
+import asyncio
+import sys
+from typing import Any
+
+from sqlalchemy import event, select
+
+from app.db.session import AsyncSessionLocal, engine
+from app.models.user import User
+from app.services.dashboard_service import build_dashboard_overview
+
+MAX_ROUND_TRIPS = 4
+
+
+async def main() -> int:
+    statements: list[str] = []
+
+    def _record(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        statements.append(statement)
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(User).where(User.active.is_(True)).order_by(User.id.asc()))
+        sample: dict[str, User] = {}
+        for user in result.scalars().all():
+            sample.setdefault(user.role, user)
+
+    failures: list[str] = []
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        for role, user in sorted(sample.items()):
+            statements.clear()
+            async with AsyncSessionLocal() as session:
+                await build_dashboard_overview(session, {"staffId": user.id, "role": role})
+            status = "ok" if len(statements) <= MAX_ROUND_TRIPS else "FAIL"
+            print(f"[{status}] {role} ({user.id}): {len(statements)} statements")
+            if status != "ok":
+                failures.append(role)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _record)
+
+    if failures:
+        print(f"Dashboard overview exceeded {MAX_ROUND_TRIPS} round trips for: {', '.join(failures)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
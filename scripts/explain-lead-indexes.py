@@ -0,0 +1,63 @@
+import asyncio
+import json
+import sys
+from typing import Any
+
+from sqlalchemy import Select, text
+from sqlalchemy.dialects import postgresql
+
+from app.db.session import AsyncSessionLocal
+from app.repositories import dashboard_repository, pool_repository
+
+
+def _render(stmt: Select[Any]) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def _walk(plan: dict[str, Any]) -> list[dict[str, Any]]:
+    nodes = [plan]
+    for child in plan.get("Plans") or []:
+        nodes.extend(_walk(child))
+    return nodes
+
+
+def _query_shapes() -> dict[str, Select[Any]]:
+    return {
+        "list_pool_leads": pool_repository.build_pool_page_query(
+            pool_repository.build_pool_query(keyword=None, drop_reason=None, previous_owner=None),
+            page=1,
+            page_size=20,
+        ),
+        "list_todo_leads[admin]": dashboard_repository.build_todo_leads_query(4),
+        "list_todo_leads[sales]": dashboard_repository.build_todo_leads_query(4, owner_id="ST001"),
+        "list_pool_warning_leads[sales]": dashboard_repository.build_pool_warning_query(2, owner_id="ST001"),
+        "list_pool_warning_leads[admin]": dashboard_repository.build_pool_warning_query(2),
+    }
+
+
+async def main() -> int:
+    failures: list[str] = []
+    async with AsyncSessionLocal() as session:
+        # Small dev tables favour seq scans; disable them so the check reflects index availability.
+        await session.execute(text("SET LOCAL enable_seqscan = off"))
+        for name, stmt in _query_shapes().items():
+            raw = await session.scalar(text(f"EXPLAIN (FORMAT JSON) {_render(stmt)}"))
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+            node_types = [node["Node Type"] for node in _walk(plan)]
+            uses_index = any(node_type in {"Index Scan", "Index Only Scan"} for node_type in node_types)
+            has_sort = any(node_type in {"Sort", "Incremental Sort"} for node_type in node_types)
+            status = "ok" if uses_index and not has_sort else "FAIL"
+            print(f"[{status}] {name}: {' -> '.join(node_types)}")
+            if status != "ok":
+                failures.append(name)
+        await session.rollback()
+
+    if failures:
+        print(f"Index check failed for: {', '.join(failures)}")
+        return 1
+    print("All query shapes are served by index scans")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
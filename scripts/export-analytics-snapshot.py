@@ -0,0 +1,14 @@
+import asyncio
+
+from app.services.analytics_service import run_export_once
+
+
+async def main() -> None:
+    manifest = await run_export_once()
+    for table, rows in manifest["tables"].items():
+        print(f"Exported {table}: rows={rows}")
+    print(f"Snapshot generated at {manifest['generatedAt']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
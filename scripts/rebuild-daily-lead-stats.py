@@ -0,0 +1,21 @@
+import argparse
+import asyncio
+from datetime import date, timedelta
+
+from app.services.lead_stats_service import run_rebuild_once
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Recompute daily_lead_stats from leads and follow_up_records")
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="first day to rebuild (YYYY-MM-DD, UTC)")
+    parser.add_argument("--end", type=date.fromisoformat, required=True, help="last day to rebuild, inclusive")
+    args = parser.parse_args()
+    if args.end < args.start:
+        parser.error("--end must not be before --start")
+
+    result = await run_rebuild_once(args.start, args.end + timedelta(days=1))
+    print(f"Rebuilt daily_lead_stats from {result['startDay']} to {result['endDay']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,16 @@
+import asyncio
+
+from app.services.lead_counter_service import run_reconcile_once
+
+
+async def main() -> None:
+    result = await run_reconcile_once()
+    print(f"Checked staff: {result['checked']}")
+    for item in result["fixed"]:
+        print(f"Fixed {item['staffId']}: stored={item['stored']} actual={item['actual']}")
+    if not result["fixed"]:
+        print("No drift detected")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -62,9 +62,21 @@ export function batchAssignLeads(ids, userId) {
     })
 }
 
+/**
+ * 按轮询或最少负载策略自动分配公海线索（受每人最大持有量限制）
+ * @param {Object} data - { staff_ids, strategy, count, keyword, drop_reason, previous_owner, preview }
+ */
+export function distributePoolLeads(data) {
+    return request({
+        url: '/api/v1/pool/leads/distribute',
+        method: 'post',
+        data
+    })
+}
+
 /**
  * 获取公海池流转与审计记录
- * @param {Object} params - 筛选条件 (例如: action, lead_id)
+ * @param {Object} params - 筛选条件 (例如: action, lead_id)；翻页时传上一页返回的 cursor 可走游标分页
  */
 export function getPoolTransfers(params) {
     return request({
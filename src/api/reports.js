@@ -21,3 +21,34 @@ export function getReportsOverview(params = {}) {
     }
   })
 }
+
+/**
+ * 导出报表表格（CSV / XLSX）
+ * @param {Object} params
+ */
+export function exportReportTable(params = {}) {
+  const {
+    table,
+    format = 'xlsx',
+    trendWindow = '7days',
+    startDate,
+    endDate,
+    deptName,
+    ownerId
+  } = params
+
+  return request({
+    url: '/api/v1/reports/export',
+    method: 'get',
+    params: {
+      table,
+      format,
+      trend_window: trendWindow,
+      start_date: startDate,
+      end_date: endDate,
+      dept_name: deptName,
+      owner_id: ownerId
+    },
+    responseType: 'blob'
+  })
+}
@@ -0,0 +1,76 @@
+import { onUnmounted } from 'vue'
+import { getAccessToken, getCurrentStaffId } from '@/utils/auth'
+
+const RECONNECT_DELAY_MS = 5000
+
+/**
+ * 订阅工作台增量事件（复用 voice-assist WebSocket 端点的 dashboard 频道）
+ * @param {Object} handlers
+ * @param {Function} handlers.onDelta - 收到 dashboard_delta 事件时调用，参数为 { metric, delta }
+ * @param {Function} handlers.onReconnect - 断线重连成功后调用，用于重新拉取完整概览
+ */
+export function useDashboardStream({ onDelta, onReconnect }) {
+  let ws = null
+  let stopped = false
+  let hasConnected = false
+  let reconnectTimer = null
+
+  const connect = () => {
+    const token = getAccessToken()
+    const staffId = getCurrentStaffId()
+    if (stopped || !token || !staffId) {
+      return
+    }
+
+    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:'
+    const wsUrl = `${protocol}//${window.location.host}/api/v1/ws/voice-assist/${staffId}?token=${encodeURIComponent(token)}`
+
+    try {
+      ws = new WebSocket(wsUrl)
+    } catch (err) {
+      console.error('Dashboard WS connection failed:', err)
+      return
+    }
+
+    ws.onopen = () => {
+      ws.send(JSON.stringify({ type: 'subscribe', channel: 'dashboard' }))
+      // 断线期间的增量已丢失，重连后以完整概览为准
+      if (hasConnected && onReconnect) {
+        onReconnect()
+      }
+      hasConnected = true
+    }
+
+    ws.onmessage = (event) => {
+      try {
+        const data = JSON.parse(event.data)
+        if (data.type === 'dashboard_delta' && onDelta) {
+          onDelta({ metric: data.metric, delta: Number(data.delta) || 0 })
+        }
+      } catch (e) {
+        console.error('Failed to parse dashboard WS message', e)
+      }
+    }
+
+    ws.onclose = () => {
+      ws = null
+      if (!stopped) {
+        reconnectTimer = setTimeout(connect, RECONNECT_DELAY_MS)
+      }
+    }
+
+    ws.onerror = () => {
+      if (ws) ws.close()
+    }
+  }
+
+  const disconnect = () => {
+    stopped = true
+    clearTimeout(reconnectTimer)
+    if (ws) ws.close()
+  }
+
+  onUnmounted(disconnect)
+
+  return { connect, disconnect }
+}
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any
+
+from sqlalchemy.dialects import postgresql
+
+from app.repositories import dashboard_repository
+
+
+NOW = datetime(2026, 10, 19, 15, 30, tzinfo=timezone.utc)
+TODAY = NOW.replace(hour=0, minute=0)
+
+
+class RecordingSession:
+    # Stands in for AsyncSession: records each statement as Postgres SQL and returns zeroed rows.
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    async def execute(self, stmt: Any) -> Any:
+        sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        self.statements.append(sql)
+        labels = [column.name for column in stmt.selected_columns]
+        return SimpleNamespace(one=lambda: SimpleNamespace(_mapping={label: None for label in labels}))
+
+    async def scalar(self, stmt: Any) -> Any:
+        await self.execute(stmt)
+        return None
+
+
+async def _lead_overview(session: RecordingSession, **scope: str | None) -> dict[str, int]:
+    return await dashboard_repository.count_lead_overview(
+        session,
+        now=NOW,
+        today_start=TODAY,
+        yesterday_start=TODAY - timedelta(days=1),
+        month_start=TODAY.replace(day=1),
+        prev_month_start=datetime(2026, 9, 1, tzinfo=timezone.utc),
+        **scope,
+    )
+
+
+async def test_lead_overview_is_one_rollup_query() -> None:
+    session = RecordingSession()
+    counts = await _lead_overview(session, personal_owner_id="ST001")
+
+    assert counts == {
+        "today_new": 0,
+        "yesterday_new": 0,
+        "month_signed": 0,
+        "prev_month_signed": 0,
+        "personal_signed": 0,
+        "department_signed": 0,
+    }
+    [sql] = session.statements
+    assert "FROM daily_lead_stats" in sql
+    assert "FROM leads" not in sql
+    assert "sum(daily_lead_stats.new_leads) FILTER (WHERE daily_lead_stats.day = '2026-10-19')" in sql
+    assert "sum(daily_lead_stats.new_leads) FILTER (WHERE daily_lead_stats.day = '2026-10-18')" in sql
+    assert (
+        "sum(daily_lead_stats.signed) FILTER "
+        "(WHERE daily_lead_stats.day >= '2026-09-01' AND daily_lead_stats.day < '2026-10-01')"
+    ) in sql
+    assert "daily_lead_stats.owner_id = 'ST001'" in sql
+    assert "WHERE daily_lead_stats.day >= '2026-09-01' AND daily_lead_stats.day <= '2026-10-19'" in sql
+    assert "JOIN users" not in sql
+
+
+async def test_lead_overview_scopes_departments_by_current_owner() -> None:
+    session = RecordingSession()
+    await _lead_overview(session, dept_name="华东一部", department_name="华东一部")
+
+    [sql] = session.statements
+    assert "LEFT OUTER JOIN users ON users.id = daily_lead_stats.owner_id" in sql
+    assert "users.dept_name = '华东一部'" in sql
+    assert "daily_lead_stats.dept_name" not in sql
+
+
+async def test_follow_up_overview_sums_rollup_weeks() -> None:
+    session = RecordingSession()
+    week_start = TODAY - timedelta(days=TODAY.weekday())
+    counts = await dashboard_repository.count_followup_overview(
+        session,
+        now=NOW,
+        week_start=week_start,
+        prev_week_start=week_start - timedelta(days=7),
+        operator_staff_id="ST001",
+    )
+
+    assert counts == {"week_followups": 0, "prev_week_followups": 0}
+    [sql] = session.statements
+    assert "sum(daily_lead_stats.follow_ups) FILTER (WHERE daily_lead_stats.day >= '2026-10-19')" in sql
+    assert "sum(daily_lead_stats.follow_ups) FILTER (WHERE daily_lead_stats.day < '2026-10-19')" in sql
+    assert "daily_lead_stats.day >= '2026-10-12'" in sql
+    assert "daily_lead_stats.owner_id = 'ST001'" in sql
+    assert "follow_up_records" not in sql
@@ -0,0 +1,141 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Select
+from sqlalchemy.dialects import postgresql
+
+from app.core.lead_status import ACTIVE_LEAD_STATUS_PREDICATE
+from app.models.lead import Lead
+from app.repositories import dashboard_repository, pool_repository
+
+
+MIGRATIONS = Path(__file__).resolve().parents[1] / "alembic" / "versions"
+
+
+def _render(stmt: Select) -> str:
+    # render_postcompile inlines literal_execute parameters the way the driver receives them;
+    # ordinary binds stay placeholders, which the planner cannot use to prove a partial index.
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True}))
+
+
+def _between(sql: str, start: str, end: str) -> str:
+    head = sql.split(start, 1)[1]
+    return head.split(end, 1)[0] if end in head else head
+
+
+def _unwrap(part: str) -> str:
+    part = part.strip()
+    return part[1:-1] if part.startswith("(") and part.endswith(")") else part
+
+
+def _where_conjuncts(sql: str) -> set[str]:
+    where = _between(sql, "\nWHERE ", " ORDER BY").replace("leads.", "")
+    return {_unwrap(part) for part in where.split(" AND ")}
+
+
+def _implied(conjunct: str, query_conjuncts: set[str]) -> bool:
+    # Postgres proves "col IS NOT NULL" from a strict comparison on the same column.
+    if conjunct in query_conjuncts:
+        return True
+    column = conjunct.removesuffix(" IS NOT NULL")
+    return column != conjunct and any(part.startswith(f"{column} = ") for part in query_conjuncts)
+
+
+def _order_keys(sql: str) -> list[str]:
+    order = _between(sql, " ORDER BY ", "\n LIMIT").replace("leads.", "")
+    return [key.strip() for key in order.split(",")]
+
+
+def _index(name: str):
+    return next(index for index in Lead.__table__.indexes if index.name == name)
+
+
+def _index_predicate(name: str) -> set[str]:
+    return {part.strip() for part in str(_index(name).dialect_options["postgresql"]["where"]).split(" AND ")}
+
+
+def _index_keys(name: str) -> list[str]:
+    return [str(expression).replace("leads.", "") for expression in _index(name).expressions]
+
+
+def _reversed(keys: list[str]) -> list[str]:
+    swap = {"ASC": "DESC", "DESC": "ASC", "FIRST": "LAST", "LAST": "FIRST"}
+    return [" ".join(swap.get(word, word) for word in key.split()) for key in keys]
+
+
+def _pool_page(**filters: str | None) -> Select:
+    base = pool_repository.build_pool_query(
+        keyword=None,
+        drop_reason=filters.get("drop_reason"),
+        previous_owner=filters.get("previous_owner"),
+    )
+    return pool_repository.build_pool_page_query(base, page=1, page_size=20)
+
+
+PREDICATE_CASES = [
+    ("list_pool_leads", _pool_page(), "ix_leads_pool_listing"),
+    ("list_pool_leads[drop_reason]", _pool_page(drop_reason="超时未跟进"), "ix_leads_pool_drop_reason_type"),
+    ("list_pool_leads[previous_owner]", _pool_page(previous_owner="ST001"), "ix_leads_pool_original_owner_id"),
+    ("list_todo_leads[admin]", dashboard_repository.build_todo_leads_query(4), "ix_leads_active_follow_up"),
+    (
+        "list_todo_leads[sales]",
+        dashboard_repository.build_todo_leads_query(4, owner_id="ST001"),
+        "ix_leads_active_owner_follow_up",
+    ),
+    (
+        "list_pool_warning_leads[sales]",
+        dashboard_repository.build_pool_warning_query(2, owner_id="ST001"),
+        "ix_leads_active_owner_follow_up",
+    ),
+    ("list_pool_warning_leads[admin]", dashboard_repository.build_pool_warning_query(2), "ix_leads_pool_listing"),
+]
+
+# (query, index, leading index columns pinned by an equality filter)
+ORDER_CASES = [
+    ("list_pool_leads", _pool_page(), "ix_leads_pool_listing", 0),
+    ("list_todo_leads[admin]", dashboard_repository.build_todo_leads_query(4), "ix_leads_active_follow_up", 0),
+    (
+        "list_todo_leads[sales]",
+        dashboard_repository.build_todo_leads_query(4, owner_id="ST001"),
+        "ix_leads_active_owner_follow_up",
+        1,
+    ),
+    (
+        "list_pool_warning_leads[sales]",
+        dashboard_repository.build_pool_warning_query(2, owner_id="ST001"),
+        "ix_leads_active_owner_follow_up",
+        1,
+    ),
+    ("list_pool_warning_leads[admin]", dashboard_repository.build_pool_warning_query(2), "ix_leads_pool_listing", 0),
+]
+
+
+@pytest.mark.parametrize(("name", "stmt", "index_name"), PREDICATE_CASES, ids=[case[0] for case in PREDICATE_CASES])
+def test_query_predicate_implies_partial_index(name: str, stmt: Select, index_name: str) -> None:
+    # Every conjunct of the index WHERE clause must appear in the query with inline literals.
+    conjuncts = _where_conjuncts(_render(stmt))
+    missing = {part for part in _index_predicate(index_name) if not _implied(part, conjuncts)}
+    assert not missing, f"{name} does not repeat {sorted(missing)} from {index_name}"
+
+
+@pytest.mark.parametrize(("name", "stmt", "index_name", "pinned"), ORDER_CASES, ids=[case[0] for case in ORDER_CASES])
+def test_query_order_matches_index_keys(name: str, stmt: Select, index_name: str, pinned: int) -> None:
+    # Forward or backward, the index scan must return rows already in the query's order.
+    keys = _index_keys(index_name)[pinned:]
+    order = _order_keys(_render(stmt))
+    assert order in (keys, _reversed(keys)), f"{name} orders by {order}, {index_name} has {keys}"
+
+
+def test_active_indexes_match_the_latest_migration() -> None:
+    spec = importlib.util.spec_from_file_location(
+        "canonical_lead_statuses",
+        MIGRATIONS / "20260228_0019_canonical_lead_statuses.py",
+    )
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    expected = f"owner_id IS NOT NULL AND {ACTIVE_LEAD_STATUS_PREDICATE}"
+    assert migration.ACTIVE_PREDICATE == expected
+    for index_name in ("ix_leads_active_owner_follow_up", "ix_leads_active_follow_up"):
+        assert str(_index(index_name).dialect_options["postgresql"]["where"]) == expected
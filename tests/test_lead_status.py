@@ -0,0 +1,27 @@
+import pytest
+
+from app.core.lead_status import is_active_status, normalize_lead_status
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (None, "pending"),
+        ("", "pending"),
+        ("   ", "pending"),
+        ("已签约", "signed"),
+        (" 战败流失 ", "lost"),
+        ("已定金", "deposit_paid"),
+        ("已交定金", "deposit_paid"),
+        ("invited", "invited"),
+        ("custom_stage", "custom_stage"),
+    ],
+)
+def test_normalize_lead_status(value: str | None, expected: str) -> None:
+    assert normalize_lead_status(value) == expected
+
+
+def test_terminal_statuses_are_inactive() -> None:
+    assert not is_active_status("signed")
+    assert not is_active_status(normalize_lead_status("无效客户"))
+    assert is_active_status(normalize_lead_status("深度跟进"))
@@ -0,0 +1,29 @@
+from app.services.pool_service import plan_distribution
+
+
+LEADS = [f"LD{index:03d}" for index in range(1, 8)]
+
+
+def test_round_robin_rotates_in_target_order() -> None:
+    plan = plan_distribution(LEADS[:5], ["ST001", "ST002"], {}, cap=10, strategy="round_robin")
+
+    assert plan == {"ST001": ["LD001", "LD003", "LD005"], "ST002": ["LD002", "LD004"]}
+
+
+def test_round_robin_respects_remaining_capacity() -> None:
+    plan = plan_distribution(LEADS, ["ST001", "ST002", "ST003"], {"ST001": 9, "ST003": 10}, cap=10, strategy="round_robin")
+
+    assert plan == {"ST001": ["LD001"], "ST002": LEADS[1:], "ST003": []}
+
+
+def test_least_loaded_fills_the_lightest_target_first() -> None:
+    plan = plan_distribution(LEADS[:4], ["ST001", "ST002"], {"ST001": 3, "ST002": 1}, cap=10, strategy="least_loaded")
+
+    # ST002 catches up to ST001's load, then ties go to the earlier target.
+    assert plan == {"ST001": ["LD003"], "ST002": ["LD001", "LD002", "LD004"]}
+
+
+def test_least_loaded_stops_when_everyone_is_at_cap() -> None:
+    plan = plan_distribution(LEADS, ["ST001", "ST002"], {"ST001": 4, "ST002": 5}, cap=5, strategy="least_loaded")
+
+    assert plan == {"ST001": ["LD001"], "ST002": []}
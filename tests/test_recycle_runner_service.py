@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+from app.services.recycle_runner_service import RECYCLE_DIGEST_LEAD_LIMIT, _evaluate_candidate, _merge_digest
+
+
+def _rules(**overrides) -> dict:
+    rules = {
+        "enabled": True,
+        "rule1": {"active": True, "days": 3},
+        "rule2": {"active": True, "days": 7, "protectHighIntent": True},
+        "rule3": {"active": True, "count": 10},
+        "notify": {"beforeDrop": True, "afterDrop": True},
+    }
+    for name, values in overrides.items():
+        rules[name] = {**rules[name], **values}
+    return rules
+
+
+def _candidate(**values) -> SimpleNamespace:
+    base = {
+        "lead_id": "LD001",
+        "followup_count": 1,
+        "owner_followup_count": 1,
+        "assigned_gap_days": 0,
+        "contact_gap_days": 0,
+        "is_high_intent": False,
+    }
+    return SimpleNamespace(**{**base, **values})
+
+
+def test_rule1_warns_the_day_before_and_recycles_after() -> None:
+    warnings, reason = _evaluate_candidate(_candidate(followup_count=0, assigned_gap_days=2), _rules())
+    assert [prefix for prefix, _ in warnings] == ["before_rule1"]
+    assert reason is None
+
+    warnings, reason = _evaluate_candidate(_candidate(followup_count=0, assigned_gap_days=3), _rules())
+    assert warnings == []
+    assert reason == "分配后未及时跟进"
+
+
+def test_rule1_stops_later_rules() -> None:
+    candidate = _candidate(followup_count=0, assigned_gap_days=5, contact_gap_days=20, owner_followup_count=50)
+
+    assert _evaluate_candidate(candidate, _rules())[1] == "分配后未及时跟进"
+
+
+def test_rule2_protects_high_intent_leads() -> None:
+    candidate = _candidate(contact_gap_days=30, is_high_intent=True)
+
+    assert _evaluate_candidate(candidate, _rules()) == ([], None)
+    assert _evaluate_candidate(candidate, _rules(rule2={"protectHighIntent": False}))[1] == "跟进后长时间无联系"
+
+
+def test_rule3_recycles_after_too_many_follow_ups() -> None:
+    assert _evaluate_candidate(_candidate(owner_followup_count=10), _rules())[1] == "久攻不下死单"
+    assert _evaluate_candidate(_candidate(owner_followup_count=10), _rules(rule3={"active": False}))[1] is None
+
+
+def test_warnings_respect_the_notify_switch() -> None:
+    candidate = _candidate(contact_gap_days=6)
+
+    assert [prefix for prefix, _ in _evaluate_candidate(candidate, _rules())[0]] == ["before_rule2"]
+    assert _evaluate_candidate(candidate, _rules(notify={"beforeDrop": False})) == ([], None)
+
+
+def test_merge_digest_caps_the_per_lead_rows() -> None:
+    recycled = [(f"LD{index}", "客户", "张三", "销售一部", "跟进后长时间无联系") for index in range(150)]
+
+    digest = _merge_digest(_merge_digest({}, recycled), recycled)
+
+    assert digest["total"] == 300
+    assert len(digest["leads"]) == RECYCLE_DIGEST_LEAD_LIMIT
+    assert digest["byReason"] == {"跟进后长时间无联系": 300}
+    assert digest["byDept"] == {"销售一部": 300}
@@ -0,0 +1,20 @@
+from datetime import date
+
+from app.repositories.report_cache_repository import merge_days
+
+
+def test_merge_days_joins_consecutive_days() -> None:
+    days = [date(2026, 3, 3), date(2026, 3, 1), date(2026, 3, 2), date(2026, 3, 2), date(2026, 3, 5)]
+
+    assert merge_days(days) == [
+        (date(2026, 3, 1), date(2026, 3, 4)),
+        (date(2026, 3, 5), date(2026, 3, 6)),
+    ]
+
+
+def test_merge_days_crosses_month_ends() -> None:
+    assert merge_days([date(2026, 3, 1), date(2026, 2, 28)]) == [(date(2026, 2, 28), date(2026, 3, 2))]
+
+
+def test_merge_days_empty() -> None:
+    assert merge_days([]) == []
@@ -0,0 +1,104 @@
+from datetime import date, datetime, timezone
+
+from app.repositories.reports_repository import PeriodSegments
+from app.services.reports_service import _merge_split_aggregates, _split_period
+
+
+def _utc(year: int, month: int, day: int, hour: int = 0) -> datetime:
+    return datetime(year, month, day, hour, tzinfo=timezone.utc)
+
+
+PERIOD = (_utc(2026, 6, 15), _utc(2026, 10, 19, 10))
+
+
+def test_split_period_reads_built_months_from_buckets() -> None:
+    segments = _split_period(PERIOD, {date(2026, 7, 1), date(2026, 9, 1)})
+
+    assert segments == PeriodSegments(
+        raw=(
+            (_utc(2026, 6, 15), _utc(2026, 7, 1)),
+            (_utc(2026, 8, 1), _utc(2026, 9, 1)),
+            (_utc(2026, 10, 1), _utc(2026, 10, 19, 10)),
+        ),
+        months=(date(2026, 7, 1), date(2026, 9, 1)),
+    )
+
+
+def test_split_period_merges_unbuilt_months_into_one_range() -> None:
+    segments = _split_period(PERIOD, {date(2026, 9, 1)})
+
+    assert segments.raw == ((_utc(2026, 6, 15), _utc(2026, 9, 1)), (_utc(2026, 10, 1), _utc(2026, 10, 19, 10)))
+    assert segments.months == (date(2026, 9, 1),)
+
+
+def test_split_period_without_buckets_is_one_raw_range() -> None:
+    assert _split_period(PERIOD, set()) == PeriodSegments(raw=(PERIOD,))
+    # A month that only partly overlaps the period is never read from its bucket.
+    assert _split_period((_utc(2026, 7, 2), _utc(2026, 8, 1)), {date(2026, 7, 1)}).months == ()
+
+
+def _aggregates(**overrides) -> dict:
+    base = {
+        "currentLeads": {"new": 0, "interested": 0},
+        "previousLeads": {"new": 0, "interested": 0},
+        "currentStatus": {"signed": 0},
+        "previousStatus": {"signed": 0},
+        "currentCohort": {"new": 0},
+        "previousCohort": {"new": 0},
+        "followUps": {"current": 0, "previous": 0, "current_leads": 0},
+        "loss": [],
+        "owners": [],
+        "ownerSigned": [],
+        "ownerCohortSigned": [],
+        "staffFollowUps": [],
+    }
+    base.update(overrides)
+    return base
+
+
+def test_merge_split_aggregates_sums_additive_counts() -> None:
+    closed = _aggregates(
+        currentLeads={"new": 10, "interested": 4},
+        previousLeads={"new": 7, "interested": 1},
+        followUps={"current": 30, "previous": 20, "current_leads": 99},
+        loss=[["价格", 3], ["位置", 1]],
+        owners=[["ST001", 6], ["ST002", 4]],
+        staffFollowUps=[["ST001", 30]],
+    )
+    live = _aggregates(
+        currentLeads={"new": 2, "interested": 1},
+        previousLeads={"new": 0, "interested": 0},
+        currentStatus={"signed": 3},
+        currentCohort={"new": 12},
+        followUps={"current": 5, "previous": 0, "current_leads": 8},
+        loss=[["位置", 3], ["其他原因", 1]],
+        owners=[["ST002", 1], ["ST003", 1]],
+        ownerSigned=[["ST001", 2]],
+        staffFollowUps=[["ST002", 5]],
+    )
+
+    merged = _merge_split_aggregates(closed, live)
+
+    assert merged["currentLeads"] == {"new": 12, "interested": 5}
+    assert merged["previousLeads"] == {"new": 7, "interested": 1}
+    assert merged["followUps"] == {"current": 35, "previous": 20, "current_leads": 8}
+    assert merged["loss"] == [["位置", 4], ["价格", 3], ["其他原因", 1]]
+    assert merged["owners"] == [["ST001", 6], ["ST002", 5], ["ST003", 1]]
+    assert merged["staffFollowUps"] == [["ST001", 30], ["ST002", 5]]
+
+
+def test_merge_split_aggregates_takes_whole_period_counts_from_live() -> None:
+    # Status, cohort and distinct-lead counts are already computed over the whole period.
+    live = _aggregates(
+        currentStatus={"signed": 3},
+        currentCohort={"new": 12},
+        ownerSigned=[["ST001", 2]],
+        ownerCohortSigned=[["ST001", 1]],
+    )
+
+    merged = _merge_split_aggregates(_aggregates(currentStatus={"signed": 50}), live)
+
+    assert merged["currentStatus"] == {"signed": 3}
+    assert merged["currentCohort"] == {"new": 12}
+    assert merged["ownerSigned"] == [["ST001", 2]]
+    assert merged["ownerCohortSigned"] == [["ST001", 1]]
@@ -0,0 +1,51 @@
+import io
+import zipfile
+from xml.etree import ElementTree
+
+from app.core import tabular_export
+from app.core.tabular_export import iter_csv, iter_xlsx
+
+
+SHEET_NS = {"s": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+def _read_sheet(chunks: list[bytes]) -> tuple[str, list[list[str]]]:
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        sheet = ElementTree.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+    name = workbook.find("s:sheets/s:sheet", SHEET_NS).get("name")
+    rows = [
+        ["".join(cell.itertext()) for cell in row.findall("s:c", SHEET_NS)]
+        for row in sheet.findall("s:sheetData/s:row", SHEET_NS)
+    ]
+    return name, rows
+
+
+def test_xlsx_round_trips_cells() -> None:
+    rows = [["张三 <VIP>", 3, 1.5, True, None], ["a\x01b", 0, -2, False, "x & y"]]
+
+    name, parsed = _read_sheet(list(iter_xlsx("流失原因/汇总", ["名称", "数量", "比例", "标记", "备注"], rows)))
+
+    assert name == "流失原因汇总"
+    assert parsed == [
+        ["名称", "数量", "比例", "标记", "备注"],
+        ["张三 <VIP>", "3", "1.5", "1", ""],
+        ["ab", "0", "-2", "0", "x & y"],
+    ]
+
+
+def test_xlsx_streams_in_chunks(monkeypatch) -> None:
+    monkeypatch.setattr(tabular_export, "EXPORT_CHUNK_ROWS", 2)
+    rows = ([f"LD{index}", index] for index in range(5))
+
+    chunks = list(iter_xlsx("Sheet", ["id", "n"], rows))
+
+    # Header parts, one drain per two rows, then the closing entries.
+    assert len(chunks) == 4
+    assert _read_sheet(chunks)[1][1:] == [[f"LD{index}", str(index)] for index in range(5)]
+
+
+def test_csv_starts_with_bom_and_blanks_none() -> None:
+    content = b"".join(iter_csv(["名称", "数量"], [["流失", None]])).decode("utf-8")
+
+    assert content == "\ufeff名称,数量\r\n流失,\r\n"